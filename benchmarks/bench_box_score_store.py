@@ -0,0 +1,95 @@
+"""
+Compares answering balldontlie stats and games queries from the API (served by the local stand-in server) with answering them from the local box score store, both the first time (when the store retrieves the season) and once the season is held.
+
+    python benchmarks/bench_box_score_store.py --season 2019 --latency 0.02
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+rootdir = os.path.dirname(currentdir)
+datadir = os.path.join(rootdir, "data")
+sys.path.append(rootdir)
+sys.path.append(datadir)
+
+import net.replay as replay
+from net.stand_in_server import StandInServer
+
+from data.api.ball_dont_lie_api import BallDontLieAPI
+from data.api.box_score_store import BoxScoreStore, get_season_dates
+from data.api.rate_limiter import RateLimiter
+
+import synthetic_fixtures
+
+def write_fixtures(directory, season, player_id, team_id):
+    """
+    Writes the pages requested by the benchmarked queries to the fixture directory: those requested directly from the API and the season's date range requested by the store.
+
+    :param directory: The fixture directory.
+    :param season: The balldontlie season of the games.
+    :param player_id: The ID of the player whose stats are queried.
+    :param team_id: The ID of the team whose games are queried.
+    """
+    games = synthetic_fixtures.get_bdl_games(season)
+    stats = synthetic_fixtures.get_bdl_stats(games, synthetic_fixtures.get_bdl_players())
+    start, end = get_season_dates(season)
+    date_range = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+
+    synthetic_fixtures.write_bdl_pages(directory, "games", games, **date_range)
+    synthetic_fixtures.write_bdl_pages(directory, "stats", stats, **date_range)
+    synthetic_fixtures.write_bdl_pages(directory, "stats", stats, **{"seasons[]": [season]})
+    synthetic_fixtures.write_bdl_pages(directory, "stats", [stat for stat in stats if stat["player"]["id"] == player_id], **{"seasons[]": [season], "player_ids[]": [player_id]})
+    synthetic_fixtures.write_bdl_pages(directory, "games", [game for game in games if team_id in [game["home_team"]["id"], game["visitor_team"]["id"]]], **{"seasons[]": [season], "team_ids[]": [team_id]})
+
+def time_query(api, query_type, **query_params):
+    """
+    Runs the passed query and returns its wall time and items.
+
+    :param api: A BallDontLieAPI object.
+    :param query_type: The type of query to be performed.
+    :param **query_params: Keyword arguments corresponding to parameters of the API call.
+    :return: A tuple holding the wall time (seconds) and the list of items retrieved.
+    """
+    start = time.perf_counter()
+    data = api.query(query_type=query_type, **query_params)
+
+    return time.perf_counter() - start, data
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the local box score store against the API.")
+    parser.add_argument("--season", type=int, default=2019)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    player_id = 7
+    team_id = 3
+    queries = [
+        ("stats", {"seasons": [args.season]}),
+        ("stats", {"seasons": [args.season], "player_ids": [player_id]}),
+        ("games", {"seasons": [args.season], "team_ids": [team_id]})
+    ]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_fixtures(temp_dir, args.season, player_id, team_id)
+
+        with StandInServer(temp_dir, latency=args.latency) as server:
+            replay.configure(replay.STAND_IN, temp_dir, server.url)
+            limiter = RateLimiter(rate=1000000)
+
+            api = BallDontLieAPI(rate_limiter=limiter)
+            local_api = BallDontLieAPI(rate_limiter=limiter, use_local_store=True, box_score_store=BoxScoreStore(os.path.join(temp_dir, "box_scores.sqlite")))
+
+            print("%-40s | %8s | %10s | %10s | %10s" % ("query", "rows", "API", "store cold", "store warm"))
+
+            for query_type, query_params in queries:
+                api_time, api_data = time_query(api, query_type, **query_params)
+                cold_time, cold_data = time_query(local_api, query_type, **query_params)
+                warm_time, warm_data = time_query(local_api, query_type, **query_params)
+
+                assert sorted(api_data, key=lambda item: item["id"]) == cold_data == warm_data
+
+                print("%-40s | %8d | %9.3fs | %9.3fs | %9.4fs" % ("%s %s" % (query_type, query_params), len(api_data), api_time, cold_time, warm_time))
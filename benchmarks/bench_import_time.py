@@ -0,0 +1,70 @@
+"""
+Measures how long importing the project's entry points takes, each in a fresh interpreter, and which heavy dependencies each import loads. Exits with an error if an import exceeds its time budget or loads a dependency it should not, so that a module-level download or eager import is caught:
+
+    python benchmarks/bench_import_time.py --repeat 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+rootdir = os.path.dirname(currentdir)
+
+HEAVY_MODULES = ["pandas", "numpy", "bs4", "requests", "pyarrow"]
+
+# Each entry point mapped to its time budget (seconds) and the heavy modules it may load
+IMPORT_BUDGETS = {
+    "main": (0.5, []),
+    "data.season_averages": (0.5, []),
+    "data.api.ball_dont_lie_api": (0.5, []),
+    "data.scraping.basketball_reference.league_leaders": (1.5, ["bs4", "pandas", "numpy", "pyarrow"])     # A scraping stage, which parses and builds DataFrames
+}
+
+MEASURE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "heavy": [name for name in {heavy} if name in sys.modules]}}))
+"""
+
+def measure_import(module, repeat):
+    """
+    Imports the passed module in fresh interpreters and returns its best import time along with the heavy modules it loaded.
+
+    :param module: The dotted name of the module to be imported.
+    :param repeat: The number of interpreters started; the fastest import is reported.
+    :return: A tuple holding the best import time (seconds) and a list of the heavy modules loaded.
+    """
+    results = []
+
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", MEASURE_SCRIPT.format(module=module, heavy=HEAVY_MODULES)], cwd=rootdir, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    return min(result["seconds"] for result in results), results[0]["heavy"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the import time of the project's entry points.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+
+    print("%-52s | %8s | %8s | %s" % ("module", "time", "budget", "heavy modules loaded"))
+
+    for module, (budget, allowed) in IMPORT_BUDGETS.items():
+        seconds, heavy = measure_import(module, args.repeat)
+        print("%-52s | %7.3fs | %7.2fs | %s" % (module, seconds, budget, ", ".join(heavy) or "-"))
+
+        if seconds > budget:
+            failures.append("%s took %.3fs (budget %.2fs)" % (module, seconds, budget))
+
+        for name in set(heavy) - set(allowed):
+            failures.append("%s loaded %s at import" % (module, name))
+
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
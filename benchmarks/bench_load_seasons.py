@@ -0,0 +1,134 @@
+"""
+Compares the notebooks' loop of `pd.read_csv()` calls with `load_data.load_seasons()` (cold, from the in-process cache and with a column subset), reporting wall time and the memory held by the loaded frame.
+
+The stored seasons in `data/season_averages` are used if they exist; otherwise synthetic seasons are built into a temporary directory first (which takes a minute or two):
+
+    python benchmarks/bench_load_seasons.py --data-dir data/season_averages
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+rootdir = os.path.dirname(currentdir)
+datadir = os.path.join(rootdir, "data")
+sys.path.append(rootdir)
+sys.path.append(datadir)
+
+import net.replay as replay
+
+import load_data
+import season_dataset
+import feature_engineering
+
+import synthetic_fixtures
+import offline_build
+
+def read_csv_loop(data_dir, first_season, last_season):
+    """
+    The loading cell the notebooks used before `load_seasons()`: one `pd.read_csv()` call per season.
+
+    :param data_dir: The directory holding the season CSV files.
+    :param first_season: The first season to be read.
+    :param last_season: The last season to be read.
+    :return: A DataFrame holding every season read.
+    """
+    season_average_dfs = []
+
+    for season in range(first_season, last_season + 1):
+        try:
+            season_average_dfs.append(pd.read_csv(os.path.join(data_dir, f"{season}_stats.csv")))
+        except FileNotFoundError:
+            pass
+
+    return pd.concat(season_average_dfs, ignore_index=True)
+
+def time_call(func, repeat):
+    """
+    Calls the passed function several times and returns its best wall time along with its result.
+
+    :param func: A function taking no arguments.
+    :param repeat: The number of calls.
+    :return: A tuple holding the best wall time (seconds) and the value returned by the last call.
+    """
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+def check_load_candidates(first_season, last_season, temp_dir):
+    """
+    Checks that `load_data.load_candidates()` with a column subset returns the same candidates as ranking the fully loaded seasons, for a ranked field, for a field that is not ranked and for seasons stored without rank columns (as before `main.py features` is run on them).
+
+    :param first_season: The first season to be loaded.
+    :param last_season: The last season to be loaded.
+    :param temp_dir: A directory in which a copy of the seasons without rank columns is stored.
+    """
+    stats_df = load_data.load_seasons(first_season, last_season, use_cache=False)
+    expected_ids = {field: feature_engineering.get_candidates(stats_df, field=field).id.tolist() for field in ["ws", "dws"]}
+
+    for field, ids in expected_ids.items():
+        assert load_data.load_candidates(first_season, last_season, field=field, columns=["id"]).id.tolist() == ids, field
+
+    dataset_dir = season_dataset.DATASET_DIR
+    season_dataset.DATASET_DIR = os.path.join(temp_dir, "unranked_dataset")
+    unranked_df = stats_df.drop(columns=[col for col in stats_df.columns if col.startswith("rank_")])
+
+    try:
+        for season, season_df in unranked_df.groupby("season"):
+            season_dataset.write_season(season_df, season)
+
+        assert load_data.load_candidates(first_season, last_season, field="ws", columns=["id"]).id.tolist() == expected_ids["ws"], "unranked seasons"
+    finally:
+        season_dataset.DATASET_DIR = dataset_dir
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks load_data.load_seasons against reading each season's CSV file.")
+    parser.add_argument("--data-dir", default=load_data.SEASON_AVERAGES_DIR, help="The directory holding the season CSV files and the season dataset.")
+    parser.add_argument("--first-season", type=int, default=2000)
+    parser.add_argument("--last-season", type=int, default=2020)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = args.data_dir
+
+        if not os.path.isfile(os.path.join(data_dir, f"{args.last_season}_stats.csv")):
+            print("No stored seasons found; building synthetic seasons...")
+            fixture_dir = os.path.join(temp_dir, "fixtures")
+
+            for season in range(args.first_season, args.last_season + 1):
+                synthetic_fixtures.write_season_pages(fixture_dir, season)
+
+            replay.configure(replay.REPLAY, fixture_dir)
+            data_dir = os.path.join(temp_dir, "season_averages")
+            offline_build.run_build(args.first_season, args.last_season, 4, data_dir, os.path.join(temp_dir, "html_cache"))
+
+        load_data.SEASON_AVERAGES_DIR = data_dir
+        season_dataset.DATASET_DIR = os.path.join(data_dir, "season_dataset")
+
+        runs = [
+            ("read_csv loop", lambda: read_csv_loop(data_dir, args.first_season, args.last_season)),
+            ("load_seasons (cold)", lambda: load_data.load_seasons(args.first_season, args.last_season, use_cache=False)),
+            ("load_seasons (cached)", lambda: load_data.load_seasons(args.first_season, args.last_season)),
+            ("load_seasons (3 columns)", lambda: load_data.load_seasons(args.first_season, args.last_season, columns=["player", "ws", "award_share"], use_cache=False))
+        ]
+
+        print("%-26s | %9s | %10s | %s" % ("", "time", "memory", "shape"))
+
+        for name, func in runs:
+            seconds, df = time_call(func, args.repeat)
+            print("%-26s | %8.3fs | %7.1f MB | %s" % (name, seconds, df.memory_usage(deep=True).sum() / 1e6, df.shape))
+
+        check_load_candidates(args.first_season, args.last_season, temp_dir)
+        print("\nload_candidates returns the same candidates with and without stored ranks.")
@@ -0,0 +1,80 @@
+"""
+Compares the column conversion behind `BDLToPandas.pandas_convert()` (`to_pandas.get_flattened_df()`) with the row-by-row implementation it replaced on synthetic /stats results of increasing size, checking that both produce the same DataFrame.
+
+    python benchmarks/bench_pandas_convert.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+rootdir = os.path.dirname(currentdir)
+sys.path.append(rootdir)
+
+from data.api.to_pandas import get_flattened_df, objects
+
+import synthetic_fixtures
+from bench_utils import measure, format_bytes
+
+def legacy_pandas_convert(data):
+    """
+    The implementation of `pandas_convert()` before it was vectorized, which builds every column with a separate pass over the items.
+
+    :param data: A list of JSON objects retrieved from the balldontlie API.
+    :return: A pandas DataFrame representing the items (before `min` is converted).
+    """
+    converted = {}
+
+    for names in data[0]:
+        col_values = []
+
+        if names in objects:
+            for items in data[0][names]:
+                col_values = []
+
+                col_name = names + "_" + items
+
+                for i in range(len(data)):
+                    col_values.append(data[i][names][items])
+
+                converted[col_name] = col_values
+        else:
+            for i in range(len(data)):
+                col_values.append(data[i][names])
+
+            converted[names] = col_values
+
+    return pd.DataFrame(data=converted)
+
+def get_stats(num_rows):
+    """
+    Returns the passed number of synthetic /stats items, repeating a base set of items as needed.
+
+    :param num_rows: The number of items to be returned.
+    :return: A list of stat JSON objects.
+    """
+    players = synthetic_fixtures.get_bdl_players(500)
+    base = synthetic_fixtures.get_bdl_stats(synthetic_fixtures.get_bdl_games(2019, 500), players)
+
+    return (base * (num_rows // len(base) + 1))[:num_rows]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks BDLToPandas.pandas_convert against the previous implementation.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("%10s | %10s %10s | %10s %10s | %7s" % ("rows", "old time", "old mem", "new time", "new mem", "speedup"))
+
+    for num_rows in args.rows:
+        data = get_stats(num_rows)
+
+        old_time, old_peak, old_df = measure(lambda: legacy_pandas_convert(data), args.repeat)
+        new_time, new_peak, new_df = measure(lambda: get_flattened_df(data), args.repeat)
+
+        pd.testing.assert_frame_equal(old_df, new_df)
+
+        print("%10d | %9.3fs %10s | %9.3fs %10s | %6.1fx" % (num_rows, old_time, format_bytes(old_peak), new_time, format_bytes(new_peak), old_time / new_time))
@@ -0,0 +1,100 @@
+"""
+Times `BDLToPandas.get_player_name_map(using_stored_data=True)` against the local stand-in server for held season averages of an increasing number of players, comparing the one-request-per-player loop it replaced with a cold player registry (every player fetched concurrently) and a warm one (no request at all).
+
+    python benchmarks/bench_player_name_map.py --players 100 400 --latency 0.05
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+rootdir = os.path.dirname(currentdir)
+datadir = os.path.join(rootdir, "data")
+sys.path.append(rootdir)
+sys.path.append(datadir)
+
+import net.replay as replay
+from net.stand_in_server import StandInServer
+
+from data.api.ball_dont_lie_api import BallDontLieAPI
+from data.api.player_registry import PlayerRegistry
+from data.api.rate_limiter import RateLimiter
+import data.api.query as bdl_query
+
+import synthetic_fixtures
+
+def legacy_player_name_map(api):
+    """
+    The stored-data path of `get_player_name_map()` before it was batched, which requests every player one after another.
+
+    :param api: A BallDontLieAPI object holding season averages.
+    :return: A dictionary mapping each held player ID to [last, first].
+    """
+    name_map = {}
+    temp = api.data
+    player_ids = {item["player_id"] for item in api.data if "player_id" in item}
+
+    for player_id in player_ids:
+        api.query_all_players(player_id=player_id)
+        name_map[player_id] = [api.data[0]["last_name"], api.data[0]["first_name"]]
+
+    api.data = temp
+
+    return name_map
+
+def write_player_fixtures(directory, players):
+    """
+    Writes the single-player responses of the passed players to the fixture directory.
+
+    :param directory: The fixture directory.
+    :param players: A list of player JSON objects.
+    """
+    for player in players:
+        response = synthetic_fixtures.FixtureResponse(200, "OK", "application/json", json.dumps(player).encode())
+        replay.save_fixture(bdl_query.players_url + "/%d" % player["id"], None, response, directory)
+
+def time_call(func):
+    """
+    Returns the wall time of a single call of the passed function along with its result.
+
+    :param func: A function taking no arguments.
+    :return: A tuple holding the wall time (seconds) and the value returned by the function.
+    """
+    start = time.perf_counter()
+    result = func()
+
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks get_player_name_map(using_stored_data=True).")
+    parser.add_argument("--players", type=int, nargs="+", default=[100, 400])
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stand-in server waits before answering each request.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fixture_dir = os.path.join(temp_dir, "fixtures")
+        players = synthetic_fixtures.get_bdl_players(max(args.players))
+        write_player_fixtures(fixture_dir, players)
+
+        with StandInServer(fixture_dir, latency=args.latency) as server:
+            replay.configure(replay.STAND_IN, fixture_dir, server.url)
+            limiter = RateLimiter(rate=1000000)     # The benchmark measures round trips, not the API's published limit
+
+            print("%8s | %10s | %10s | %10s" % ("players", "serial", "cold", "warm"))
+
+            for num_players in args.players:
+                registry = PlayerRegistry(os.path.join(temp_dir, "registry_%d.json" % num_players))
+                api = BallDontLieAPI(rate_limiter=limiter, player_registry=registry)
+                api.data = [{"player_id": player["id"], "season": 2019} for player in players[:num_players]]
+
+                serial_time, serial_map = time_call(lambda: legacy_player_name_map(api))
+                cold_time, cold_map = time_call(lambda: api.get_player_name_map(using_stored_data=True))
+                warm_time, warm_map = time_call(lambda: api.get_player_name_map(using_stored_data=True))
+
+                assert serial_map == cold_map == warm_map
+
+                print("%8d | %9.3fs | %9.3fs | %9.4fs" % (num_players, serial_time, cold_time, warm_time))
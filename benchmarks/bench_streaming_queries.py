@@ -0,0 +1,93 @@
+"""
+Compares the peak memory and wall time of writing a multi-season /stats pull to CSV with `query_all_stats()` followed by `pandas_convert()` against streaming it chunk by chunk with `iter_query(as_dataframes=True)`, using recorded pages in replay mode.
+
+    python benchmarks/bench_streaming_queries.py --seasons 2015 2016 2017 2018 2019
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+rootdir = os.path.dirname(currentdir)
+datadir = os.path.join(rootdir, "data")
+sys.path.append(rootdir)
+sys.path.append(datadir)
+
+import net.replay as replay
+
+from data.api.ball_dont_lie_api import BallDontLieAPI
+from data.api.rate_limiter import RateLimiter
+
+import synthetic_fixtures
+from bench_utils import measure, format_bytes
+
+def write_all_at_once(api, path, seasons):
+    """
+    Writes the stats of the passed seasons to the passed path after retrieving and converting all of them.
+
+    :param api: A BallDontLieAPI object.
+    :param path: The path of the CSV file to be written.
+    :param seasons: A list of balldontlie seasons.
+    :return: The number of rows written.
+    """
+    api.query(query_type="stats", seasons=seasons)
+    df = api.pandas_convert()
+    df.to_csv(path, index=False)
+
+    return len(df)
+
+def write_streamed(api, path, seasons, chunk_size):
+    """
+    Writes the stats of the passed seasons to the passed path one DataFrame chunk at a time.
+
+    :param api: A BallDontLieAPI object.
+    :param path: The path of the CSV file to be written.
+    :param seasons: A list of balldontlie seasons.
+    :param chunk_size: The number of rows of each chunk.
+    :return: The number of rows written.
+    """
+    rows = 0
+
+    for df in api.iter_query(query_type="stats", as_dataframes=True, chunk_size=chunk_size, seasons=seasons):
+        df.to_csv(path, mode="w" if rows == 0 else "a", header=rows == 0, index=False)
+        rows += len(df)
+
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks streaming balldontlie queries against retrieving all pages at once.")
+    parser.add_argument("--seasons", type=int, nargs="+", default=[2016, 2017, 2018, 2019])
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fixture_dir = os.path.join(temp_dir, "fixtures")
+        players = synthetic_fixtures.get_bdl_players()
+        stats = []
+
+        for season in args.seasons:
+            stats.extend(synthetic_fixtures.get_bdl_stats(synthetic_fixtures.get_bdl_games(season), players))
+
+        synthetic_fixtures.write_bdl_pages(fixture_dir, "stats", stats, **{"seasons[]": args.seasons})
+        del stats
+
+        replay.configure(replay.REPLAY, fixture_dir)
+        api = BallDontLieAPI(rate_limiter=RateLimiter(rate=1000000))
+
+        all_path = os.path.join(temp_dir, "all.csv")
+        streamed_path = os.path.join(temp_dir, "streamed.csv")
+
+        all_time, all_peak, all_rows = measure(lambda: write_all_at_once(api, all_path, args.seasons), args.repeat)
+        api.clear_data()
+        streamed_time, streamed_peak, streamed_rows = measure(lambda: write_streamed(api, streamed_path, args.seasons, args.chunk_size), args.repeat)
+
+        pd.testing.assert_frame_equal(pd.read_csv(all_path), pd.read_csv(streamed_path))
+
+        print("%-14s | %8s | %9s | %10s" % ("", "rows", "time", "peak mem"))
+        print("%-14s | %8d | %8.2fs | %10s" % ("all at once", all_rows, all_time, format_bytes(all_peak)))
+        print("%-14s | %8d | %8.2fs | %10s" % ("streamed", streamed_rows, streamed_time, format_bytes(streamed_peak)))
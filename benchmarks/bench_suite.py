@@ -0,0 +1,222 @@
+"""
+Benchmarks the hot paths of the pipeline on synthetic fixtures, with no network access: the row parsing of the scrapers (`get_rows_dict()` with each `store_new_player_*` callback), `get_mvp_voting_map()`, `get_team_record_map()`, `BDLToPandas.pandas_convert()` and its `__convert_min()`, the merges of `load_data` and `get_feature_engineered_df()`.
+
+Each case is run on a season of the usual size and on synthetic scale-ups of it (10x and 100x the rows by default). The wall time and peak memory of every case are printed and saved as JSON under `benchmarks/results/`, named after the current commit, so that runs can be compared across commits:
+
+    python benchmarks/bench_suite.py --scales 1 10
+    python benchmarks/bench_suite.py --compare benchmarks/results/<commit>.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+rootdir = os.path.dirname(currentdir)
+datadir = os.path.join(rootdir, "data")
+sys.path.append(rootdir)
+sys.path.append(datadir)
+
+import net.replay as replay
+import scraping.basketball_reference.bball_ref_utils as bball_ref_utils
+import scraping.basketball_reference.season_averages as season_averages
+import scraping.basketball_reference.advanced_stats as advanced_stats
+import scraping.basketball_reference.mvp_votes as mvp_votes
+import scraping.basketball_reference.team_records as team_records
+from scraping.basketball_reference.page_cache import PageCache
+
+import load_data
+import feature_engineering
+from data.api.to_pandas import BDLToPandas, get_flattened_df
+
+import synthetic_fixtures
+from bench_utils import measure, format_bytes
+
+RESULTS_DIR = os.path.join(currentdir, "results")
+
+SEASON = 2018           # The balldontlie season of the fixtures (basketball-reference season 2019)
+BASE_PLAYERS = 450      # Players in a season of the usual size
+BASE_VOTED = 15         # MVP vote recipients in a season of the usual size
+BASE_TEAMS = 30
+BASE_BDL_GAMES = 50     # balldontlie games converted at scale 1, with 20 stat rows each
+
+def write_fixtures(directory, scale):
+    """
+    Writes the basketball-reference pages of `SEASON`, scaled up by the passed factor, to the fixture directory.
+
+    :param directory: The fixture directory.
+    :param scale: The factor by which the number of players, MVP vote recipients and teams is multiplied.
+    """
+    bbref_season = SEASON + 1
+    players = synthetic_fixtures.get_players(bbref_season, BASE_PLAYERS * scale)
+    url = synthetic_fixtures.BBREF_URL
+
+    synthetic_fixtures.write_page(directory, url + f"leagues/NBA_{bbref_season}_per_game.html", synthetic_fixtures.get_per_game_page(bbref_season, players))
+    synthetic_fixtures.write_page(directory, url + f"leagues/NBA_{bbref_season}_advanced.html", synthetic_fixtures.get_advanced_page(bbref_season, players))
+    synthetic_fixtures.write_page(directory, url + f"awards/awards_{bbref_season}.html#mvp", synthetic_fixtures.get_awards_page(bbref_season, players, num_voted=BASE_VOTED * scale))
+    synthetic_fixtures.write_page(directory, url + f"leagues/NBA_{bbref_season}.html", synthetic_fixtures.get_standings_page(bbref_season, num_teams=BASE_TEAMS * scale))
+    synthetic_fixtures.write_page(directory, url + f"leagues/NBA_{bbref_season}_leaders.html", synthetic_fixtures.get_leaders_page(bbref_season, players))
+
+def get_player_trs(url, table_id):
+    """
+    Returns the player rows of the passed table, as the scrapers select them.
+
+    :param url: The URL of the page holding the table.
+    :param table_id: The id of the table.
+    :return: A list of <tr> tags.
+    """
+    table = bball_ref_utils.get_table_soup(url, SEASON + 1, table_id)
+
+    return table.find_all("tr", {"class":["full_table", "partial_table"]})
+
+def uncached(func):
+    """
+    Returns a function calling the passed function after dropping the parsed pages of `SEASON` from memory, so that every call parses its table again (from the HTML cached on disk).
+
+    :param func: A function taking the season as its only argument.
+    :return: A function taking no arguments.
+    """
+    def call():
+        bball_ref_utils.evict_season_pages(SEASON)
+        return func(SEASON)
+
+    return call
+
+def get_cases(scale):
+    """
+    Returns the benchmarked cases at the passed scale. Each case is set up only when it is run, so that the parsed pages and frames of one case are released before the next is set up (at 100x, a parsed page takes gigabytes). The fixtures of the scale must have been written and replay mode configured.
+
+    :param scale: The factor by which the rows of each case are multiplied.
+    :return: A list of (name, setup) tuples, where setup is a function taking no arguments that returns the function to be timed (taking no arguments) and the number of rows it processes.
+    """
+    bbref_season = SEASON + 1
+
+    def rows_dict_case(page_url, table_id, store_new_player_func, update_player_func=None):
+        trs = get_player_trs(page_url, table_id)
+        return lambda: bball_ref_utils.get_rows_dict(trs, store_new_player_func, update_player_func), len(trs)
+
+    def get_raw_dfs():
+        raw_dfs = {}
+
+        for source in load_data.get_season_sources(SEASON):
+            raw_dfs[source] = load_data.get_raw_source_df(SEASON, source)
+            bball_ref_utils.evict_season_pages(SEASON)     # Only one parsed page is held at a time
+
+        return raw_dfs
+
+    def merge_case():
+        raw_dfs = get_raw_dfs()
+        return lambda: load_data.merge_raw_sources(SEASON, raw_dfs), len(raw_dfs["per_game"])
+
+    def features_case():
+        raw_dfs = get_raw_dfs()
+        merged_df = load_data.merge_raw_sources(SEASON, raw_dfs)
+        return lambda: feature_engineering.get_feature_engineered_df(merged_df, raw_dfs["leaders"]), len(merged_df)
+
+    def get_bdl_stats():
+        bdl_games = synthetic_fixtures.get_bdl_games(SEASON, BASE_BDL_GAMES * scale)
+        return synthetic_fixtures.get_bdl_stats(bdl_games, synthetic_fixtures.get_bdl_players())
+
+    def pandas_convert_case():
+        bdl_stats = get_bdl_stats()
+        return lambda: BDLToPandas().pandas_convert(bdl_stats), len(bdl_stats)
+
+    def convert_min_case():
+        bdl_df = get_flattened_df(get_bdl_stats())
+        converter = BDLToPandas()
+        return lambda: converter._BDLToPandas__convert_min(bdl_df.copy()), len(bdl_df)     # Converts in place, so each call is passed a fresh copy
+
+    return [
+        ("get_rows_dict/season_averages", lambda: rows_dict_case(season_averages.get_page_url(bbref_season), "per_game_stats", season_averages.store_new_player_season_averages, season_averages.update_player_season_averages)),
+        ("get_rows_dict/advanced_stats", lambda: rows_dict_case(advanced_stats.get_page_url(bbref_season), "advanced_stats", advanced_stats.store_new_player_advanced_stats)),
+        ("get_mvp_voting_map", lambda: (uncached(mvp_votes.get_mvp_voting_map), BASE_VOTED * scale)),
+        ("get_team_record_map", lambda: (uncached(team_records.get_team_record_map), BASE_TEAMS * scale)),
+        ("BDLToPandas.pandas_convert", pandas_convert_case),
+        ("BDLToPandas.__convert_min", convert_min_case),
+        ("load_data.merge_raw_sources", merge_case),
+        ("get_feature_engineered_df", features_case)
+    ]
+
+def get_revision():
+    """
+    Returns the current commit of the repository, marked "-dirty" if the working tree has uncommitted changes.
+
+    :return: A string such as "3c25a4d" or "3c25a4d-dirty", or "unknown" outside of a git repository.
+    """
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=rootdir, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_results(results, baseline=None):
+    """
+    Prints the passed results as a table, along with the change from the baseline results if passed.
+
+    :param results: A list of result dictionaries.
+    :param baseline: A list of result dictionaries to compare against, or None.
+    """
+    baseline = {(result["case"], result["scale"]): result for result in baseline or []}
+
+    print("%-32s %6s %9s | %10s %10s | %8s %8s" % ("case", "scale", "rows", "time", "peak mem", "time", "mem"))
+
+    for result in results:
+        base = baseline.get((result["case"], result["scale"]))
+        change = ("%7.2fx %7.2fx" % (result["seconds"] / base["seconds"], result["peak_bytes"] / max(1, base["peak_bytes"]))) if base else ""
+
+        print("%-32s %5dx %9d | %9.4fs %10s | %s" % (result["case"], result["scale"], result["rows"], result["seconds"], format_bytes(result["peak_bytes"]), change))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the pipeline's hot paths on synthetic fixtures at several scales.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="The factors by which the rows of each case are multiplied.")
+    parser.add_argument("--cases", nargs="+", default=None, help="The names (or name prefixes) of the cases to be run. All cases are run by default.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="The JSON file the results are written to; benchmarks/results/<commit>.json by default.")
+    parser.add_argument("--compare", default=None, help="A JSON file of earlier results, printed as the change in time and memory.")
+    args = parser.parse_args()
+
+    revision = get_revision()
+    results = []
+
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_fixtures(os.path.join(temp_dir, "fixtures"), scale)
+            replay.configure(replay.REPLAY, os.path.join(temp_dir, "fixtures"))
+            bball_ref_utils.PAGE_CACHE = PageCache(os.path.join(temp_dir, "html_cache"))
+
+            for name, setup in get_cases(scale):
+                if args.cases and not any(name.startswith(case) for case in args.cases):
+                    continue
+
+                func, rows = setup()
+                seconds, peak, _ = measure(func, args.repeat)
+                del func
+                bball_ref_utils.evict_season_pages(SEASON)
+                results.append({"case": name, "scale": scale, "rows": rows, "seconds": seconds, "peak_bytes": peak})
+                print("%s at %dx: %.4fs, %s" % (name, scale, seconds, format_bytes(peak)), file=sys.stderr)
+
+    baseline = None
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    print_results(results, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    with open(output, "w") as f:
+        json.dump({
+            "revision": revision,
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "results": results
+        }, f, indent=1)
+
+    print("\nResults written to %s" % output)
@@ -0,0 +1,101 @@
+"""
+Compares parsing a full basketball-reference page with BeautifulSoup against parsing only the target tables with `bball_ref_utils.parse_tables()`, reporting the parse time and peak memory of both per page and checking that both produce the same rows.
+
+Synthetic pages are used by default; pass a directory of recorded fixtures to benchmark real pages:
+
+    python benchmarks/bench_table_parsing.py --fixtures data/fixtures --season 2019
+"""
+
+import argparse
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+datadir = os.path.join(os.path.dirname(currentdir), "data")
+sys.path.append(datadir)
+
+import net.replay as replay
+from scraping.basketball_reference.bball_ref_utils import parse_tables, get_rows_dict
+import scraping.basketball_reference.season_averages as season_averages
+import scraping.basketball_reference.advanced_stats as advanced_stats
+import scraping.basketball_reference.mvp_votes as mvp_votes
+
+import synthetic_fixtures
+from bench_utils import measure, format_bytes
+
+def get_rows(table_id, table):
+    """
+    Returns the rows the scrapers read from the passed table, so that the output of both parsing paths can be compared.
+
+    :param table_id: The id of the table.
+    :param table: A BeautifulSoup object of the table.
+    :return: A list of rows (dictionaries or lists of cell text) read from the table.
+    """
+    if table_id == "per_game_stats":
+        trs = table.find_all("tr", {"class":["full_table", "partial_table"]})
+        return get_rows_dict(trs, season_averages.store_new_player_season_averages, season_averages.update_player_season_averages)
+    elif table_id == "advanced_stats":
+        trs = table.find_all("tr", {"class":["full_table", "partial_table"]})
+        return get_rows_dict(trs, advanced_stats.store_new_player_advanced_stats)
+    elif table_id == "mvp":
+        return [[td.get_text() for td in player] for player in mvp_votes.get_players_list(table.find_all("td"))]
+    else:
+        return [cell.get_text() for cell in table.find_all(["th", "td"])]
+
+def get_pages(fixture_dir, season):
+    """
+    Returns the pages to be benchmarked along with the ids of the tables read from each.
+
+    :param fixture_dir: A directory of recorded fixtures, or None to use synthetic pages.
+    :param season: The balldontlie season of the pages.
+    :return: A list of (name, content, table_ids) tuples.
+    """
+    bbref_season = season + 1
+    standings_ids = ["confs_standings_E", "confs_standings_W"] if bbref_season >= 2016 else ["divs_standings_E", "divs_standings_W"]
+
+    if fixture_dir:
+        base_url = synthetic_fixtures.BBREF_URL
+        load = lambda path: replay.load_fixture(base_url + path, directory=fixture_dir).content
+
+        return [
+            ("per_game", load(f"leagues/NBA_{bbref_season}_per_game.html"), ["per_game_stats"]),
+            ("advanced", load(f"leagues/NBA_{bbref_season}_advanced.html"), ["advanced_stats"]),
+            ("awards", load(f"awards/awards_{bbref_season}.html#mvp"), ["mvp"]),
+            ("standings", load(f"leagues/NBA_{bbref_season}.html"), standings_ids)
+        ]
+
+    players = synthetic_fixtures.get_players(bbref_season)
+
+    return [
+        ("per_game", synthetic_fixtures.get_per_game_page(bbref_season, players).encode(), ["per_game_stats"]),
+        ("advanced", synthetic_fixtures.get_advanced_page(bbref_season, players).encode(), ["advanced_stats"]),
+        ("awards", synthetic_fixtures.get_awards_page(bbref_season, players).encode(), ["mvp"]),
+        ("standings", synthetic_fixtures.get_standings_page(bbref_season).encode(), standings_ids)
+    ]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks full-page parsing against targeted table parsing.")
+    parser.add_argument("--fixtures", default=None, help="A directory of recorded fixtures. Synthetic pages are used when omitted.")
+    parser.add_argument("--season", type=int, default=2019)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("%-10s %8s | %10s %10s | %10s %10s | %7s %7s" % ("page", "size", "full time", "full mem", "table time", "table mem", "speedup", "memory"))
+
+    for name, content, table_ids in get_pages(args.fixtures, args.season):
+        def parse_full():
+            soup = BeautifulSoup(content, 'html.parser')
+            return {table_id: soup.find(id=table_id) for table_id in table_ids}
+
+        full_time, full_peak, full_tables = measure(parse_full, args.repeat)
+        table_time, table_peak, tables = measure(lambda: parse_tables(content, table_ids), args.repeat)
+
+        for table_id in table_ids:
+            if get_rows(table_id, full_tables[table_id]) != get_rows(table_id, tables[table_id]):
+                raise AssertionError(f"Targeted parse of {table_id} on the {name} page differs from the full parse")
+
+        print("%-10s %8s | %9.3fs %10s | %9.3fs %10s | %6.1fx %6.1fx" % (
+            name, format_bytes(len(content)), full_time, format_bytes(full_peak), table_time, format_bytes(table_peak),
+            full_time / table_time, full_peak / table_peak))
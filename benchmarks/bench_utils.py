@@ -0,0 +1,46 @@
+"""
+Helpers shared by the benchmarks for measuring wall time and peak memory.
+"""
+
+import gc
+import time
+import tracemalloc
+
+def measure(func, repeat=3):
+    """
+    Calls the passed function several times and returns its best wall time along with the peak memory allocated during a single call.
+
+    :param func: A function taking no arguments.
+    :param repeat: The number of timed calls; the fastest is reported.
+    :return: A tuple holding the best wall time (seconds), the peak memory allocated (bytes) and the value returned by the function.
+    """
+    times = []
+
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()     # Memory is traced in a separate call, as tracing slows the function down
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return min(times), peak, result
+
+def format_bytes(num_bytes):
+    """
+    Returns the passed number of bytes as a human readable string.
+
+    :param num_bytes: A number of bytes.
+    :return: A string such as "12.3 MB".
+    """
+    for unit in ["B", "KB", "MB"]:
+        if num_bytes < 1024:
+            return "%.1f %s" % (num_bytes, unit)
+
+        num_bytes /= 1024
+
+    return "%.1f GB" % num_bytes
@@ -0,0 +1,123 @@
+"""
+Runs the full `download_mvp_stats()` pipeline and the paginated balldontlie queries against the local stand-in server, with no network access, and reports how long each took.
+
+Recorded fixtures are used if a fixture directory is passed; otherwise synthetic fixtures are generated in a temporary directory. For example:
+
+    python benchmarks/offline_build.py --workers 4 --latency 0.05 --throttle-rate 0.05
+
+Passing `--instrument` also prints the time, requests and rows of each stage of the build and of each balldontlie query (see `data/instrumentation.py`).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+rootdir = os.path.dirname(currentdir)
+datadir = os.path.join(rootdir, "data")
+sys.path.append(rootdir)
+sys.path.append(datadir)
+
+import net.replay as replay
+from net.stand_in_server import StandInServer
+
+import load_data
+import season_dataset
+import instrumentation
+from scraping.basketball_reference.page_cache import PageCache
+import scraping.basketball_reference.bball_ref_utils as bball_ref_utils
+from data.api.ball_dont_lie_api import BallDontLieAPI
+import data.api.query as bdl_query
+
+import synthetic_fixtures
+
+def run_build(first_season, last_season, workers, output_dir, cache_dir):
+    """
+    Builds the passed range of seasons into the passed output directory and returns the wall time of the build.
+
+    :param first_season: The first season to be built.
+    :param last_season: The last season to be built, treated as the current season.
+    :param workers: The number of seasons built at the same time.
+    :param output_dir: The directory the season CSV files, dataset and raw sources are written to.
+    :param cache_dir: The directory of the page cache used during the build.
+    :return: The number of seconds the build took.
+    """
+    load_data.FIRST_SEASON = first_season
+    load_data.CURRENT_SEASON = last_season
+    load_data.SEASON_AVERAGES_DIR = output_dir
+    load_data.RAW_DIR = os.path.join(output_dir, "raw")
+    season_dataset.DATASET_DIR = os.path.join(output_dir, "season_dataset")
+    bball_ref_utils.PAGE_CACHE = PageCache(cache_dir)
+
+    start = time.perf_counter()
+    load_data.download_mvp_stats(workers=workers)
+
+    return time.perf_counter() - start
+
+def run_api_queries(season):
+    """
+    Runs the paginated games and stats queries of the passed season and returns the wall time and number of rows of each.
+
+    :param season: The balldontlie season to be queried.
+    :return: A dictionary mapping each query type to a tuple of (seconds, rows).
+    """
+    results = {}
+
+    for query_type in ["games", "stats"]:
+        api = BallDontLieAPI()
+        start = time.perf_counter()
+        api.query(query_type=query_type, seasons=[season])
+        results[query_type] = (time.perf_counter() - start, len(api.data))
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the pipeline against the local stand-in server.")
+    parser.add_argument("--fixtures", default=None, help="A directory of recorded fixtures. Synthetic fixtures are generated when omitted.")
+    parser.add_argument("--first-season", type=int, default=2015)
+    parser.add_argument("--last-season", type=int, default=2020)
+    parser.add_argument("--bdl-season", type=int, default=2019)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--api-rate", type=int, default=60000, help="Requests per minute allowed by the balldontlie rate limiter.")
+    parser.add_argument("--api-backoff", type=float, default=0.01, help="Seconds waited after the first 429 error from the stand-in server.")
+    parser.add_argument("--instrument", nargs="?", const="", default=None, metavar="PATH", help="Print the time, requests and rows of each stage and, if a path is passed, write every record to it as JSON lines.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fixture_dir = args.fixtures
+
+        if fixture_dir is None:
+            fixture_dir = os.path.join(temp_dir, "fixtures")
+
+            for season in range(args.first_season, args.last_season + 1):
+                synthetic_fixtures.write_season_pages(fixture_dir, season)
+
+            bdl_players = synthetic_fixtures.get_bdl_players()
+            bdl_games = synthetic_fixtures.get_bdl_games(args.bdl_season)
+            synthetic_fixtures.write_bdl_pages(fixture_dir, "games", bdl_games, **{"seasons[]": [args.bdl_season]})
+            synthetic_fixtures.write_bdl_pages(fixture_dir, "stats", synthetic_fixtures.get_bdl_stats(bdl_games, bdl_players), **{"seasons[]": [args.bdl_season]})
+
+        with StandInServer(fixture_dir, latency=args.latency, throttle_rate=args.throttle_rate, retry_after=0, seed=0) as server:
+            replay.configure(replay.STAND_IN, new_stand_in_url=server.url)
+            bdl_query.RATE_LIMITER.set_rate(args.api_rate)
+            bdl_query.RATE_LIMITER.base_backoff = args.api_backoff
+
+            if args.instrument is not None:
+                instrumentation.configure(sink=args.instrument or None)
+
+            build_time = run_build(args.first_season, args.last_season, args.workers, os.path.join(temp_dir, "season_averages"), os.path.join(temp_dir, "html_cache"))
+            print("download_mvp_stats: %.2fs for %d seasons with %d worker(s)" % (build_time, args.last_season - args.first_season + 1, args.workers))
+
+            for query_type, (seconds, rows) in run_api_queries(args.bdl_season).items():
+                print("query_all_%s: %.2fs for %d rows" % (query_type, seconds, rows))
+
+            print("Stand-in server: %d requests served, %d throttled" % (server.requests_served, server.requests_throttled))
+            print("Rate limiter: %s" % bdl_query.RATE_LIMITER.get_counters())
+
+            if args.instrument is not None:
+                print()
+                instrumentation.print_summary()
@@ -0,0 +1,106 @@
+"""
+Runs many balldontlie queries at the same time from a thread pool against the local stand-in server and checks that every query returns exactly what it returns when the queries are run one by one, both when each thread has its own BallDontLieAPI object and when all threads share one.
+
+    python benchmarks/stress_concurrent_queries.py --threads 16 --rounds 3 --throttle-rate 0.05
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+rootdir = os.path.dirname(currentdir)
+datadir = os.path.join(rootdir, "data")
+sys.path.append(rootdir)
+sys.path.append(datadir)
+
+import net.replay as replay
+from net.stand_in_server import StandInServer
+
+from data.api.ball_dont_lie_api import BallDontLieAPI
+from data.api.rate_limiter import RateLimiter
+
+import synthetic_fixtures
+
+def write_fixtures(directory, seasons, num_games):
+    """
+    Writes the games and stats pages of the passed seasons, along with every page of the players endpoint, to the fixture directory.
+
+    :param directory: The fixture directory.
+    :param seasons: A list of balldontlie seasons.
+    :param num_games: The number of games of each season.
+    :return: A list of (query type, query parameters) tuples covering the written fixtures.
+    """
+    players = synthetic_fixtures.get_bdl_players(600)
+    synthetic_fixtures.write_bdl_pages(directory, "players", players)
+    queries = [("players", {})]
+
+    for season in seasons:
+        games = synthetic_fixtures.get_bdl_games(season, num_games)
+        synthetic_fixtures.write_bdl_pages(directory, "games", games, **{"seasons[]": [season]})
+        synthetic_fixtures.write_bdl_pages(directory, "stats", synthetic_fixtures.get_bdl_stats(games, players), **{"seasons[]": [season]})
+
+        queries.extend([("games", {"seasons": [season]}), ("stats", {"seasons": [season]})])
+
+    return queries
+
+def run_query(api, query):
+    """
+    Runs the passed query through the passed object and returns its items along with the number of rows of their DataFrame.
+
+    :param api: A BallDontLieAPI object.
+    :param query: A (query type, query parameters) tuple.
+    :return: A tuple holding the list of items retrieved and the number of rows of the DataFrame converted from them.
+    """
+    query_type, query_params = query
+    data = api.query(query_type=query_type, **query_params)
+
+    return data, len(api.pandas_convert(data))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress tests concurrent BallDontLieAPI queries.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3, help="The number of times every query is submitted in each concurrent run.")
+    parser.add_argument("--seasons", type=int, nargs="+", default=[2017, 2018, 2019])
+    parser.add_argument("--games", type=int, default=300, help="The number of games of each season.")
+    parser.add_argument("--max-concurrent-pages", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--throttle-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        queries = write_fixtures(temp_dir, args.seasons, args.games)
+
+        with StandInServer(temp_dir, latency=args.latency, throttle_rate=args.throttle_rate, retry_after=0, seed=0) as server:
+            replay.configure(replay.STAND_IN, temp_dir, server.url)
+            limiter = RateLimiter(rate=1000000, base_backoff=0.01)
+
+            start = time.perf_counter()
+            expected = [run_query(BallDontLieAPI(rate_limiter=limiter), query) for query in queries]
+            print("serial: %d queries in %.2fs" % (len(queries), time.perf_counter() - start))
+
+            submitted = queries * args.rounds
+            shared_api = BallDontLieAPI(args.max_concurrent_pages, limiter)
+            runs = {
+                "own object per query": lambda query: run_query(BallDontLieAPI(args.max_concurrent_pages, limiter), query),
+                "one shared object": lambda query: run_query(shared_api, query)
+            }
+
+            for name, func in runs.items():
+                start = time.perf_counter()
+
+                with ThreadPoolExecutor(max_workers=args.threads) as executor:
+                    results = list(executor.map(func, submitted))
+
+                elapsed = time.perf_counter() - start
+                mismatches = sum(result != expected[i % len(queries)] for i, result in enumerate(results))
+
+                print("%s: %d queries on %d threads in %.2fs, %d mismatches" % (name, len(submitted), args.threads, elapsed, mismatches))
+
+                if mismatches:
+                    sys.exit(1)
+
+            print("Stand-in server: %d requests served, %d throttled" % (server.requests_served, server.requests_throttled))
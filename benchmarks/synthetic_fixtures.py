@@ -0,0 +1,406 @@
+"""
+Generates synthetic basketball-reference.com pages and balldontlie API responses in the fixture format used by `net/replay.py`, so that the pipeline can be run and benchmarked with no network access when no recorded fixtures are available.
+
+The pages mirror the structure the scrapers rely upon (table ids, row classes, data-stat attributes, multi-team rows and the division/conference standings split), filled with deterministic pseudo-random values.
+"""
+
+import json
+import os
+import random
+import sys
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+datadir = os.path.join(os.path.dirname(currentdir), "data")
+sys.path.append(datadir)
+
+import net.replay as replay
+
+BBREF_URL = "https://www.basketball-reference.com/"
+BDL_URL = "https://www.balldontlie.io/api/v1/"
+
+TEAMS = ["ATL", "BOS", "BRK", "CHO", "CHI", "CLE", "DET", "IND", "MIA", "MIL", "NYK", "ORL", "PHI", "TOR", "WAS",
+         "DAL", "DEN", "GSW", "HOU", "LAC", "LAL", "MEM", "MIN", "NOP", "OKC", "PHO", "POR", "SAC", "SAS", "UTA"]
+POSITIONS = ["PG", "SG", "SF", "PF", "C"]
+
+PER_GAME_COLS = ["mp_per_g", "fg_per_g", "fga_per_g", "fg_pct", "fg3_per_g", "fg3a_per_g", "fg3_pct", "fg2_per_g", "fg2a_per_g", "fg2_pct", "efg_pct",
+                 "ft_per_g", "fta_per_g", "ft_pct", "orb_per_g", "drb_per_g", "trb_per_g", "ast_per_g", "stl_per_g", "blk_per_g", "tov_per_g", "pf_per_g", "pts_per_g"]
+ADVANCED_COLS = ["mp", "per", "ts_pct", "fg3a_per_fga_pct", "fta_per_fga_pct", "orb_pct", "drb_pct", "trb_pct", "ast_pct", "stl_pct", "blk_pct", "tov_pct", "usg_pct",
+                 "ws-dum", "ows", "dws", "ws", "ws_per_48", "bpm-dum", "obpm", "dbpm", "bpm", "vorp"]
+LEADER_FIELDS = ["pts_per_g", "trb_per_g", "ast_per_g", "stl_per_g", "blk_per_g", "tov_per_g"]    # efg_pct is left out, as it is on the real page
+
+# The basketball-reference seasons in which stats were first recorded; earlier seasons have empty cells and no league leaders for them, as on the real pages
+FIRST_RECORDED_SEASONS = {"stl_per_g": 1974, "blk_per_g": 1974, "tov_per_g": 1978, "fg3_per_g": 1980, "fg3a_per_g": 1980, "fg3_pct": 1980, "bpm": 1974, "obpm": 1974, "dbpm": 1974, "vorp": 1974}
+
+def get_players(season, num_players=450):
+    """
+    Returns a deterministic list of synthetic players for the passed season, where some players are traded mid-season.
+
+    :param season: The basketball-reference season the players belong to.
+    :param num_players: The number of distinct players in the season.
+    :return: A list of dictionaries, each holding the id, name, position, age, stats and team stints of a player.
+    """
+    rng = random.Random(season)
+    players = []
+
+    for i in range(num_players):
+        stints = [(rng.choice(TEAMS), rng.randint(1, 82))]
+
+        if rng.random() < 0.1:     # Roughly one in ten players plays for a second team
+            stints.append((rng.choice(TEAMS), rng.randint(1, 40)))
+
+        stats = {col: "%.3f" % rng.random() if col.endswith("pct") else "%.1f" % (rng.random() * 30) for col in PER_GAME_COLS + ADVANCED_COLS}
+        stats["fg3_pct"] = "" if rng.random() < 0.05 else stats["fg3_pct"]     # Players who never attempted a three have an empty cell
+        stats.update({col: "" for col, first_season in FIRST_RECORDED_SEASONS.items() if season < first_season})
+
+        players.append({
+            "id": "player%03d%02d" % (i, season % 100),
+            "name": "Player %d" % i,
+            "pos": rng.choice(POSITIONS),
+            "age": str(rng.randint(19, 40)),
+            "stints": stints,
+            "stats": stats
+        })
+
+    return players
+
+def get_player_rows(players, cols, get_values):
+    """
+    Returns the <tr> rows of a per-player table, with a TOT row followed by one partial row per team for traded players.
+
+    :param players: A list of synthetic players.
+    :param cols: The data-stat names of the stat columns of the table.
+    :param get_values: A function returning the dictionary of stat values of a player.
+    :return: A string of HTML rows.
+    """
+    rows = []
+
+    for rank, player in enumerate(players, start=1):
+        stints = player["stints"]
+        traded = len(stints) > 1
+
+        if traded:
+            stints = [("TOT", sum(games for _, games in stints))] + stints
+
+        for stint_index, (team, games) in enumerate(stints):
+            row_class = "partial_table" if traded and stint_index > 0 else "full_table"
+            cells = [
+                f'<th scope="row" class="right " data-stat="ranker" csk="{rank}">{rank}</th>',
+                f'<td class="left " data-append-csv="{player["id"]}" data-stat="player" csk="{player["name"]}"><a href="/players/p/{player["id"]}.html">{player["name"]}</a></td>',
+                f'<td class="center " data-stat="pos">{player["pos"]}</td>',
+                f'<td class="right " data-stat="age">{player["age"]}</td>',
+                f'<td class="left " data-stat="team_id"><a href="/teams/{team}/2020.html">{team}</a></td>' if team != "TOT" else '<td class="left " data-stat="team_id">TOT</td>',
+                f'<td class="right " data-stat="g">{games}</td>',
+                f'<td class="right " data-stat="gs">{games // 2}</td>'
+            ]
+            values = get_values(player)
+            cells.extend(f'<td class="right " data-stat="{col}">{values[col] if not col.endswith("-dum") else ""}</td>' for col in cols)
+
+            rows.append(f'<tr class="{row_class}" >' + "".join(cells) + "</tr>")
+
+    return "\n".join(rows)
+
+def wrap_page(title, body, padding_kb):
+    """
+    Returns a full HTML page holding the passed body, padded with commented-out tables and navigation to approach the size of a real basketball-reference page.
+
+    :param title: The title of the page.
+    :param body: The HTML of the page's content.
+    :param padding_kb: The approximate number of kilobytes of padding to be added.
+    :return: A string holding the HTML of the page.
+    """
+    filler_row = '<tr><td data-stat="filler">' + "x" * 80 + "</td></tr>"
+    filler_table = '<div class="table_container"><!--\n<table id="filler">' + filler_row * 10 + "</table>\n--></div>"
+    navigation = '<div id="nav"><ul>' + '<li><a href="/leagues/">Seasons</a></li>' * 20 + "</ul></div>"
+    padding = (filler_table + navigation) * max(1, padding_kb * 1024 // (len(filler_table) + len(navigation)))
+
+    return f"<!DOCTYPE html>\n<html><head><title>{title}</title></head><body><div id=\"wrap\">{body}{padding}</div></body></html>"
+
+def get_per_game_page(season, players, padding_kb=500):
+    """
+    Returns the HTML of the per game stats page of the passed season.
+
+    :param season: The basketball-reference season of the page.
+    :param players: A list of synthetic players.
+    :param padding_kb: The approximate size of padding added to the page.
+    :return: A string holding the HTML of the page.
+    """
+    header = "".join(f'<th aria-label="{col}" data-stat="{col}">{col}</th>' for col in ["ranker", "player", "pos", "age", "team_id", "g", "gs"] + PER_GAME_COLS)
+    body = f'<table class="sortable stats_table" id="per_game_stats"><thead><tr>{header}</tr></thead><tbody>{get_player_rows(players, PER_GAME_COLS, lambda player: player["stats"])}</tbody></table>'
+
+    return wrap_page(f"{season} NBA Player Stats: Per Game", body, padding_kb)
+
+def get_advanced_page(season, players, padding_kb=500):
+    """
+    Returns the HTML of the advanced stats page of the passed season.
+
+    :param season: The basketball-reference season of the page.
+    :param players: A list of synthetic players.
+    :param padding_kb: The approximate size of padding added to the page.
+    :return: A string holding the HTML of the page.
+    """
+    header = "".join(f'<th aria-label="{col}" data-stat="{col}">{col}</th>' for col in ["ranker", "player", "pos", "age", "team_id", "g"] + ADVANCED_COLS)
+    body = f'<table class="sortable stats_table" id="advanced_stats"><thead><tr>{header}</tr></thead><tbody>{get_player_rows(players, ADVANCED_COLS, lambda player: player["stats"])}</tbody></table>'
+
+    return wrap_page(f"{season} NBA Player Stats: Advanced", body, padding_kb)
+
+def get_awards_page(season, players, padding_kb=300, num_voted=15):
+    """
+    Returns the HTML of the awards page of the passed season, where the first players received MVP votes.
+
+    :param season: The basketball-reference season of the page.
+    :param players: A list of synthetic players.
+    :param padding_kb: The approximate size of padding added to the page.
+    :param num_voted: The number of players who received MVP votes.
+    :return: A string holding the HTML of the page.
+    """
+    rng = random.Random(season * 7)
+    voted = players[:num_voted]
+    points_max = 1010
+    rows = []
+    points_left = points_max
+
+    for rank, player in enumerate(voted, start=1):
+        points_won = max(1, points_left // 3)
+        points_left -= points_won
+        rows.append(
+            f'<tr><th scope="row" data-stat="rank">{rank}</th>'
+            f'<td class="left " data-append-csv="{player["id"]}" data-stat="player" csk="{player["name"]}"><a href="/players/p/{player["id"]}.html">{player["name"]}</a></td>'
+            f'<td data-stat="age">{player["age"]}</td><td data-stat="team_id">{player["stints"][0][0]}</td>'
+            f'<td data-stat="votes_first">{rng.randint(0, 100) if rank < 4 else 0}</td><td data-stat="points_won">{points_won}.0</td>'
+            f'<td data-stat="points_max">{points_max}</td><td data-stat="award_share">{points_won / points_max:.3f}</td>'
+            f'<td data-stat="g">{player["stints"][0][1]}</td><td data-stat="pts_per_g">{player["stats"]["pts_per_g"]}</td></tr>'
+        )
+
+    body = f'<table class="sortable stats_table" id="mvp"><tbody>{"".join(rows)}</tbody></table>'
+
+    return wrap_page(f"{season} NBA Awards Voting", body, padding_kb)
+
+def get_standings_page(season, padding_kb=400, num_teams=len(TEAMS)):
+    """
+    Returns the HTML of the season summary page holding the standings of the passed season, split by conference from 2016 onwards and by division before.
+
+    :param season: The basketball-reference season of the page.
+    :param padding_kb: The approximate size of padding added to the page.
+    :param num_teams: The number of teams in the standings; teams beyond the 30 real ones are given numbered ids (e.g., "ATL1").
+    :return: A string holding the HTML of the page.
+    """
+    rng = random.Random(season * 11)
+    tables = []
+    conference_tables = season >= 2016     # Mirrors the standings split handled by `team_records.get_team_record_map()`
+    teams = [TEAMS[i % len(TEAMS)] + (str(i // len(TEAMS)) if i >= len(TEAMS) else "") for i in range(num_teams)]
+
+    for conference, teams in (("E", teams[:num_teams // 2]), ("W", teams[num_teams // 2:])):
+        table_id = f"confs_standings_{conference}" if conference_tables else f"divs_standings_{conference}"
+        rows = []
+
+        for i, team in enumerate(teams):
+            if not conference_tables and i % 5 == 0:
+                rows.append(f'<tr class="thead"><th colspan="8">Division {i // 5 + 1}</th></tr>')
+
+            wins = rng.randint(15, 67)
+            rows.append(
+                f'<tr class="full_table"><th scope="row" class="left " data-stat="team_name"><a href="/teams/{team}/{season}.html">Team {team}</a></th>'
+                f'<td data-stat="wins">{wins}</td><td data-stat="losses">{82 - wins}</td><td data-stat="win_loss_pct">{wins / 82:.3f}</td></tr>'
+            )
+
+        tables.append(f'<table class="standings_confs" id="{table_id}"><thead><tr><th aria-label="Conference" data-stat="team_name">Team</th></tr></thead><tbody>{"".join(rows)}</tbody></table>')
+
+    return wrap_page(f"{season} NBA Season Summary", "".join(tables), padding_kb)
+
+def get_leaders_page(season, players, padding_kb=600):
+    """
+    Returns the HTML of the league leaders page of the passed season.
+
+    :param season: The basketball-reference season of the page.
+    :param players: A list of synthetic players.
+    :param padding_kb: The approximate size of padding added to the page.
+    :return: A string holding the HTML of the page.
+    """
+    divs = []
+
+    for field in [field for field in LEADER_FIELDS if season >= FIRST_RECORDED_SEASONS.get(field, 0)]:
+        ranked = sorted(players, key=lambda player: float(player["stats"][field]), reverse=True)[:20]
+        rows = []
+
+        for rank, player in enumerate(ranked, start=1):
+            row_class = ' class="first_place"' if rank == 1 else ""
+            rows.append(f'<tr{row_class}><td class="rank">{rank}.</td><td class="who"><a href="/players/p/{player["id"]}.html">{player["name"]}</a></td><td class="value">{player["stats"][field]}</td></tr>')
+
+        divs.append(f'<div id="leaders_{field}" class="data_grid_box"><table class="columns">{"".join(rows)}</table></div>')
+
+    return wrap_page(f"{season} NBA Leaders", "".join(divs), padding_kb)
+
+def write_page(directory, url, html):
+    """
+    Writes the passed HTML to the fixture directory as the recorded response to the passed URL.
+
+    :param directory: The fixture directory.
+    :param url: The URL the page is served from.
+    :param html: A string holding the HTML of the page.
+    """
+    replay.save_fixture(url, None, FixtureResponse(200, "OK", "text/html", html.encode()), directory)
+
+def write_season_pages(directory, season, num_players=450, padding_kb=500):
+    """
+    Writes every basketball-reference page scraped when building the passed season to the fixture directory.
+
+    :param directory: The fixture directory.
+    :param season: The balldontlie season, as passed to `load_data.download_mvp_stats()`.
+    :param num_players: The number of players in the season.
+    :param padding_kb: The approximate size of padding added to the larger pages.
+    """
+    bbref_season = season + 1
+    players = get_players(bbref_season, num_players)
+
+    write_page(directory, BBREF_URL + f"leagues/NBA_{bbref_season}_per_game.html", get_per_game_page(bbref_season, players, padding_kb))
+    write_page(directory, BBREF_URL + f"leagues/NBA_{bbref_season}_advanced.html", get_advanced_page(bbref_season, players, padding_kb))
+    write_page(directory, BBREF_URL + f"awards/awards_{bbref_season}.html#mvp", get_awards_page(bbref_season, players, padding_kb // 2))
+    write_page(directory, BBREF_URL + f"leagues/NBA_{bbref_season}.html", get_standings_page(bbref_season, padding_kb))
+    write_page(directory, BBREF_URL + f"leagues/NBA_{bbref_season}_leaders.html", get_leaders_page(bbref_season, players, padding_kb))
+
+def write_bdl_pages(directory, endpoint, records, per_page=100, **query_params):
+    """
+    Writes the paginated balldontlie responses holding the passed records to the fixture directory, using the same query parameters `BDLQuery` sends.
+
+    :param directory: The fixture directory.
+    :param endpoint: The endpoint of the API (e.g., "stats").
+    :param records: A list of the JSON objects returned across all pages.
+    :param per_page: The number of records per page.
+    :param **query_params: The already formatted query parameters of the request (e.g., {"seasons[]": [2019]}).
+    """
+    total_pages = max(1, -(-len(records) // per_page))
+
+    for page in range(1, total_pages + 1):
+        body = {
+            "data": records[(page - 1) * per_page: page * per_page],
+            "meta": {
+                "total_pages": total_pages,
+                "current_page": page,
+                "next_page": page + 1 if page < total_pages else None,
+                "per_page": per_page,
+                "total_count": len(records)
+            }
+        }
+        params = dict(query_params, page=page, per_page=per_page)
+
+        replay.save_fixture(BDL_URL + endpoint, params, FixtureResponse(200, "OK", "application/json", json.dumps(body).encode()), directory)
+
+def get_bdl_players(num_players=3000):
+    """
+    Returns a deterministic list of synthetic balldontlie player objects.
+
+    :param num_players: The number of players to be returned.
+    :return: A list of player JSON objects, with ids counting up from 1.
+    """
+    rng = random.Random(0)
+
+    return [{
+        "id": i,
+        "first_name": "First%d" % i,
+        "last_name": "Last%d" % i,
+        "position": rng.choice(["G", "F", "C", ""]),
+        "height_feet": None,
+        "height_inches": None,
+        "weight_pounds": None,
+        "team": {"id": i % 30 + 1, "abbreviation": TEAMS[i % 30], "city": "City", "conference": "East", "division": "Atlantic", "full_name": "Team " + TEAMS[i % 30], "name": TEAMS[i % 30]}
+    } for i in range(1, num_players + 1)]
+
+def get_bdl_games(season, num_games=1230):
+    """
+    Returns a deterministic list of synthetic balldontlie game objects from the passed season.
+
+    :param season: The balldontlie season of the games.
+    :param num_games: The number of games to be returned.
+    :return: A list of game JSON objects.
+    """
+    rng = random.Random(season)
+    games = []
+
+    for i in range(1, num_games + 1):
+        home, visitor = rng.sample(range(30), 2)
+        month = (10 + i * 8 // num_games) % 12 + 1     # November through July
+        games.append({
+            "id": season * 10000 + i,
+            "date": "%d-%02d-%02dT00:00:00.000Z" % (season + (month < 8), month, i % 28 + 1),
+            "home_team_score": rng.randint(80, 140),
+            "visitor_team_score": rng.randint(80, 140),
+            "season": season,
+            "period": 4,
+            "status": "Final",
+            "time": " ",
+            "postseason": False,
+            "home_team": {"id": home + 1, "abbreviation": TEAMS[home], "city": "City", "conference": "East", "division": "Atlantic", "full_name": "Team " + TEAMS[home], "name": TEAMS[home]},
+            "visitor_team": {"id": visitor + 1, "abbreviation": TEAMS[visitor], "city": "City", "conference": "West", "division": "Pacific", "full_name": "Team " + TEAMS[visitor], "name": TEAMS[visitor]}
+        })
+
+    return games
+
+def get_bdl_stats(games, players, players_per_game=20):
+    """
+    Returns a deterministic list of synthetic balldontlie stat objects, one per player appearing in each passed game.
+
+    :param games: A list of game JSON objects.
+    :param players: A list of player JSON objects.
+    :param players_per_game: The number of players appearing in each game.
+    :return: A list of stat JSON objects.
+    """
+    rng = random.Random(len(games))
+    stats = []
+
+    for game in games:
+        for i, player in enumerate(rng.sample(players, players_per_game)):
+            stat_id = game["id"] * 100 + i     # Unique across seasons, as stat ids are in the API
+            minutes = rng.randint(0, 48)
+            stats.append({
+                "id": stat_id,
+                "ast": rng.randint(0, 15), "blk": rng.randint(0, 5), "dreb": rng.randint(0, 12), "fg3_pct": round(rng.random(), 3),
+                "fg3a": rng.randint(0, 12), "fg3m": rng.randint(0, 6), "fg_pct": round(rng.random(), 3), "fga": rng.randint(0, 25),
+                "fgm": rng.randint(0, 15), "ft_pct": round(rng.random(), 3), "fta": rng.randint(0, 12), "ftm": rng.randint(0, 10),
+                "min": "%d:%02d" % (minutes, rng.randint(0, 59)), "oreb": rng.randint(0, 6), "pf": rng.randint(0, 6), "pts": rng.randint(0, 50),
+                "reb": rng.randint(0, 18), "stl": rng.randint(0, 5), "turnover": rng.randint(0, 7),
+                "game": {key: game[key] for key in ["id", "date", "home_team_score", "visitor_team_score", "season", "period", "status", "time", "postseason"]} | {"home_team_id": game["home_team"]["id"], "visitor_team_id": game["visitor_team"]["id"]},
+                "player": {key: player[key] for key in ["id", "first_name", "last_name", "position", "height_feet", "height_inches", "weight_pounds"]} | {"team_id": player["team"]["id"]},
+                "team": player["team"]
+            })
+
+    return stats
+
+class FixtureResponse():
+    """
+    A minimal response object accepted by `replay.save_fixture()`.
+    """
+
+    def __init__(self, status_code, reason, content_type, content):
+        """
+        Constructor method; creates a FixtureResponse object from the parts of a response.
+
+        :param status_code: The status code of the response.
+        :param reason: The reason phrase of the response.
+        :param content_type: The value of the Content-Type header.
+        :param content: The body (bytes) of the response.
+        """
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = {"Content-Type": content_type}
+        self.content = content
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Writes synthetic fixtures for offline runs and benchmarks.")
+    parser.add_argument("--fixtures", default=replay.fixture_dir, help="The fixture directory to write to.")
+    parser.add_argument("--first-season", type=int, default=2000)
+    parser.add_argument("--last-season", type=int, default=2020)
+    parser.add_argument("--bdl-season", type=int, default=2019, help="The season for which balldontlie games and stats are written.")
+    args = parser.parse_args()
+
+    for season in range(args.first_season, args.last_season + 1):
+        write_season_pages(args.fixtures, season)
+
+    bdl_players = get_bdl_players()
+    bdl_games = get_bdl_games(args.bdl_season)
+    write_bdl_pages(args.fixtures, "players", bdl_players)
+    write_bdl_pages(args.fixtures, "games", bdl_games, **{"seasons[]": [args.bdl_season]})
+    write_bdl_pages(args.fixtures, "stats", get_bdl_stats(bdl_games, bdl_players), **{"seasons[]": [args.bdl_season]})
+
+    print(f"Wrote fixtures to {args.fixtures}")
@@ -3,16 +3,24 @@ A class to handle all methods related to interacting with the balldontlie API (h
 """
 
 from .to_pandas import *
+from .box_score_store import BOX_SCORE_STORE, QUERY_TYPES as STORED_QUERY_TYPES
 
 MAX_SEASON_STATS_IDS = 400
 
 class BallDontLieAPI(BDLToPandas):
 
-    def __init__(self):
+    def __init__(self, max_concurrent_pages=1, rate_limiter=None, player_registry=None, use_local_store=False, box_score_store=None):
         """ 
         Initializes a BallDontLieAPI object, complete wit the ability query and convert the results to a pandas DataFrame object.
+
+        :param max_concurrent_pages: The maximum number of pages requested at the same time when all pages of a query are retrieved. Pages are requested one at a time by default; `DEFAULT_MAX_CONCURRENT_PAGES` is a reasonable value for large queries.
+        :param rate_limiter: The RateLimiter object every request waits on. The shared `RATE_LIMITER`, sized to the API's published limit, by default.
+        :param player_registry: The PlayerRegistry object from which player IDs and names are read. The shared `PLAYER_REGISTRY`, stored on disk, by default.
+        :param use_local_store: A boolean corresponding to whether or not stats and games queries should be answered from the local box score store, which only requests the dates it does not hold yet from the API. Queries that pass none of `seasons`, `dates` or `start_date` are still sent to the API directly. False by default.
+        :param box_score_store: The BoxScoreStore object used when `use_local_store` is TRUE. The shared `BOX_SCORE_STORE` by default.
         """
-        BDLToPandas.__init__(self)
+        BDLToPandas.__init__(self, max_concurrent_pages, rate_limiter, player_registry)
+        self.box_score_store = (box_score_store or BOX_SCORE_STORE) if use_local_store else None
 
     def query(self, query_type=None, single_page=False, all_seasons=True, **query_params):
         """
@@ -26,16 +34,20 @@ class BallDontLieAPI(BDLToPandas):
         :param single_page: A boolean corresponding to whether or not the user would like to query only a singular page of the API rather than accessing all pages available from the specified parameters. False by default.
         :param all_seasons: A boolean value representing whether or not all seasons should be accessed in the query. Exclusive to the "season_stats" query type.
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions). NOTE: Only entering a singular query keyword parameter of `player_id` with an integer value will get a singular player.
+        :return: A list of the items retrieved by the query, or the JSON object of the page retrieved if `single_page` is TRUE. The same data is held by the object until its next query, but threads sharing the object should use the returned value.
         """
         if single_page:
-            self.__single_page_query(query_type=query_type, **query_params)
+            return self.__single_page_query(query_type=query_type, **query_params)
+        elif self.__is_stored_query(query_type, query_params):
+            self.data = self.box_score_store.query(self, query_type, **query_params)
+            return self.data
         else:
             if query_type == "stats":
-                self.query_all_stats(**query_params)
+                return self.query_all_stats(**query_params)
             elif query_type == "players":
-                self.query_all_players(**query_params)
+                return self.query_all_players(**query_params)
             elif query_type == "games":
-                self.query_all_games(**query_params)
+                return self.query_all_games(**query_params)
             elif query_type == "season_stats":
                 start_season = None
                 end_season = None
@@ -44,7 +56,52 @@ class BallDontLieAPI(BDLToPandas):
                     start_season = FIRST_BDL_SEASON
                     end_season = CURRENT_NBA_SEASON
 
-                self.query_all_season_stats(**query_params, start_season=start_season, end_season=end_season)
+                return self.query_all_season_stats(**query_params, start_season=start_season, end_season=end_season)
+
+    def iter_query(self, query_type=None, as_dataframes=False, chunk_size=PER_PAGE, **query_params):
+        """
+        Performs a query of the passed type and yields its items as their pages arrive, rather than returning them once every page has been retrieved. Memory use stays bounded regardless of the number of items, and the held data is left untouched. For example, a season of stats may be written to disk chunk by chunk with:
+
+            for df in api.iter_query(query_type="stats", as_dataframes=True, chunk_size=10000, seasons=[2019]):
+                df.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+        :param query_type: The type of query to be performed. Acceptable inputs are:
+            - stats
+            - players
+            - games
+            - season_stats
+        :param as_dataframes: A boolean corresponding to whether pandas DataFrames of at most `chunk_size` rows (if TRUE) or individual JSON objects (if FALSE) should be yielded.
+        :param chunk_size: The maximum number of rows of each yielded DataFrame. Only used if `as_dataframes` is TRUE.
+        :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A generator of JSON objects or pandas DataFrames.
+        """
+        if self.__is_stored_query(query_type, query_params):
+            items = self.box_score_store.iter_query(self, query_type, **query_params)
+        elif query_type == "stats":
+            items = self.iter_stats(**query_params)
+        elif query_type == "players":
+            items = self.iter_players(**query_params)
+        elif query_type == "games":
+            items = self.iter_games(**query_params)
+        elif query_type == "season_stats":
+            items = self.iter_season_stats(**query_params)
+        else:
+            raise ValueError("Unknown query type '%s'; acceptable types are stats, players, games and season_stats" % query_type)
+
+        if as_dataframes:
+            return self.iter_dataframes(items, chunk_size)
+
+        return items
+
+    def __is_stored_query(self, query_type, query_params):
+        """
+        Returns a boolean corresponding to whether or not a query of the passed type and parameters is answered from the local box score store.
+
+        :param query_type: The type of query to be performed.
+        :param query_params: A dictionary of the parameters of the query.
+        :return: TRUE if the object uses the local store, the store holds items of the passed type and the query covers a bounded range of dates (see `BoxScoreStore.is_bounded()`), FALSE otherwise.
+        """
+        return self.box_score_store is not None and query_type in STORED_QUERY_TYPES and self.box_score_store.is_bounded(**query_params)
 
     def __single_page_query(self, query_type=None, **query_params):
         """
@@ -52,9 +109,10 @@ class BallDontLieAPI(BDLToPandas):
 
         :param query_type: The type of query to be performed.
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call.
+        :return: The JSON object of the page retrieved.
         """
         if query_type == "stats":
-            self.query_stats(**query_params)
+            return self.query_stats(**query_params)
 
     def get_json(self):
         """
@@ -94,10 +152,16 @@ class BallDontLieAPI(BDLToPandas):
         if players:
             player_ids = []
 
+            self.player_registry.refresh(self)
+
             for player in players:
-                self.query(query_type="players", search=player)
-                player_json = self.get_json()
-                player_id = self.__get_player_id_from_json(player_json, 0)
+                matches = self.player_registry.search(player)
+
+                if matches:
+                    player_id = matches[0]["id"]
+                else:   # falls back to the API in case the player was added since the registry was last synced
+                    player_json = self.get_page_json(players_url, {"search": player})
+                    player_id = self.__get_player_id_from_json(player_json, 0)
 
                 player_ids.append(player_id)
 
@@ -116,45 +180,33 @@ class BallDontLieAPI(BDLToPandas):
 
         return player_json["data"][index]["id"]
 
-    def __get_player_id_from_data(self, index):
-        """
-        Returns the player ID at the specified index of the data stored within the object.
-
-        :param index: An index in the stored data that holds a player JSON object.
-        :return: The player ID held by the stored data at the specified index.
-        """
-        if index not in range(0, len(self.data)):
-            raise Exception("Index %d not in range of stored data; acceptable range is [0, %d]" % (index, len(self.data) - 1))
-
-        return self.data[index]["id"]
-
     def get_all_player_ids(self):
         """
-        Returns all of the player IDs present in the balldontlie API.
+        Returns all of the player IDs present in the balldontlie API, as held by the player registry. The registry is only synced with the API (fetching the players added since the last sync) once it is stale.
 
         :return: A list containing all of the player IDs (int) in the balldontlie API.
         """
-        self.query(query_type="players")
-
-        ids = []
+        self.player_registry.refresh(self)
 
-        for i in range(len(self.data)):
-            ids.append(self.__get_player_id_from_data(i))
-
-        return ids
+        return self.player_registry.get_player_ids()
 
     def load_full_season_stats(self, season):
         """
         Loads the season averages of all of the players who played in the passed season.
         
         :param season: The season from which season averages will be loaded.
+        :return: A list of the season averages retrieved, which are also held by the object.
         """
         ids = self.get_all_player_ids()
         num_players = len(ids)
 
-        self.clear_data()
+        data = []
 
         # Without passing a smaller subset of the IDs list, the API returns a 414 error
         for i in range(0, num_players, MAX_SEASON_STATS_IDS):
             round_ids = ids[i:min(num_players + 1, i + 400)]
-            self.query_all_season_stats(player_ids=round_ids, reset_data=False, season=season)
+            data.extend(self.query_all_season_stats(player_ids=round_ids, reset_data=True, season=season))
+
+        self.data = data
+
+        return data
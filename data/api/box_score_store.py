@@ -0,0 +1,331 @@
+"""
+A local SQLite store of the box scores (games and per-player game stats) of the balldontlie API, indexed by player, game, season and date. The store records which date ranges it holds in full, so that queries are answered locally and the API is only asked for the dates the store does not hold yet.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, timedelta
+
+from .query import FIRST_BDL_SEASON
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "box_scores.sqlite")
+
+# The dates between which the games of a season are played, wide enough for lockout and bubble seasons (e.g., the 2019 season ended in October 2020)
+SEASON_START = (8, 1)
+SEASON_END = (10, 31)
+
+QUERY_TYPES = ["stats", "games"]
+INSERT_BATCH_SIZE = 1000
+
+# The query parameters answered by the store, mapped to the column they filter
+FILTER_COLUMNS = {
+    "stats": {"player_ids": "player_id", "game_ids": "game_id", "seasons": "season", "dates": "date", "team_ids": "team_id", "postseason": "postseason"},
+    "games": {"game_ids": "id", "seasons": "season", "dates": "date", "team_ids": ("home_team_id", "visitor_team_id"), "postseason": "postseason"}
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    season INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    home_team_id INTEGER,
+    visitor_team_id INTEGER,
+    postseason INTEGER,
+    item TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_season ON games (season);
+CREATE INDEX IF NOT EXISTS games_date ON games (date);
+
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY,
+    player_id INTEGER,
+    game_id INTEGER,
+    team_id INTEGER,
+    season INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    postseason INTEGER,
+    item TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stats_player_id ON stats (player_id);
+CREATE INDEX IF NOT EXISTS stats_game_id ON stats (game_id);
+CREATE INDEX IF NOT EXISTS stats_season ON stats (season);
+CREATE INDEX IF NOT EXISTS stats_date ON stats (date);
+
+CREATE TABLE IF NOT EXISTS coverage (
+    query_type TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    PRIMARY KEY (query_type, start_date)
+);
+"""
+
+class BoxScoreStore():
+
+    def __init__(self, path=STORE_PATH):
+        """
+        Constructor method; creates a BoxScoreStore object stored at the passed path. The database is created the first time the store is used.
+
+        :param path: The path of the SQLite database file.
+        """
+        self.path = path
+
+        self.__fill_lock = threading.Lock()     # Ensures a date range requested by several threads at once is only retrieved once
+        self.__schema_created = False
+
+    def query(self, client, query_type, **query_params):
+        """
+        Returns the items of the passed query, retrieving the dates it covers that are not held yet from the API first.
+
+        :param client: The BDLQuery object through which missing dates are retrieved.
+        :param query_type: Either "stats" or "games".
+        :param **query_params: Keyword arguments corresponding to parameters of the API call (see https://www.balldontlie.io/). Accepted parameters are `seasons`, `dates`, `start_date`, `end_date`, `player_ids` (stats only), `game_ids`, `team_ids` and `postseason`; at least one of `seasons`, `dates` or `start_date` must be passed.
+        :return: A list of the JSON objects of the matching items, ordered by ID.
+        """
+        return list(self.iter_query(client, query_type, **query_params))
+
+    def iter_query(self, client, query_type, **query_params):
+        """
+        Yields the items of the passed query, retrieving the dates it covers that are not held yet from the API first. Items are read from the database as they are consumed.
+
+        :param client: The BDLQuery object through which missing dates are retrieved.
+        :param query_type: Either "stats" or "games".
+        :param **query_params: Keyword arguments corresponding to parameters of the API call (see `query()`).
+        :return: A generator of the JSON objects of the matching items, ordered by ID.
+        """
+        where, values = self.__get_where_clause(query_type, **query_params)     # Rejects unsupported parameters before anything is retrieved
+
+        for start, end in self.__get_date_ranges(**query_params):
+            self.fill(client, query_type, start, end)
+
+        with closing(self.__connect()) as connection:
+            cursor = connection.execute(f"SELECT item FROM {query_type}{where} ORDER BY id", values)
+
+            while True:
+                rows = cursor.fetchmany(INSERT_BATCH_SIZE)
+
+                if not rows:
+                    break
+
+                for (item,) in rows:
+                    yield json.loads(item)
+
+    def fill(self, client, query_type, start, end):
+        """
+        Retrieves the items of every date between the passed dates that is not held yet from the API and stores them. Dates after yesterday are retrieved every time, as their games may not be final.
+
+        :param client: The BDLQuery object through which items are retrieved.
+        :param query_type: Either "stats" or "games".
+        :param start: The first date (datetime.date) to be held.
+        :param end: The last date (datetime.date) to be held.
+        :return: The number of items retrieved.
+        """
+        retrieved = 0
+
+        with self.__fill_lock:
+            for gap_start, gap_end in self.get_missing_ranges(query_type, start, end):
+                iter_items = client.iter_stats if query_type == "stats" else client.iter_games
+                batch = []
+
+                with closing(self.__connect()) as connection:
+                    for item in iter_items(start_date=gap_start.isoformat(), end_date=gap_end.isoformat()):
+                        batch.append(item)
+
+                        if len(batch) == INSERT_BATCH_SIZE:
+                            self.__insert(connection, query_type, batch)
+                            retrieved += len(batch)
+                            batch = []
+
+                    self.__insert(connection, query_type, batch)
+                    retrieved += len(batch)
+
+                    final_end = min(gap_end, date.today() - timedelta(days=1))
+
+                    if gap_start <= final_end:
+                        self.__add_coverage(connection, query_type, gap_start, final_end)
+
+                    connection.execute("ANALYZE")   # Lets the planner pick the most selective index (e.g., player_id over season)
+
+        return retrieved
+
+    def get_missing_ranges(self, query_type, start, end):
+        """
+        Returns the ranges of dates between the passed dates that are not held by the store.
+
+        :param query_type: Either "stats" or "games".
+        :param start: The first date (datetime.date) of the range.
+        :param end: The last date (datetime.date) of the range.
+        :return: A list of (first date, last date) tuples in ascending order.
+        """
+        missing = []
+
+        for covered_start, covered_end in self.get_coverage(query_type):
+            if covered_end < start or covered_start > end:
+                continue
+
+            if covered_start > start:
+                missing.append((start, covered_start - timedelta(days=1)))
+
+            start = max(start, covered_end + timedelta(days=1))
+
+        if start <= end:
+            missing.append((start, end))
+
+        return missing
+
+    def get_coverage(self, query_type):
+        """
+        Returns the ranges of dates held in full by the store.
+
+        :param query_type: Either "stats" or "games".
+        :return: A list of non-overlapping (first date, last date) tuples in ascending order.
+        """
+        with closing(self.__connect()) as connection:
+            rows = connection.execute("SELECT start_date, end_date FROM coverage WHERE query_type = ? ORDER BY start_date", (query_type,)).fetchall()
+
+        return [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in rows]
+
+    def is_bounded(self, **query_params):
+        """
+        Returns a boolean corresponding to whether or not a query with the passed parameters covers a bounded range of dates, which the store can hold. Unbounded queries (e.g., every stat of a player) would retrieve every item of the API since its first season, so they should be sent to the API with their filters instead.
+
+        :param **query_params: Keyword arguments corresponding to parameters of the API call.
+        :return: TRUE if the query lists dates or seasons or has a start date, FALSE otherwise.
+        """
+        return bool(query_params.get("dates") or query_params.get("start_date") or query_params.get("seasons"))
+
+    def __get_date_ranges(self, **query_params):
+        """
+        Returns the ranges of dates a query with the passed parameters covers: its listed dates, the range between its start date and its end date (today by default) or the date ranges of its seasons.
+
+        :param **query_params: Keyword arguments corresponding to parameters of the API call.
+        :return: A list of (first date, last date) tuples.
+        """
+        if query_params.get("dates"):
+            dates = query_params["dates"]
+            return [(date.fromisoformat(day[:10]), date.fromisoformat(day[:10])) for day in (dates if isinstance(dates, (list, tuple)) else [dates])]
+
+        if query_params.get("start_date"):
+            start = date.fromisoformat(query_params["start_date"][:10])
+            end = date.fromisoformat(query_params["end_date"][:10]) if query_params.get("end_date") else date.today()
+            return [(start, end)]
+
+        if query_params.get("seasons"):
+            seasons = query_params["seasons"]
+            return [get_season_dates(int(season)) for season in (seasons if isinstance(seasons, (list, tuple)) else [seasons])]
+
+        raise ValueError("Queries answered by the box score store must pass `seasons`, `dates` or `start_date` (see `is_bounded()`); otherwise every item since the %d season would be retrieved" % FIRST_BDL_SEASON)
+
+    def __get_where_clause(self, query_type, **query_params):
+        """
+        Returns the WHERE clause and values selecting the items of a query with the passed parameters.
+
+        :param query_type: Either "stats" or "games".
+        :param **query_params: Keyword arguments corresponding to parameters of the API call.
+        :return: A tuple holding the WHERE clause (an empty string if every item is selected) and a list of the values it binds.
+        """
+        if query_type not in QUERY_TYPES:
+            raise ValueError("Unknown query type '%s'; the box score store holds %s" % (query_type, " and ".join(QUERY_TYPES)))
+
+        conditions = []
+        values = []
+
+        for key, value in query_params.items():
+            if key in ["page", "per_page"]:     # Every matching item is returned at once
+                continue
+
+            if key in ["start_date", "end_date"]:
+                conditions.append("date >= ?" if key == "start_date" else "date <= ?")
+                values.append(value[:10])
+                continue
+
+            if key not in FILTER_COLUMNS[query_type]:
+                raise ValueError("The box score store cannot answer the '%s' parameter of %s queries" % (key, query_type))
+
+            columns = FILTER_COLUMNS[query_type][key]
+            columns = columns if isinstance(columns, tuple) else (columns,)
+
+            if key == "postseason":
+                value = [int(str(value).lower() in ["true", "1"])]
+            elif not isinstance(value, (list, tuple)):
+                value = [value]
+
+            if key == "dates":
+                value = [day[:10] for day in value]
+
+            placeholders = ", ".join("?" * len(value))
+            conditions.append("(" + " OR ".join(f"{column} IN ({placeholders})" for column in columns) + ")")
+            values.extend(list(value) * len(columns))
+
+        if not conditions:
+            return "", values
+
+        return " WHERE " + " AND ".join(conditions), values
+
+    def __insert(self, connection, query_type, items):
+        """
+        Stores the passed items, replacing any stored item with the same ID.
+
+        :param connection: An open connection to the database.
+        :param query_type: Either "stats" or "games".
+        :param items: A list of item JSON objects.
+        """
+        if query_type == "stats":
+            rows = [(item["id"], item["player"]["id"] if item.get("player") else None, item["game"]["id"], item["team"]["id"] if item.get("team") else None,
+                     item["game"]["season"], item["game"]["date"][:10], int(bool(item["game"].get("postseason"))), json.dumps(item)) for item in items]
+            statement = "INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        else:
+            rows = [(item["id"], item["season"], item["date"][:10], item["home_team"]["id"], item["visitor_team"]["id"],
+                     int(bool(item.get("postseason"))), json.dumps(item)) for item in items]
+            statement = "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+        with connection:
+            connection.executemany(statement, rows)
+
+    def __add_coverage(self, connection, query_type, start, end):
+        """
+        Records that every date between the passed dates is held, merging the range with any range it overlaps or adjoins.
+
+        :param connection: An open connection to the database.
+        :param query_type: Either "stats" or "games".
+        :param start: The first date (datetime.date) held.
+        :param end: The last date (datetime.date) held.
+        """
+        with connection:
+            rows = connection.execute("SELECT start_date, end_date FROM coverage WHERE query_type = ? AND start_date <= ? AND end_date >= ?",
+                                      (query_type, (end + timedelta(days=1)).isoformat(), (start - timedelta(days=1)).isoformat())).fetchall()
+
+            for covered_start, covered_end in rows:
+                start = min(start, date.fromisoformat(covered_start))
+                end = max(end, date.fromisoformat(covered_end))
+
+            connection.executemany("DELETE FROM coverage WHERE query_type = ? AND start_date = ?", [(query_type, covered_start) for covered_start, _ in rows])
+            connection.execute("INSERT INTO coverage VALUES (?, ?, ?)", (query_type, start.isoformat(), end.isoformat()))
+
+    def __connect(self):
+        """
+        Opens a connection to the database, creating its tables and indexes the first time. Each call opens its own connection, so the store may be used from several threads.
+
+        :return: A sqlite3.Connection object.
+        """
+        connection = sqlite3.connect(self.path)
+
+        if not self.__schema_created:
+            connection.execute("PRAGMA journal_mode = WAL")     # Readers are not blocked while a range is being stored
+            connection.executescript(SCHEMA)
+            self.__schema_created = True
+
+        return connection
+
+def get_season_dates(season):
+    """
+    Returns the first and last dates on which games of the passed season may be played.
+
+    :param season: The balldontlie season (e.g., 2019 for the 2019-20 season).
+    :return: A tuple holding the first and last dates (datetime.date) of the season.
+    """
+    return date(season, *SEASON_START), date(season + 1, *SEASON_END)
+
+BOX_SCORE_STORE = BoxScoreStore()   # Shared by every BallDontLieAPI object using the local store that is not passed its own store
@@ -0,0 +1,183 @@
+"""
+A local registry of the players in the balldontlie API, stored on disk and indexed by player ID, so that the player list is downloaded once and then only extended with the players added since the last sync.
+"""
+
+import json
+import os
+import threading
+import time
+
+from .query import players_url, PER_PAGE
+
+import sys
+datadir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(datadir)
+
+import file_utils
+
+REGISTRY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "player_registry.json")
+SYNC_INTERVAL = 24 * 60 * 60    # Seconds after which the registry is checked for new players; players are rarely added
+
+class PlayerRegistry():
+
+    def __init__(self, path=REGISTRY_PATH, sync_interval=SYNC_INTERVAL):
+        """
+        Constructor method; creates a PlayerRegistry object stored at the passed path. Nothing is read from disk until the registry is first used.
+
+        :param path: The path of the JSON file holding the registry.
+        :param sync_interval: The number of seconds after a sync before `refresh()` checks the API for new players again.
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+
+        self.__players = None   # Maps each player ID (int) to the player's JSON object
+        self.__synced_at = 0.0
+        self.__synced_count = 0   # Number of players listed by the pages of the players endpoint read by the last sync; players added by `add_players()` are not counted
+        self.__lock = threading.RLock()
+
+    def get_player(self, player_id):
+        """
+        Returns the stored JSON object of the player with the passed ID.
+
+        :param player_id: The balldontlie ID of the player.
+        :return: The player's JSON object, or None if the player is not in the registry.
+        """
+        with self.__lock:
+            return self.__load().get(int(player_id))
+
+    def get_player_ids(self):
+        """
+        Returns the IDs of every stored player.
+
+        :return: A list of player IDs (int) in ascending order.
+        """
+        with self.__lock:
+            return sorted(self.__load())
+
+    def get_players(self):
+        """
+        Returns the JSON objects of every stored player.
+
+        :return: A list of player JSON objects ordered by player ID.
+        """
+        with self.__lock:
+            players = self.__load()
+
+            return [players[player_id] for player_id in sorted(players)]
+
+    def search(self, name):
+        """
+        Returns the stored players whose first name, last name or full name contains the passed name, ignoring case, as the API's `search` parameter does.
+
+        :param name: The name (or part of a name) to search for.
+        :return: A list of matching player JSON objects ordered by player ID.
+        """
+        name = name.lower().strip()
+        matches = []
+
+        for player in self.get_players():
+            first = (player.get("first_name") or "").lower()
+            last = (player.get("last_name") or "").lower()
+
+            if name in first or name in last or name in f"{first} {last}":
+                matches.append(player)
+
+        return matches
+
+    def add_players(self, players):
+        """
+        Adds the passed players to the registry (replacing any stored player with the same ID) and saves the registry. The players may come from any page of the players endpoint, so they do not change the page from which the next sync resumes.
+
+        :param players: A list of player JSON objects.
+        """
+        with self.__lock:
+            stored = self.__load()
+
+            for player in players:
+                stored[player["id"]] = player
+
+            self.__save()
+
+    def is_stale(self):
+        """
+        Returns a boolean corresponding to whether or not the registry should be checked for new players.
+
+        :return: TRUE if the registry is empty or was last synced more than `sync_interval` seconds ago, FALSE otherwise.
+        """
+        with self.__lock:
+            return not self.__load() or time.time() - self.__synced_at > self.sync_interval
+
+    def refresh(self, client):
+        """
+        Syncs the registry with the API if it is stale.
+
+        :param client: The BDLQuery object through which pages of the players endpoint are requested.
+        :return: A list of the IDs of the players added to the registry.
+        """
+        with self.__lock:
+            if self.is_stale():
+                return self.sync(client)
+
+        return []
+
+    def sync(self, client):
+        """
+        Adds the players added to the API since the last sync to the registry. The players endpoint lists players by ascending ID, so only the pages past those read by the last sync are requested; the registry is synced again from the first page if the API holds fewer players than it listed at the last sync.
+
+        :param client: The BDLQuery object through which pages of the players endpoint are requested.
+        :return: A list of the IDs of the players added to the registry.
+        """
+        with self.__lock:
+            players = self.__load()
+            page = self.__synced_count // PER_PAGE + 1
+            new_ids = []
+
+            while page:
+                result = client.get_page_json(players_url, {"page": page, "per_page": PER_PAGE})
+
+                if result["meta"].get("total_count", self.__synced_count) < self.__synced_count:   # Players were removed, so the page positions of the last sync no longer hold
+                    players.clear()
+                    self.__synced_count = 0
+                    page = 1
+                    continue
+
+                for player in result["data"]:
+                    if player["id"] not in players:
+                        new_ids.append(player["id"])
+
+                    players[player["id"]] = player
+
+                self.__synced_count = max(self.__synced_count, (page - 1) * PER_PAGE + len(result["data"]))
+                page = result["meta"].get("next_page")
+
+            self.__synced_at = time.time()
+            self.__save()
+
+            return new_ids
+
+    def __load(self):
+        """
+        Returns the stored players, reading them from disk the first time they are needed.
+
+        :return: A dictionary mapping each player ID to the player's JSON object.
+        """
+        if self.__players is None:
+            try:
+                with open(self.path) as f:
+                    stored = json.load(f)
+            except FileNotFoundError:
+                stored = {}
+
+            self.__players = {int(player_id): player for player_id, player in stored.get("players", {}).items()}
+            self.__synced_at = stored.get("synced_at", 0.0)
+            self.__synced_count = stored.get("synced_count", 0)     # Registries saved before the count was stored are synced from the first page
+
+        return self.__players
+
+    def __save(self):
+        """
+        Writes the registry to disk (see `file_utils.write_atomically()`).
+        """
+        file_utils.write_json_atomically(self.path, {"synced_at": self.__synced_at, "synced_count": self.__synced_count, "players": self.__players})
+
+PLAYER_REGISTRY = PlayerRegistry()  # Shared by every BallDontLieAPI object that is not passed its own registry
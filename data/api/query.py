@@ -2,91 +2,273 @@
 Handles queries of the balldontlie API and their related functions.
 """
 
-import requests
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import net.replay as replay
+import instrumentation
+
+from .rate_limiter import RateLimiter, parse_retry_after
 
 stats_url = "https://www.balldontlie.io/api/v1/stats"
 players_url = "https://www.balldontlie.io/api/v1/players"
 games_url = "https://www.balldontlie.io/api/v1/games"
 season_stats_url = "https://www.balldontlie.io/api/v1/season_averages"
-array_fields = ["dates", "seasons", "player_ids", "game_ids"]
+array_fields = ["dates", "seasons", "player_ids", "game_ids", "team_ids"]
 
 FIRST_BDL_SEASON = 1979
 CURRENT_NBA_SEASON = 2020
 
-class BDLQuery():
+PER_PAGE = 100
+DEFAULT_MAX_CONCURRENT_PAGES = 8
 
-    params = {}
-    data = []
-    query_result = []
+RATE_LIMITER = RateLimiter()    # Shared by every BDLQuery object that is not passed its own limiter, so that all threads respect the API's limit together
+
+class BDLQuery():
+    """
+    Queries the balldontlie API. Every query builds its own parameters and collects its own pages, so queries may run at the same time on several threads, whether through one object or many; the `params`, `query_result` and `data` attributes hold the parameters, last page and data of the most recently completed query.
+    """
 
-    def __init__(self):
+    def __init__(self, max_concurrent_pages=1, rate_limiter=None):
         """
         Constructor method; creates a default BDLQuery object.
+
+        :param max_concurrent_pages: The maximum number of pages requested at the same time when all pages of a query are retrieved. Pages are requested one at a time by default; when greater than 1, the remaining pages are requested concurrently once the first page reports the total number of pages.
+        :param rate_limiter: The RateLimiter object every request waits on. The module's shared `RATE_LIMITER` by default.
         """
-        pass
+        self.max_concurrent_pages = max_concurrent_pages
+        self.rate_limiter = rate_limiter or RATE_LIMITER
+
+        self.params = {}
+        self.data = []
+        self.query_result = []
+        self.__data_lock = threading.Lock()     # Guards extending the held data, which is not a single assignment
     
-    def __format_query_params(self, **query_params):
+    def format_query_params(self, **query_params):
         """
-        Formats the passed query parameters based on the accepted parameters of the balldontlie API.
+        Returns the passed query parameters formatted based on the accepted parameters of the balldontlie API.
 
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A new dictionary of the formatted query parameters.
         """
+        params = {}
+
         for key, value in query_params.items():
             if key in array_fields:    
-                self.params[key + "[]"] = value
+                params[key + "[]"] = value
             else:
-                self.params[key] = value
+                params[key] = value
+
+        return params
 
     def query_stats(self, **query_params):
         """
-        Stores the JSON object retrieved from passing the query parameters to the balldontlie statistics API.
+        Stores and returns the JSON object retrieved from passing the query parameters to the balldontlie statistics API.
 
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: The JSON object returned by the API.
         """
-        self.__format_query_params(**query_params)
-
-        r = requests.get(stats_url, params=self.params)
+        return self.__query_page(stats_url, **query_params)
 
-        self.__process_response(r)
+    def query_all_stats(self, **query_params):
+        """
+        Stores and returns a modified JSON object containing all of the stats data from the passed query parameters (ignoring the starting page number).
 
-        self.query_result = r.json()
+        :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A list of all of the items retrieved.
+        """
+        return self.__store_data(self.__query_all_data(stats_url, **query_params))
 
-    def query_all_stats(self, **query_params):
+    def __query_page(self, url, **query_params):
         """
-        Stores a modified JSON object containing all of the stats data from the passed query parameters (ignoring the starting page number).
+        Requests a single page of the passed endpoint with the passed parameters, stores the parameters and the JSON object retrieved, and returns the JSON object.
 
+        :param url: The URL of the endpoint being queried.
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: The JSON object returned by the API.
         """
-        self.__query_all_data(self.query_stats, **query_params)
+        params = self.format_query_params(**query_params)
+        query_result = self.__get_page_json(url, params)
+
+        self.params = params
+        self.query_result = query_result
+
+        return query_result
 
-    def __query_all_data(self, query_func, reset_data=True, **query_params):
+    def __query_all_data(self, url, **query_params):
         """
-        Retrieves all the data from the specified query parameters by using the passed function and stores said data.
+        Retrieves and returns all the data from the specified query parameters, storing the parameters and the last page retrieved but leaving the held data untouched.
 
-        :param query_func: The query function to be used to retrieve data.
-        :param reset_data: A boolean representing whether or not the currently held data should be replaced with the present query (if TRUE) or extended with the present query (if FALSE).
+        :param url: The URL of the endpoint being queried.
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A list of the items held by every page of the query.
         """
         data = []
+        query_result = None
 
-        self.params["page"] = 1
-        self.params["per_page"] = 100
-
-        while not self.try_query(query_func, **query_params):
-            pass
+        for query_result in self.iter_pages(url, **query_params):
+            data.extend(query_result["data"])
 
-        data.extend(self.query_result["data"])
+        self.params = dict(self.format_query_params(**query_params), page=query_result.get("meta", {}).get("current_page", 1), per_page=PER_PAGE)
+        self.query_result = query_result
 
-        while(self.__update_page_request()):
-            while not self.try_query(query_func, **query_params):
-                pass
+        return data
 
-            data.extend(self.query_result["data"])
+    def __store_data(self, data, reset_data=True):
+        """
+        Stores the passed data as the data held by the object and returns it.
 
+        :param data: A list of items retrieved from the API.
+        :param reset_data: A boolean representing whether or not the currently held data should be replaced with the passed data (if TRUE) or extended with it (if FALSE).
+        :return: The passed list of items.
+        """
         if reset_data:
             self.data = data
         else:
-            self.data.extend(data)
+            with self.__data_lock:
+                self.data = self.data + data    # A new list, so that a list returned by an earlier query is never modified
+
+        return data
+
+    def iter_pages(self, url, **query_params):
+        """
+        Yields the JSON object of every page of the passed query, in page order, as the pages arrive. When `max_concurrent_pages` is greater than 1, up to that many of the following pages are requested ahead of the page being consumed; otherwise each page is requested once the previous one has been consumed. Only those pages are held in memory at once, and the state of the object is left untouched. When instrumentation is on, the query is recorded with its wall time, bytes, statuses, retries and items (see `instrumentation.get_query_record()`).
+
+        :param url: The URL of the endpoint being queried.
+        :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A generator of page JSON objects.
+        """
+        params = self.format_query_params(**query_params)
+        params["page"] = 1
+        params["per_page"] = PER_PAGE
+
+        query_record = instrumentation.get_query_record(url, params) if instrumentation.enabled else None
+        start = time.perf_counter()
+
+        try:
+            yield from self.__iter_page_results(url, params, query_record)
+        except Exception as e:
+            if query_record is not None:
+                query_record["error"] = type(e).__name__
+
+            raise
+        finally:
+            if query_record is not None:    # Also recorded if the consumer stops early
+                query_record["seconds"] = query_record["self_seconds"] = time.perf_counter() - start
+                instrumentation.emit(query_record)
+
+    def __iter_page_results(self, url, params, query_record=None):
+        """
+        Yields the JSON object of every page of the query with the passed parameters, in page order (see `iter_pages()`), counting the responses and items of the query in the passed record.
+
+        :param url: The URL of the endpoint being queried.
+        :param params: The formatted query parameters of the first page.
+        :param query_record: A query record returned by `instrumentation.get_query_record()`, or None if instrumentation is off.
+        :return: A generator of page JSON objects.
+        """
+        query_result = self.__get_page_json_until_success(url, params, query_record)
+        yield query_result
+
+        total_pages = query_result.get("meta", {}).get("total_pages") or 1
+
+        if self.max_concurrent_pages > 1 and total_pages > 1:
+            pages = iter(range(2, total_pages + 1))
+            pending = deque()
+
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_pages) as executor:
+                try:
+                    for page in islice(pages, self.max_concurrent_pages):
+                        pending.append(executor.submit(self.__get_page_json_until_success, url, dict(params, page=page), query_record))
+
+                    while pending:
+                        query_result = pending.popleft().result()
+
+                        for page in islice(pages, 1):   # Keeps the window full as each page is consumed
+                            pending.append(executor.submit(self.__get_page_json_until_success, url, dict(params, page=page), query_record))
+
+                        yield query_result
+                finally:
+                    for future in pending:  # Stops requesting pages if the consumer stops early
+                        future.cancel()
+        else:
+            while query_result.get("meta", {}).get("next_page"):
+                query_result = self.__get_page_json_until_success(url, dict(params, page=query_result["meta"]["next_page"]), query_record)
+                yield query_result
+
+    def iter_stats(self, **query_params):
+        """
+        Yields every item of the stats query with the passed parameters as its page arrives, without holding more than a few pages in memory.
+
+        :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A generator of stat JSON objects.
+        """
+        for page in self.iter_pages(stats_url, **query_params):
+            yield from page["data"]
+
+    def iter_players(self, **query_params):
+        """
+        Yields every item of the players query with the passed parameters as its page arrives.
+
+        :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A generator of player JSON objects.
+        """
+        for page in self.iter_pages(players_url, **query_params):
+            yield from page["data"]
+
+    def iter_games(self, **query_params):
+        """
+        Yields every item of the games query with the passed parameters as its page arrives, without holding more than a few pages in memory.
+
+        :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A generator of game JSON objects.
+        """
+        for page in self.iter_pages(games_url, **query_params):
+            yield from page["data"]
+
+    def iter_season_stats(self, **query_params):
+        """
+        Yields every item of the season averages query with the passed parameters as its page arrives.
+
+        :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A generator of season average JSON objects.
+        """
+        for page in self.iter_pages(season_stats_url, **query_params):
+            yield from page["data"]
+
+    def __get_page_json_until_success(self, url, params, query_record=None):
+        """
+        Returns the JSON object retrieved from the passed URL and parameters, requesting the page again once the rate limiter allows it if a TooManyRequests exception is raised.
+
+        :param url: The URL of the endpoint being queried.
+        :param params: The formatted query parameters of the request.
+        :param query_record: The record of the query the page belongs to (see `iter_pages()`), or None.
+        :return: The JSON object returned by the API.
+        """
+        retry = False
+
+        while True:
+            try:
+                return self.__get_page_json(url, params, retry, query_record)
+            except TooManyRequests:
+                retry = True
+
+    def get_page_json(self, url, params=None):
+        """
+        Returns the JSON object of a single request of the passed URL and parameters, requesting it again if the API responds with a 429 error. The state of the object (held data, parameters and query result) is left untouched.
+
+        :param url: The URL of the endpoint being queried.
+        :param params: A dictionary of query parameters, already formatted for the API (e.g., `{"page": 2, "per_page": 100}`).
+        :return: The JSON object returned by the API.
+        """
+        return self.__get_page_json_until_success(url, params)
 
     def try_query(self, query_func, **query_params):
         """
@@ -104,110 +286,89 @@ class BDLQuery():
 
     def query_players(self, **query_params):
         """
-        Stores the JSON object retrieved from passing the query parameters to the balldontlie players API.
+        Stores and returns the JSON object retrieved from passing the query parameters to the balldontlie players API.
 
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: The JSON object returned by the API.
         """
-        self.__format_query_params(**query_params)
-
-        r = requests.get(players_url, params=self.params)
-
-        self.__process_response(r)
-
-        self.query_result = r.json()
+        return self.__query_page(players_url, **query_params)
 
     def query_all_players(self, **query_params):
         """
-        Stores a modified JSON object containing all of the player data from the passed query parameters (ignoring the starting page number).
+        Stores and returns a modified JSON object containing all of the player data from the passed query parameters (ignoring the starting page number).
 
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A list of all of the items retrieved.
         """
         if self.is_single_player_query(**query_params):
-            self.clear_data()
-            
             player_id = query_params["player_id"]
             url = players_url + f"/{player_id}"
 
-            r = requests.get(url)
-
-            self.__process_response(r)
-
-            self.data.append(r.json())
+            return self.__store_data([self.__get_page_json_until_success(url, None)])
         else:
-            self.__query_all_data(self.query_players, **query_params)
+            return self.__store_data(self.__query_all_data(players_url, **query_params))
 
     def query_games(self, **query_params):
         """
-        Stores the JSON object retrieved from passing the query parameters to the balldontlie games API.
+        Stores and returns the JSON object retrieved from passing the query parameters to the balldontlie games API.
 
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: The JSON object returned by the API.
         """
-        self.__format_query_params(**query_params)
-
-        r = requests.get(games_url, params=self.params)
-
-        self.__process_response(r)
-
-        self.query_result = r.json()
+        return self.__query_page(games_url, **query_params)
 
     def query_all_games(self, **query_params):
         """
-        Stores a modified JSON object containing all of the games data from the passed query parameters (ignoring the starting page number).
+        Stores and returns a modified JSON object containing all of the games data from the passed query parameters (ignoring the starting page number).
 
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A list of all of the items retrieved.
         """
-        self.__query_all_data(self.query_games, **query_params)
+        return self.__store_data(self.__query_all_data(games_url, **query_params))
 
     def query_season_stats(self, **query_params):
         """
-        Stores the JSON object retrieved from passing the query parameters to the balldontlie season stats API.
+        Stores and returns the JSON object retrieved from passing the query parameters to the balldontlie season stats API.
 
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: The JSON object returned by the API.
         """
-        self.__format_query_params(**query_params)
-
-        r = requests.get(season_stats_url, params=self.params)
-
-        self.__process_response(r)
-
-        self.query_result = r.json()
+        return self.__query_page(season_stats_url, **query_params)
 
     def query_all_season_stats(self, start_season=None, end_season=None, reset_data=False, **query_params):
         """
-        Stores a modified JSON object containing all of the seasons stats data from the passed query parameters (ignoring the starting page number). Queries a range of seasons if a starting and ending season are specified.
+        Stores and returns a modified JSON object containing all of the seasons stats data from the passed query parameters (ignoring the starting page number). Queries a range of seasons if a starting and ending season are specified.
 
         :param start_season: The first season to be queried.
         :param end_season: The final season to be queried.
         :param reset_data: A boolean representing whether or not the currently held data should be replaced with the present query (if TRUE) or extended with the present query (if FALSE). Only used if no start/end seasons are provided.
         :param **query_params: Keyword arguments corresponding to parameters to be used in the API call (see https://www.balldontlie.io/ for more details on parameter conventions).
+        :return: A list of the items retrieved by the present query.
         """
         if start_season and end_season:
-            self.clear_data()
+            data = []
 
             for season in range(start_season, end_season + 1):
-                self.__query_all_data(self.query_season_stats, reset_data=False, season=season, **query_params)
+                data.extend(self.__query_all_data(season_stats_url, season=season, **query_params))
+
+            return self.__store_data(data)
         else:
-            self.__query_all_data(self.query_season_stats, reset_data=reset_data, **query_params)
+            return self.__store_data(self.__query_all_data(season_stats_url, **query_params), reset_data=reset_data)
 
-    def __update_page_request(self):
+    def get_rate_limit_counters(self):
         """
-        Updates the page requested in the query parameters based on the next_page value stored within the passed JSON object.
+        Returns the counters of the waits caused by the rate limiter used by this object (shared with every object using the same limiter).
 
-        :return: The next page to be accessed. Returns None if the page limit is reached.
+        :return: A dictionary holding the number of 429 errors received and the number and total seconds of throttled and rate-limited waits.
         """
-        try:
-            next_page = self.query_result["meta"]["next_page"]
-        except KeyError:
-            return None
-        
-        self.params["page"] = next_page
-        return next_page
+        return self.rate_limiter.get_counters()
 
     def clear_data(self):
         """
         Clears the instance variable holding a modified JSON object containing data from the queries.
         """
-        self.data = []
+        with self.__data_lock:
+            self.data = []
 
     def is_single_player_query(self, **query_params):
         """
@@ -218,6 +379,40 @@ class BDLQuery():
         """
         return "player_id" in query_params and len(query_params) == 1
 
+    def __get_page_json(self, url, params=None, retry=False, query_record=None):
+        """
+        Requests the passed URL with the passed parameters once the rate limiter allows it and returns the JSON object held by the response, without modifying the state of the object. The request is recorded by `instrumentation.record_request()`.
+
+        :param url: The URL of the endpoint being queried.
+        :param params: The formatted query parameters of the request.
+        :param retry: A boolean corresponding to whether or not the request repeats one that received a 429 error.
+        :param query_record: The record of the query the request belongs to, to which the response and its items are added; None if the request is not part of a recorded query.
+        :return: The JSON object returned by the API.
+        """
+        self.rate_limiter.acquire()
+
+        start = time.perf_counter()
+        r = replay.get(url, params=params)
+        instrumentation.record_request(url, r.status_code, len(r.content), time.perf_counter() - start, int(retry))
+
+        if query_record is not None:
+            instrumentation.add_response(query_record, r.status_code, len(r.content), int(retry))
+
+        try:
+            self.__process_response(r)
+        except TooManyRequests as e:
+            self.rate_limiter.record_throttle(e.retry_after)     # Pauses every request made through the limiter, including those of other threads
+            raise
+
+        self.rate_limiter.record_success()
+
+        query_result = r.json()
+
+        if query_record is not None:
+            instrumentation.add_rows(query_record, len(query_result.get("data", [])))
+
+        return query_result
+
     def __process_response(self, response):
         """
         Performs functions relating to processing the passed response (checks to see if passed response has a valid status).
@@ -236,7 +431,7 @@ class BDLQuery():
 
         if status_code not in range(200, 299):
             if status_code == 429:  # too many requests error
-                raise TooManyRequests("Too many requests made to the balldontlie API")
+                raise TooManyRequests("Too many requests made to the balldontlie API", parse_retry_after(response.headers.get("Retry-After")))
             else:
                 raise Exception("%d Error: %s" % (status_code, response.reason))
 
@@ -244,4 +439,13 @@ class TooManyRequests(Exception):
     """
     An exception to be raised when too many requests are made to the balldontlie API (resulting in a 429 error).
     """
-    pass
+
+    def __init__(self, message, retry_after=None):
+        """
+        Constructor method; creates a TooManyRequests exception.
+
+        :param message: The message of the exception.
+        :param retry_after: The number of seconds the API asked to wait before the next request, or None if it did not say.
+        """
+        Exception.__init__(self, message)
+        self.retry_after = retry_after
@@ -0,0 +1,139 @@
+"""
+A client-side rate limiter for the balldontlie API, shared by every query method and every thread using the client.
+"""
+
+import random
+import threading
+import time
+
+API_RATE_LIMIT = 60     # Requests allowed per minute by the balldontlie API
+BASE_BACKOFF = 1.0      # Seconds waited after the first consecutive 429 error, doubled with each following error
+MAX_BACKOFF = 60.0
+
+class RateLimiter():
+
+    def __init__(self, rate=API_RATE_LIMIT, per=60.0, base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF):
+        """
+        Constructor method; creates a RateLimiter object implementing a token bucket that holds up to `rate` tokens and refills at `rate` tokens every `per` seconds.
+
+        :param rate: The number of requests allowed in each period.
+        :param per: The length of the period, in seconds.
+        :param base_backoff: The number of seconds waited after the first consecutive 429 error, doubled with each following error.
+        :param max_backoff: The maximum number of seconds waited after a 429 error without a Retry-After header.
+        """
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.__lock = threading.Lock()
+        self.__random = random.Random()
+        self.set_rate(rate, per)
+
+        self.__paused_until = 0.0       # Time before which no request may be made, set when the API responds with a 429 error
+        self.__consecutive_throttles = 0
+
+        self.rate_limited_waits = 0         # Number of requests that waited for a token
+        self.rate_limited_seconds = 0.0
+        self.throttled_responses = 0        # Number of 429 errors received
+        self.throttled_waits = 0            # Number of requests that waited because of a 429 error
+        self.throttled_seconds = 0.0
+
+    def set_rate(self, rate, per=60.0):
+        """
+        Sets the number of requests allowed in each period and fills the bucket.
+
+        :param rate: The number of requests allowed in each period.
+        :param per: The length of the period, in seconds.
+        """
+        with self.__lock:
+            self.rate = rate
+            self.per = per
+            self.__tokens = float(rate)
+            self.__last_refill = time.monotonic()
+
+    def acquire(self):
+        """
+        Blocks until a request may be made, taking a token from the bucket.
+        """
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+
+                if now < self.__paused_until:
+                    wait = self.__paused_until - now
+                    self.throttled_waits += 1
+                    self.throttled_seconds += wait
+                else:
+                    self.__refill(now)
+
+                    if self.__tokens >= 1:
+                        self.__tokens -= 1
+                        return
+
+                    wait = (1 - self.__tokens) * self.per / self.rate
+                    self.rate_limited_waits += 1
+                    self.rate_limited_seconds += wait
+
+            time.sleep(wait)
+
+    def record_success(self):
+        """
+        Records that a request succeeded, resetting the exponential backoff.
+        """
+        with self.__lock:
+            self.__consecutive_throttles = 0
+
+    def record_throttle(self, retry_after=None):
+        """
+        Records that the API responded with a 429 error, pausing every request made through the limiter. The pause lasts for the Retry-After value if one was sent, and never less than an exponential backoff with jitter.
+
+        :param retry_after: The number of seconds given by the response's Retry-After header, or None if the header was absent.
+        """
+        with self.__lock:
+            self.throttled_responses += 1
+            self.__consecutive_throttles += 1
+
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (self.__consecutive_throttles - 1))
+            pause = self.__random.uniform(backoff / 2, backoff)     # Jitter keeps threads from retrying in lockstep
+
+            if retry_after is not None:
+                pause = max(pause, retry_after)
+
+            self.__paused_until = max(self.__paused_until, time.monotonic() + pause)
+            self.__tokens = 0.0     # The API's window is full, so no burst is allowed once the pause ends
+            self.__last_refill = self.__paused_until    # Tokens are only earned from the end of the pause, rather than for its whole length
+
+    def get_counters(self):
+        """
+        Returns the counters of the waits caused by the limiter.
+
+        :return: A dictionary holding the number of 429 errors received, the number and total seconds of waits caused by 429 errors and the number and total seconds of waits for a token.
+        """
+        with self.__lock:
+            return {
+                "throttled_responses": self.throttled_responses,
+                "throttled_waits": self.throttled_waits,
+                "throttled_seconds": self.throttled_seconds,
+                "rate_limited_waits": self.rate_limited_waits,
+                "rate_limited_seconds": self.rate_limited_seconds
+            }
+
+    def __refill(self, now):
+        """
+        Adds the tokens earned since the last refill to the bucket, up to its capacity.
+
+        :param now: The current value of `time.monotonic()`.
+        """
+        self.__tokens = min(float(self.rate), self.__tokens + (now - self.__last_refill) * self.rate / self.per)
+        self.__last_refill = now
+
+def parse_retry_after(value):
+    """
+    Returns the number of seconds given by the passed Retry-After header value.
+
+    :param value: The value of a Retry-After header, or None.
+    :return: The number of seconds to wait, or None if the value is absent or not a number of seconds.
+    """
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
@@ -2,72 +2,77 @@
 Performs a conversion of a passed balldontlie JSON object to a pandas DataFrame.
 """
 
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
 from .query import *
+from .player_registry import PLAYER_REGISTRY
 
 # Objects held within query results
 objects = ["player", "game", "team", "home_team", "visitor_team"]
 
 class BDLToPandas(BDLQuery):
 
-    def __init__(self):
+    def __init__(self, max_concurrent_pages=1, rate_limiter=None, player_registry=None):
         """
         Constructor method; creates a BDLToPandas object based on the passed bdl_data value.
 
         :param bdl_data: A JSON object containing data retrieved from the balldontlie API service that is to be converted to a pandas df.
+        :param max_concurrent_pages: The maximum number of pages requested at the same time when all pages of a query are retrieved (see `BDLQuery`).
+        :param rate_limiter: The RateLimiter object every request waits on (see `BDLQuery`).
+        :param player_registry: The PlayerRegistry object from which player names are read. The shared `PLAYER_REGISTRY` by default.
         """
-        BDLQuery.__init__(self)
+        BDLQuery.__init__(self, max_concurrent_pages, rate_limiter)
         self.pandas_df = []
+        self.player_registry = player_registry or PLAYER_REGISTRY
 
-    def pandas_convert(self):
+    def pandas_convert(self, data=None):
         """
-        Converts the held balldontlie JSON object to a pandas DataFrame and returns the newly created DataFrame.
+        Converts the held balldontlie JSON object to a pandas DataFrame and returns the newly created DataFrame. The objects nested within each item (see `objects`) are flattened into `<object>_<field>` columns, and keys missing from some items are filled with NaN.
 
+        :param data: A list of items returned by a query, to be converted instead of the held data (e.g., by threads sharing the object).
         :return: A pandas DataFrame representing the balldontlie JSON object held by the object.
         """
-        data = {}
+        pandas_df = self.__clean_df(get_flattened_df(self.data if data is None else data))
+        self.pandas_df = pandas_df
 
-        for names in self.data[0]:
-            col_values = []
+        return pandas_df
 
-            if names in objects:
-                for items in self.data[0][names]:
-                    col_values = []
+    
+    def iter_dataframes(self, items, chunk_size=PER_PAGE):
+        """
+        Yields the passed items converted to pandas DataFrames of at most `chunk_size` rows, converting each chunk as soon as it is complete, so that a query of any size may be processed (or written to disk) without ever holding all of its items or rows.
 
-                    col_name = names + "_" + items
+        :param items: An iterable of balldontlie items (e.g., the generator returned by `iter_stats()`).
+        :param chunk_size: The maximum number of rows of each DataFrame.
+        :return: A generator of pandas DataFrames, cleaned as by `pandas_convert()`.
+        """
+        chunk = []
 
-                    for i in range(len(self.data)):
-                        col_values.append(self.data[i][names][items])
+        for item in items:
+            chunk.append(item)
 
-                    data[col_name] = col_values
-            else:
-                for i in range(len(self.data)):
-                    col_values.append(self.data[i][names])
-            
-                data[names] = col_values
+            if len(chunk) == chunk_size:
+                yield self.__clean_df(get_flattened_df(chunk))
+                chunk = []
 
-        self.pandas_df = pd.DataFrame(data=data)
-        self.__clean_df()
+        if chunk:
+            yield self.__clean_df(get_flattened_df(chunk))
 
-        return self.pandas_df
-
-    
-    def get_player_name_map(self, using_stored_data=False):
+    def get_player_name_map(self, using_stored_data=False, data=None):
         """
         Returns a map of the player IDs currently held to a list holding the player's name (in the format of [last, first]).
 
         :param using_stored: A boolean indicating if the returned map should be a map of the players stored (when value is TRUE), or a map of all players available in the database (when value is FALSE).
+        :param data: A list of items returned by a query, whose players are mapped instead of those of the held data when `using_stored_data` is TRUE.
         :return: A dictionary in which the keys are all unique player IDs and each value is an array holding the name of the corresponding player ID in the format [last, first].
         """
         name_map = {}
 
-        temp = self.data
-        
         if not using_stored_data:
-            # creates a map using all player IDs in the database
-            self.query_all_players()
+            # creates a map using all player IDs in the database, as held by the player registry
+            self.player_registry.refresh(self)
 
-            for player in self.data:
+            for player in self.player_registry.get_players():
                 player_id = player["id"]
 
                 player_first = player["first_name"].replace(".", "")
@@ -78,35 +83,103 @@ class BDLToPandas(BDLQuery):
             # creates a map using only the stored player IDs
             player_ids = set()
 
-            for item in self.data:
+            for item in self.data if data is None else data:
                 try:
                     player_id = item["player_id"]
                     player_ids.add(player_id)
                 except KeyError:    # if item does not have a player_id key and, therefore, is not a player
                     pass
 
-            for player_id in player_ids:
-                self.query_all_players(player_id=player_id)
-                player = self.data
-
-                player_first = player[0]["first_name"]
-                player_last = player[0]["last_name"]
+            for player_id, player in self.get_players_by_id(player_ids).items():
+                player_first = player["first_name"]
+                player_last = player["last_name"]
 
                 name_map[player_id] = [player_last, player_first]
 
-        self.data = temp
-
         return name_map
 
-    def __clean_df(self):
+    def get_players_by_id(self, player_ids):
         """
-        Performs a variety of methods to prepare the held pandas dataframe for analysis by properly formatting the existing data.
+        Returns the JSON objects of the players with the passed IDs. Players are read from the player registry; only the players missing from it are requested from the API, concurrently, and then added to the registry.
+
+        :param player_ids: An iterable of player IDs (int).
+        :return: A dictionary mapping each passed player ID to the player's JSON object.
         """
-        self.__convert_min()
+        players = {}
+        unknown_ids = []
+
+        for player_id in player_ids:
+            player = self.player_registry.get_player(player_id)
+
+            if player is None:
+                unknown_ids.append(player_id)
+            else:
+                players[player_id] = player
+
+        if unknown_ids:
+            max_workers = min(len(unknown_ids), max(self.max_concurrent_pages, DEFAULT_MAX_CONCURRENT_PAGES))   # Requests still wait on the rate limiter
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetched = list(executor.map(lambda player_id: self.get_page_json(players_url + f"/{player_id}"), unknown_ids))
+
+            self.player_registry.add_players(fetched)
+
+            for player_id, player in zip(unknown_ids, fetched):
+                players[player_id] = player
+
+        return players
 
-    def __convert_min(self):
+    def __clean_df(self, pandas_df):
         """
-        Converts the `min` column from minutes/seconds to minutes and decimals of minutes.
+        Performs a variety of methods to prepare the passed pandas dataframe for analysis by properly formatting the existing data.
+
+        :param pandas_df: A DataFrame created from balldontlie items.
+        :return: The cleaned DataFrame.
         """
-        self.pandas_df["min"] = self.pandas_df["min"].str.replace(':','.').astype(float)    # Converts column to float; column previously held strings
-        self.pandas_df["min"] = self.pandas_df["min"].astype(int) + (((self.pandas_df.loc[:, "min"] - self.pandas_df.loc[:, "min"].astype(int)) * 100).round(0).astype(int) / 60).round(2)        
+        self.__convert_min(pandas_df)
+
+        return pandas_df
+
+    def __convert_min(self, pandas_df):
+        """
+        Converts the `min` column of the passed DataFrame from minutes/seconds to minutes and decimals of minutes.
+
+        :param pandas_df: A DataFrame created from balldontlie items.
+        """
+        if "min" not in pandas_df:     # Only stats and season averages hold minutes
+            return
+
+        pandas_df["min"] = pandas_df["min"].str.replace(':','.').astype(float)    # Converts column to float; column previously held strings
+        pandas_df["min"] = pandas_df["min"].astype(int) + (((pandas_df.loc[:, "min"] - pandas_df.loc[:, "min"].astype(int)) * 100).round(0).astype(int) / 60).round(2)
+
+def get_flattened_df(data):
+    """
+    Returns a DataFrame holding the passed balldontlie items, with the objects nested within each item flattened into `<object>_<field>` columns placed where the object's key was. Each column is built once over all items rather than item by item.
+
+    :param data: A list of JSON objects (dictionaries) retrieved from the balldontlie API.
+    :return: A pandas DataFrame with one row per item.
+    """
+    import pandas as pd     # Imported on the first conversion, so that importing the client does not load pandas
+
+    df = pd.DataFrame.from_records(data)   # Columns are the union of the items' keys, in the order they are first seen
+
+    pieces = []
+    start = 0
+
+    for position, name in enumerate(df.columns):
+        if name not in objects:
+            continue
+
+        nested_items = [item if isinstance(item, dict) else {} for item in df[name].tolist()]     # An absent or null object leaves its columns empty
+        nested_df = pd.DataFrame.from_records(nested_items, index=df.index)
+        nested_df.columns = [name + "_" + str(col) for col in nested_df.columns]
+
+        pieces.extend([df.iloc[:, start:position], nested_df])
+        start = position + 1
+
+    if not pieces:
+        return df
+
+    pieces.append(df.iloc[:, start:])
+
+    return pd.concat(pieces, axis=1)     # Joined once, so that the columns are not copied for every nested object
@@ -0,0 +1,180 @@
+"""
+A resumable backfill of the seasons outside of the range built by `load_data.download_mvp_stats()`, back to the first season in which the MVP award was given. May be run with `python main.py backfill`, or:
+
+    progress = run_backfill(1955, 1999)
+
+Seasons are built one at a time by their dependency graph (see `load_data.get_season_graph()`), one raw source after another, and every request to basketball-reference.com is spaced out to stay within its politeness limit. The manifest of each season records every artifact as soon as it is written, and a progress file records the state of each season (its stored sources, attempts and last error) after every source and every season, so an interrupted or failed backfill resumes where it stopped: stored sources are never fetched again, completed seasons are skipped and failed seasons are retried.
+"""
+
+import datetime
+import json
+import time
+
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+
+import load_data
+import instrumentation
+import file_utils
+import scraping.basketball_reference.bball_ref_utils as bball_ref_utils
+
+PROGRESS_NAME = "backfill.json"     # Stored in `load_data.RAW_DIR`, next to the raw sources of each season
+
+BBREF_HOST = "www.basketball-reference.com"
+REQUESTS_PER_MINUTE = 18    # basketball-reference.com blocks clients making more than 20 requests a minute for an hour
+
+MAX_ATTEMPTS = 3        # Attempts made to build a season before it is recorded as failed
+RETRY_DELAY = 30.0      # Seconds waited before retrying a season, doubled with each attempt
+
+COMPLETE = "complete"
+IN_PROGRESS = "in_progress"
+FAILED = "failed"
+
+def run_backfill(first_season=None, last_season=None, requests_per_minute=REQUESTS_PER_MINUTE, max_attempts=MAX_ATTEMPTS, retry_delay=RETRY_DELAY, retry_failed=True):
+    """
+    Builds every season in the passed range that is not complete, recording its progress after every source and every season (see `get_progress_name()`). A season that raises an error is retried after a delay; once it has failed `max_attempts` times, its error is recorded and the backfill moves on to the next season. The seasons are built one at a time, as the politeness limit of basketball-reference.com, rather than the build, bounds how quickly they can be fetched.
+
+    :param first_season: The first season to be built; the first MVP season by default. Seasons before `load_data.FIRST_MVP_SEASON` cannot be built.
+    :param last_season: The last season to be built; the season before `load_data.FIRST_SEASON` by default.
+    :param requests_per_minute: The maximum number of requests made to basketball-reference.com each minute.
+    :param max_attempts: The number of attempts made to build each season during this run.
+    :param retry_delay: The number of seconds waited before the second attempt to build a season, doubled with each following attempt.
+    :param retry_failed: A boolean corresponding to whether or not seasons recorded as failed by a previous run are attempted again.
+    :return: A dictionary mapping each season in the range to its progress (see `backfill_season()`).
+    """
+    first_season = load_data.FIRST_MVP_SEASON if first_season is None else first_season
+    last_season = load_data.FIRST_SEASON - 1 if last_season is None else last_season
+
+    if first_season < load_data.FIRST_MVP_SEASON:
+        raise ValueError("No MVP voting is available before the %d season; %d was passed as the first season" % (load_data.FIRST_MVP_SEASON, first_season))
+
+    if last_season > load_data.CURRENT_SEASON or last_season < first_season:
+        raise ValueError("The last season must be between %d and %d; %d was passed" % (first_season, load_data.CURRENT_SEASON, last_season))
+
+    progress = load_progress()
+    load_data.check_dir(load_data.SEASON_AVERAGES_DIR)
+    bball_ref_utils.set_host_request_interval(BBREF_HOST, 60.0 / requests_per_minute)
+
+    try:
+        for season in range(first_season, last_season + 1):
+            season_progress = progress.setdefault(str(season), get_new_season_progress())
+
+            if is_season_complete(season, season_progress) or (season_progress["status"] == FAILED and not retry_failed):
+                continue
+
+            backfill_season(season, progress, max_attempts, retry_delay)
+    finally:
+        bball_ref_utils.set_host_request_interval(BBREF_HOST, None)
+
+    return {season: progress[str(season)] for season in range(first_season, last_season + 1)}
+
+def backfill_season(season, progress, max_attempts=MAX_ATTEMPTS, retry_delay=RETRY_DELAY):
+    """
+    Builds the passed season, storing each of its raw sources in turn and then its merged table and stats, and records its progress after every source. Artifacts that are already stored and up to date are not built again.
+
+    The progress of a season is a dictionary holding its status ("in_progress", "complete" or "failed"), the raw sources stored so far, the number of attempts made to build it, the last error raised while building it and the time it was last updated.
+
+    :param season: The season to be built.
+    :param progress: The dictionary returned by `load_progress()`, updated and saved in place.
+    :param max_attempts: The number of attempts made to build the season.
+    :param retry_delay: The number of seconds waited before the second attempt, doubled with each following attempt.
+    :return: TRUE if the season was built, FALSE if every attempt failed.
+    """
+    season_progress = progress.setdefault(str(season), get_new_season_progress())
+    graph = load_data.get_season_graph(season)
+    sources = load_data.get_season_sources(season)
+
+    for attempt in range(max_attempts):
+        if attempt > 0:
+            time.sleep(retry_delay * 2 ** (attempt - 1))
+
+        season_progress["attempts"] += 1
+        update_season_progress(progress, season, IN_PROGRESS)
+
+        try:
+            with instrumentation.stage("build", season=season) as record:
+                rebuilt = []
+
+                for source in sources:
+                    rebuilt += graph.build([source])    # The manifest is saved as soon as the source is written
+
+                    if source not in season_progress["sources"]:
+                        season_progress["sources"].append(source)
+                        update_season_progress(progress, season, IN_PROGRESS)
+
+                rebuilt += graph.build(["stats"])
+                record["rebuilt"] = rebuilt
+        except Exception as error:
+            season_progress["error"] = "%s: %s" % (type(error).__name__, error)
+            update_season_progress(progress, season, FAILED if attempt == max_attempts - 1 else IN_PROGRESS)
+            continue
+        finally:
+            bball_ref_utils.evict_season_pages(season)
+
+        season_progress["error"] = None
+        update_season_progress(progress, season, COMPLETE)
+
+        return True
+
+    return False
+
+def is_season_complete(season, season_progress):
+    """
+    Returns a boolean corresponding to whether or not the passed season was completed by a backfill and is still stored.
+
+    :param season: The season to be checked.
+    :param season_progress: The progress of the season (see `backfill_season()`).
+    :return: TRUE if the season does not need to be built, FALSE otherwise.
+    """
+    return season_progress["status"] == COMPLETE and load_data.csv_exists(load_data.get_season_csv_name(season))
+
+def get_new_season_progress():
+    """
+    Returns the progress of a season that has not been attempted.
+
+    :return: A dictionary holding the progress of the season (see `backfill_season()`).
+    """
+    return {"status": IN_PROGRESS, "sources": [], "attempts": 0, "error": None, "updated": None}
+
+def update_season_progress(progress, season, status):
+    """
+    Sets the status of the passed season and saves the progress of the backfill.
+
+    :param progress: The dictionary returned by `load_progress()`.
+    :param season: The season whose status changed.
+    :param status: One of "in_progress", "complete" or "failed".
+    """
+    season_progress = progress[str(season)]
+    season_progress["status"] = status
+    season_progress["updated"] = datetime.datetime.now().isoformat(timespec="seconds")
+
+    save_progress(progress)
+
+def get_progress_name():
+    """
+    Returns the full path of the file recording the progress of the backfill.
+
+    :return: The path to the progress file.
+    """
+    return os.path.join(load_data.RAW_DIR, PROGRESS_NAME)
+
+def load_progress():
+    """
+    Reads the progress recorded by previous backfills.
+
+    :return: A dictionary mapping each attempted season (as a string) to its progress (see `backfill_season()`); empty if no backfill has been run.
+    """
+    try:
+        with open(get_progress_name()) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_progress(progress):
+    """
+    Writes the progress of the backfill to disk (see `file_utils.write_atomically()`).
+
+    :param progress: The dictionary returned by `load_progress()`.
+    """
+    file_utils.write_json_atomically(get_progress_name(), progress, indent=1, sort_keys=True)
@@ -0,0 +1,198 @@
+"""
+A small dependency graph of build artifacts (files), each rebuilt only when it is stale. The content hash of every artifact, the hashes of the inputs it was built from and the hash of the code that built it are recorded in a manifest, so that a change to an input's content or to the building code rebuilds that artifact and, if its own content changes, the artifacts that depend on it.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+
+import file_utils
+
+HASH_CHUNK_SIZE = 1 << 20   # Bytes read at a time when hashing an artifact
+
+class BuildGraph():
+
+    def __init__(self, manifest_path):
+        """
+        Constructor method; creates an empty BuildGraph object whose manifest is stored at the passed path.
+
+        :param manifest_path: The path of the JSON file holding the hashes recorded for the graph's artifacts.
+        """
+        self.manifest_path = manifest_path
+
+        self.__artifacts = {}   # Maps each artifact name to its path, build function, inputs and code hash, in the order added
+        self.__manifest = None
+        self.__lock = threading.Lock()
+
+    def add(self, name, path, build, inputs=(), code=()):
+        """
+        Adds an artifact to the graph. Artifacts must be added after the artifacts they depend on.
+
+        :param name: The name of the artifact, unique within the graph.
+        :param path: The path of the file holding the artifact; its content hash is compared with those recorded.
+        :param build: A function taking no arguments that (re)builds the file at `path`.
+        :param inputs: A list of the names of the artifacts from which this artifact is built.
+        :param code: A list of the functions, modules and values that determine how the artifact is built. Their source code (or representation) is hashed, so that editing them rebuilds the artifact.
+        """
+        for input_name in inputs:
+            if input_name not in self.__artifacts:
+                raise ValueError("Artifact '%s' depends on '%s', which has not been added" % (name, input_name))
+
+        self.__artifacts[name] = {"path": path, "build": build, "inputs": list(inputs), "code": get_code_hash(code)}
+
+    def invalidate(self, name):
+        """
+        Forgets the recorded hashes of the passed artifact, so that it is rebuilt by the next build that reaches it (e.g., a source that should be retrieved again).
+
+        :param name: The name of the artifact.
+        """
+        with self.__lock:
+            if self.__load().pop(name, None) is not None:
+                self.__save()
+
+    def get_stale(self, targets=None):
+        """
+        Returns the artifacts that are stale, without building anything. An artifact is stale if its file is missing, if it has no recorded hashes, or if the hash of its code or of any of its inputs differs from the recorded hash. Artifacts that depend on a stale artifact may also be rebuilt by `build()`, if the stale artifact's content changes.
+
+        :param targets: A list of the names of the artifacts to be checked, along with every artifact they depend on. All artifacts are checked by default.
+        :return: A list of the names of the stale artifacts, in build order.
+        """
+        current_hashes = {}
+
+        with self.__lock:
+            return [name for name in self.__get_required(targets) if self.__is_stale(name, current_hashes)]
+
+    def build(self, targets=None):
+        """
+        Brings the passed artifacts up to date, rebuilding every stale artifact they depend on, in dependency order.
+
+        :param targets: A list of the names of the artifacts to be brought up to date, along with every artifact they depend on. All artifacts are built by default.
+        :return: A list of the names of the artifacts that were rebuilt, in build order.
+        """
+        rebuilt = []
+        current_hashes = {}
+
+        with self.__lock:
+            for name in self.__get_required(targets):
+                if not self.__is_stale(name, current_hashes, record=True):
+                    continue
+
+                artifact = self.__artifacts[name]
+                artifact["build"]()
+
+                self.__load()[name] = {
+                    "hash": get_file_hash(artifact["path"]),
+                    "inputs": {input_name: self.__manifest[input_name]["hash"] for input_name in artifact["inputs"]},
+                    "code": artifact["code"]
+                }
+                self.__save()     # Saved after each artifact, so that an interrupted build keeps the artifacts already built
+                rebuilt.append(name)
+
+        return rebuilt
+
+    def __get_required(self, targets):
+        """
+        Returns the passed targets along with every artifact they depend on.
+
+        :param targets: A list of artifact names, or None for every artifact.
+        :return: A list of artifact names, in the order they were added (a valid build order).
+        """
+        if targets is None:
+            return list(self.__artifacts)
+
+        required = set()
+        pending = list(targets)
+
+        while pending:
+            name = pending.pop()
+
+            if name not in required:
+                required.add(name)
+                pending.extend(self.__artifacts[name]["inputs"])
+
+        return [name for name in self.__artifacts if name in required]
+
+    def __is_stale(self, name, current_hashes, record=False):
+        """
+        Returns a boolean corresponding to whether or not the passed artifact must be rebuilt. Its inputs are assumed to have been checked already.
+
+        :param name: The name of the artifact.
+        :param current_hashes: A dictionary mapping the names of the sources found to have been changed outside of the graph to their current hashes, filled as the artifacts are checked so that the artifacts built from them are found stale.
+        :param record: A boolean corresponding to whether or not the current hash of a source changed outside of the graph should be recorded in the manifest. Only `build()` records it, so that checking staleness never writes the manifest.
+        :return: TRUE if the artifact is stale, FALSE otherwise.
+        """
+        artifact = self.__artifacts[name]
+        recorded = self.__load().get(name)
+
+        if recorded is None or recorded["code"] != artifact["code"] or not os.path.isfile(artifact["path"]):
+            return True
+
+        if recorded["inputs"] != {input_name: current_hashes.get(input_name, self.__manifest.get(input_name, {}).get("hash")) for input_name in artifact["inputs"]}:
+            return True
+
+        file_hash = get_file_hash(artifact["path"])
+
+        if file_hash != recorded["hash"]:   # The file was changed outside of the graph
+            if artifact["inputs"]:
+                return True
+
+            current_hashes[name] = file_hash    # A changed source is kept as it is, and the artifacts built from it become stale
+
+            if record:
+                recorded["hash"] = file_hash
+                self.__save()
+
+        return False
+
+    def __load(self):
+        """
+        Returns the manifest, reading it from disk the first time it is needed.
+
+        :return: A dictionary mapping artifact names to their recorded hashes.
+        """
+        if self.__manifest is None:
+            try:
+                with open(self.manifest_path) as f:
+                    self.__manifest = json.load(f)
+            except FileNotFoundError:
+                self.__manifest = {}
+
+        return self.__manifest
+
+    def __save(self):
+        """
+        Writes the manifest to disk (see `file_utils.write_atomically()`).
+        """
+        file_utils.write_json_atomically(self.manifest_path, self.__manifest, indent=1, sort_keys=True)
+
+def get_file_hash(path):
+    """
+    Returns the SHA-256 hash of the content of the passed file.
+
+    :param path: The path of the file.
+    :return: The hexadecimal digest of the file's content.
+    """
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+def get_code_hash(code):
+    """
+    Returns the SHA-256 hash of the passed functions, modules and values: the source code of functions and modules, the representation of anything else.
+
+    :param code: A list of functions, modules and values.
+    :return: The hexadecimal digest of the code.
+    """
+    digest = hashlib.sha256()
+
+    for item in code:
+        source = inspect.getsource(item) if inspect.isfunction(item) or inspect.ismodule(item) else repr(item)
+        digest.update(source.encode())
+
+    return digest.hexdigest()
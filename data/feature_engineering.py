@@ -0,0 +1,104 @@
+"""
+Module containing the feature engineering stage (each technique is detailed in `notebooks/feature_engineering.ipynb`). Features are computed with grouped operations over any number of seasons at once, from data that is already stored, so that changing a feature does not require any page to be scraped again.
+"""
+
+import pandas as pd
+
+SCALED_FIELDS = ["pts_per_g", "ast_per_g", "trb_per_g", "blk_per_g", "stl_per_g", "tov_per_g", "efg_pct"]     # Fields scaled proportional to the league leader of their season
+RANKED_FIELDS = ["ws", "ws_per_48", "per", "bpm", "vorp", "pts_per_g", "ast_per_g", "trb_per_g", "winning_perc"]   # Fields ranked within their season, to find and filter MVP candidates
+CANDIDATES_PER_SEASON = 50  # Players kept per season by `get_candidates()`; no MVP vote recipient is usually ranked lower in win shares (see `notebooks/filtering.ipynb`)
+
+def get_feature_engineered_df(stats_df, leaders_df=None):
+    """
+    Returns a DataFrame object with feature engineering techniques applied to the passed data, which may hold any number of seasons.
+
+    :param stats_df: A DataFrame object containing NBA season average statistics, including a `season` column.
+    :param leaders_df: A DataFrame object holding the stored league leader values, with `season`, `field` and `value` columns (see `load_data.load_league_leaders()`). Seasons and fields missing from it are scaled as described in `get_leader_values()`.
+    :return: A DataFrame holding the passed data with its columns converted to numbers and the engineered fields appended (or recomputed, if already present).
+    """
+    # 0. Convert all number-like columns from strings to numbers
+    stats_df = convert_col_types(stats_df)
+    seasons = stats_df.groupby("season", sort=False)
+
+    # 1. Add MVP voting rank within each season
+    rank = seasons.points_won.rank(method="min", ascending=False)
+    stats_df["rank"] = rank.where(stats_df.points_won != 0)
+
+    # 2. Scale major season average statistics fields by the league leader of each season
+    leader_values = get_leader_values(stats_df, leaders_df)
+
+    for field in SCALED_FIELDS:
+        stats_df[f"scaled_{field}"] = stats_df[field] / stats_df.season.map(leader_values[field])   # league leader has value of 1, all other rows are a decimal value in range [0, 1)
+
+    # 3. Rank major statistics within each season, along with the share of players each player is at least as good as
+    seasons = stats_df.groupby("season", sort=False)[RANKED_FIELDS]
+    ranks = seasons.rank(method="max", ascending=False)     # Tied players share the lowest rank, as in `notebooks/filtering.ipynb`
+    percentiles = seasons.rank(method="max", pct=True)
+
+    for field in RANKED_FIELDS:
+        stats_df[f"rank_{field}"] = ranks[field]
+        stats_df[f"pctl_{field}"] = percentiles[field]
+
+    return stats_df
+
+def get_candidates(stats_df, n=CANDIDATES_PER_SEASON, field="ws"):
+    """
+    Returns the rows of the players ranked in the top `n` of the passed field in their season, i.e., the players in the MVP conversation. The stored `rank_{field}` column is used if present; otherwise the ranks are computed.
+
+    :param stats_df: A DataFrame object containing NBA season average statistics, including a `season` column.
+    :param n: The number of players kept per season (more if players are tied).
+    :param field: The field by which players are ranked; win shares by default.
+    :return: A DataFrame holding the rows of the candidates, in their original order.
+    """
+    rank_col = f"rank_{field}"
+
+    if rank_col in stats_df.columns:
+        ranks = stats_df[rank_col]
+    else:
+        ranks = stats_df.groupby("season", sort=False)[field].rank(method="max", ascending=False)
+
+    return stats_df.loc[(ranks <= n).to_numpy(dtype=bool, na_value=False)]
+
+def convert_col_types(stats_df):
+    """
+    Returns a copy of the passed DataFrame in which every column holding strings is converted to numbers if number-like. Columns in which no value is number-like keep their original string values; in other columns, values that are not number-like become NaN.
+
+    :param stats_df: A DataFrame object containing NBA season average statistics, with either scraped string values or already converted values.
+    :return: A DataFrame with all number-like columns converted to either integers or floats.
+    """
+    stats_df = stats_df.copy()
+
+    for col in stats_df.columns[stats_df.dtypes == object]:     # Columns that are already typed (e.g., read from the season dataset) are left as they are
+        values = pd.to_numeric(stats_df[col], errors="coerce")
+
+        if not values.isna().all():
+            stats_df[col] = values
+
+    return stats_df
+
+def get_leader_values(stats_df, leaders_df=None):
+    """
+    Returns the value of the league leader of each scaled field in each season of the passed data. Each value is taken from the first of the following that holds it:
+        - The stored league leaders (`leaders_df`).
+        - The row of the player flagged as the league leader (`leader_{field}` columns).
+        - The highest value of the field in the season, as for fields that are not found on the basketball-reference.com league leaders page.
+
+    :param stats_df: A DataFrame object containing NBA season average statistics, including a `season` column.
+    :param leaders_df: A DataFrame object holding the stored league leader values, with `season`, `field` and `value` columns.
+    :return: A DataFrame indexed by season with one column of leader values per scaled field.
+    """
+    leader_values = stats_df.groupby("season")[SCALED_FIELDS].max()
+
+    for field in SCALED_FIELDS:
+        flag_col = f"leader_{field}"
+
+        if flag_col in stats_df.columns:
+            flagged_values = stats_df.loc[stats_df[flag_col] == 1].groupby("season")[field].max()
+            leader_values.loc[flagged_values.index, field] = flagged_values
+
+    if leaders_df is not None and not leaders_df.empty:
+        stored_values = leaders_df.loc[leaders_df.field.isin(SCALED_FIELDS)].pivot_table(index="season", columns="field", values="value", aggfunc="first")
+        stored_values = stored_values.reindex(index=leader_values.index.intersection(stored_values.index))
+        leader_values.update(stored_values)     # NaN values (fields not stored for a season) leave the fallback values in place
+
+    return leader_values
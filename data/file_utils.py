@@ -0,0 +1,44 @@
+"""
+Helpers shared by the modules that keep state on disk (the page cache, the player registry, the build manifests and the backfill progress).
+"""
+
+import json
+import os
+import threading
+
+def write_atomically(path, content):
+    """
+    Writes the passed content to the passed path by way of a temporary file in the same directory, which replaces the file once it is complete, so that an interrupted write never leaves a partial file behind. The temporary file is removed if the write fails. The directory of the file is created if it does not already exist.
+
+    :param path: The path of the file to be written.
+    :param content: The bytes to be written.
+    """
+    directory = os.path.dirname(path)
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"   # Unique to the writing thread, so concurrent writers never share a temporary file
+
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(content)
+
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+
+        raise
+
+def write_json_atomically(path, obj, **dump_kwargs):
+    """
+    Writes the passed object to the passed path as JSON (see `write_atomically()`). The object is serialized before anything is written, so an object that cannot be serialized leaves the stored file untouched.
+
+    :param path: The path of the file to be written.
+    :param obj: The object to be written.
+    :param **dump_kwargs: Keyword arguments passed to `json.dumps()` (e.g., `indent`).
+    """
+    write_atomically(path, json.dumps(obj, **dump_kwargs).encode())
@@ -0,0 +1,379 @@
+"""
+Records where the time of a build goes. Each stage of the pipeline (fetch, parse, merge, features, write) is timed as a `stage()` of the season it belongs to, along with the requests made during it (bytes downloaded, HTTP statuses and retries) and the rows it produced; each balldontlie query is recorded the same way (see `api/query.py`).
+
+Instrumentation is off by default, in which case stages cost next to nothing and nothing is kept. Once turned on with `configure()`, every record is kept in memory for `print_summary()` and, if a sink is passed, written to it as one JSON object per line:
+
+    {"type": "stage", "stage": "fetch", "season": 2019, "seconds": 0.82, "self_seconds": 0.82, "requests": 1, "bytes": 389120, "statuses": {"200": 1}, "retries": 0, "rows": null, ...}
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+STAGE = "stage"
+REQUEST = "request"
+QUERY = "query"
+
+enabled = False
+
+__records = []
+__records_lock = threading.Lock()
+__counts_lock = threading.Lock()    # Guards the counts of query records, whose pages may arrive on several threads
+__sink = None
+__profiler = None
+__context = threading.local()   # Holds the stack of stages open on each thread
+
+def configure(enable=True, sink=None, profiler=None):
+    """
+    Turns instrumentation on or off, discarding any record kept from an earlier run.
+
+    :param enable: A boolean corresponding to whether or not stages, requests and queries should be recorded.
+    :param sink: The path of a file, or an open text file, to which every record is written as a line of JSON. Records are only kept in memory by default.
+    :param profiler: A function taking the record of a stage that is starting and returning a context manager, entered for the duration of the stage (e.g., a `StageProfiler` object).
+    """
+    global enabled, __sink, __profiler
+
+    with __records_lock:
+        if isinstance(__sink, JSONLinesSink):
+            __sink.close()
+
+        __records.clear()
+        __sink = JSONLinesSink(sink) if enable and sink is not None else None
+        __profiler = profiler if enable else None
+        enabled = enable
+
+@contextmanager
+def stage(name, season=None, **fields):
+    """
+    Records the wall time of the code run inside the context as a stage of the passed season, along with the requests made on the same thread while it runs. Stages may be nested, in which case the requests of the inner stage are also counted by the outer stage, and the outer stage's `self_seconds` leave out the time of the inner stage.
+
+    The record is yielded so that the code run inside the context may add to it, e.g., `record["rows"] = len(df)`.
+
+    :param name: The name of the stage (e.g., "fetch", "parse", "merge", "features" or "write").
+    :param season: The season the stage belongs to; the season of the enclosing stage by default.
+    :param **fields: Other values describing the stage (e.g., `source="per_game"`), stored in its record.
+    :return: A context manager yielding the record of the stage.
+    """
+    if not enabled:
+        yield {}
+        return
+
+    stack = __get_stack()
+
+    if season is None and stack:
+        season = stack[-1]["season"]
+
+    record = {"type": STAGE, "stage": name, "season": season, **fields, "seconds": 0.0, "self_seconds": 0.0, "requests": 0, "bytes": 0, "statuses": {}, "retries": 0, "rows": None, "error": None}
+
+    stack.append(record)
+    start = time.perf_counter()
+
+    try:
+        with __profiler(record) if __profiler else nullcontext():
+            yield record
+    except BaseException as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        stack.pop()
+
+        nested_seconds = record.pop("_nested_seconds", 0.0)
+        record["self_seconds"] = max(0.0, record["seconds"] - nested_seconds)
+
+        if stack:
+            stack[-1]["_nested_seconds"] = stack[-1].get("_nested_seconds", 0.0) + record["seconds"]
+
+        emit(record)
+
+def record_request(url, status_code, num_bytes, seconds, retries=0):
+    """
+    Records a single HTTP request, counting it toward every stage open on the current thread.
+
+    :param url: The URL that was requested.
+    :param status_code: The status code of the response.
+    :param num_bytes: The number of bytes in the body of the response.
+    :param seconds: The wall time of the request.
+    :param retries: 1 if the request repeats an earlier request (e.g., after a 429 error), 0 otherwise.
+    """
+    if not enabled:
+        return
+
+    stack = __get_stack()
+
+    for record in stack:
+        add_response(record, status_code, num_bytes, retries)
+
+    emit({
+        "type": REQUEST,
+        "stage": stack[-1]["stage"] if stack else None,
+        "season": stack[-1]["season"] if stack else None,
+        "url": url,
+        "status": status_code,
+        "bytes": num_bytes,
+        "seconds": seconds,
+        "retries": retries
+    })
+
+def add_response(record, status_code, num_bytes, retries=0):
+    """
+    Adds a response to the counts of the passed stage or query record.
+
+    :param record: A stage or query record.
+    :param status_code: The status code of the response.
+    :param num_bytes: The number of bytes in the body of the response.
+    :param retries: 1 if the request repeats an earlier request, 0 otherwise.
+    """
+    status = str(status_code)
+
+    with __counts_lock:
+        record["requests"] += 1
+        record["bytes"] += num_bytes
+        record["retries"] += retries
+        record["statuses"][status] = record["statuses"].get(status, 0) + 1
+
+def add_rows(record, rows):
+    """
+    Adds the passed number of rows to those produced by the passed stage or query record.
+
+    :param record: A stage or query record.
+    :param rows: The number of rows (or items) produced.
+    """
+    with __counts_lock:
+        record["rows"] = (record["rows"] or 0) + rows
+
+def get_query_record(url, params=None):
+    """
+    Returns an empty record of a balldontlie query, to be filled with `add_response()` as its pages arrive and passed to `emit()` once it is complete.
+
+    :param url: The URL of the endpoint being queried.
+    :param params: The formatted query parameters of the query.
+    :return: A dictionary holding the counts of the query.
+    """
+    stack = __get_stack() if enabled else []
+
+    return {
+        "type": QUERY,
+        "stage": QUERY,
+        "season": stack[-1]["season"] if stack else None,
+        "url": url,
+        "params": params,
+        "seconds": 0.0,
+        "self_seconds": 0.0,
+        "requests": 0,
+        "bytes": 0,
+        "statuses": {},
+        "retries": 0,
+        "rows": 0,
+        "error": None
+    }
+
+def emit(record):
+    """
+    Keeps the passed record and writes it to the sink, if one is configured. Does nothing if instrumentation is off.
+
+    :param record: A dictionary of JSON-serializable values.
+    """
+    if not enabled:
+        return
+
+    with __records_lock:
+        __records.append(record)
+
+        if __sink is not None:
+            __sink.write(record)
+
+def get_records(record_type=None):
+    """
+    Returns the records kept since instrumentation was last configured.
+
+    :param record_type: One of "stage", "request" or "query", to only return records of that type. Records of every type are returned by default.
+    :return: A list of record dictionaries, in the order they were completed.
+    """
+    with __records_lock:
+        return [record for record in __records if record_type is None or record["type"] == record_type]
+
+def get_summary(records=None):
+    """
+    Returns the totals of the passed stage and query records, grouped by stage.
+
+    :param records: A list of record dictionaries; the kept stage and query records by default.
+    :return: A list of dictionaries holding the stage's name and its count, seasons, total and self seconds, requests, bytes, retries, rows, errors and statuses, ordered by self seconds (descending).
+    """
+    if records is None:
+        records = [record for record in get_records() if record["type"] != REQUEST]
+
+    totals = {}
+
+    for record in records:
+        total = totals.setdefault(record["stage"], {"stage": record["stage"], "count": 0, "seasons": set(), "seconds": 0.0, "self_seconds": 0.0, "requests": 0, "bytes": 0, "retries": 0, "rows": 0, "errors": 0, "statuses": {}})
+
+        total["count"] += 1
+        total["seconds"] += record["seconds"]
+        total["self_seconds"] += record["self_seconds"]
+        total["requests"] += record["requests"]
+        total["bytes"] += record["bytes"]
+        total["retries"] += record["retries"]
+        total["rows"] += record["rows"] or 0
+        total["errors"] += record["error"] is not None
+
+        if record["season"] is not None:
+            total["seasons"].add(record["season"])
+
+        for status, count in record["statuses"].items():
+            total["statuses"][status] = total["statuses"].get(status, 0) + count
+
+    summary = sorted(totals.values(), key=lambda total: total["self_seconds"], reverse=True)
+
+    for total in summary:
+        total["seasons"] = len(total["seasons"])
+
+    return summary
+
+def print_summary(records=None, file=None):
+    """
+    Prints the totals of the passed records (see `get_summary()`) as a table.
+
+    :param records: A list of record dictionaries; the kept stage and query records by default.
+    :param file: The file the table is printed to; standard output by default.
+    """
+    file = file or sys.stdout
+    summary = get_summary(records)
+
+    print("%-10s %6s %7s | %10s %10s | %8s %10s %7s %8s %6s | %s" % ("stage", "count", "seasons", "total", "self", "requests", "MB", "retries", "rows", "errors", "statuses"), file=file)
+
+    for total in summary:
+        statuses = " ".join("%s:%d" % (status, count) for status, count in sorted(total["statuses"].items()))
+
+        print("%-10s %6d %7d | %9.2fs %9.2fs | %8d %10.2f %7d %8d %6d | %s" % (total["stage"], total["count"], total["seasons"], total["seconds"], total["self_seconds"], total["requests"], total["bytes"] / (1 << 20), total["retries"], total["rows"], total["errors"], statuses), file=file)
+
+def __get_stack():
+    """
+    Returns the stack of stages open on the current thread.
+
+    :return: A list of stage records, the innermost last.
+    """
+    if not hasattr(__context, "stack"):
+        __context.stack = []
+
+    return __context.stack
+
+class JSONLinesSink():
+
+    def __init__(self, sink):
+        """
+        Constructor method; creates a JSONLinesSink object writing to the passed file.
+
+        :param sink: The path of the file to be written (truncated if it exists), or an open text file, which is left open.
+        """
+        self.__owned = isinstance(sink, str)
+        self.__file = open(sink, "w") if self.__owned else sink
+
+    def write(self, record):
+        """
+        Writes the passed record as a line of JSON, flushed so that the records of an interrupted build are kept.
+
+        :param record: A dictionary of JSON-serializable values.
+        """
+        self.__file.write(json.dumps(record, default=str) + "\n")
+        self.__file.flush()
+
+    def close(self):
+        """
+        Closes the file if it was opened by the sink.
+        """
+        if self.__owned:
+            self.__file.close()
+
+class StageProfiler():
+    """
+    A profiler hook for `configure()` that runs cProfile during the passed stages and combines the statistics of every run of each stage.
+    """
+
+    def __init__(self, stages=("parse", "merge", "features")):
+        """
+        Constructor method; creates a StageProfiler object.
+
+        :param stages: The names of the stages to be profiled. Stages that only wait on the network (fetch) are left out by default, as are stages nested inside a profiled stage on the same thread.
+        """
+        self.stages = set(stages)
+        self.stats = {}     # Maps each profiled stage to a pstats.Stats object combining its runs
+
+        self.__lock = threading.Lock()
+        self.__active = threading.local()
+
+    def __call__(self, record):
+        """
+        Returns the context manager profiling the stage of the passed record, or an empty context manager if the stage is not profiled.
+
+        :param record: The record of a stage that is starting.
+        :return: A context manager.
+        """
+        if record["stage"] not in self.stages or getattr(self.__active, "profiling", False):
+            return nullcontext()
+
+        return self.__profile(record["stage"])
+
+    @contextmanager
+    def __profile(self, stage_name):
+        """
+        Profiles the code run inside the context and adds its statistics to those of the passed stage.
+
+        :param stage_name: The name of the stage being profiled.
+        """
+        import cProfile
+        import pstats
+
+        profile = cProfile.Profile()
+
+        try:
+            profile.enable()
+        except ValueError:  # Another profiler is already active (from Python 3.12, only one may run at a time across threads)
+            yield
+            return
+
+        self.__active.profiling = True
+
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.__active.profiling = False
+
+            with self.__lock:
+                if stage_name in self.stats:
+                    self.stats[stage_name].add(profile)
+                else:
+                    self.stats[stage_name] = pstats.Stats(profile)
+
+    def dump(self, path_prefix):
+        """
+        Writes the combined statistics of each profiled stage to `{path_prefix}{stage}.prof`, to be read by `pstats` or a viewer such as snakeviz.
+
+        :param path_prefix: The prefix of the written files (e.g., "profiles/build_").
+        :return: A list of the paths written.
+        """
+        paths = []
+
+        with self.__lock:
+            for stage_name, stats in self.stats.items():
+                path = f"{path_prefix}{stage_name}.prof"
+                stats.dump_stats(path)
+                paths.append(path)
+
+        return paths
+
+    def print_stats(self, limit=15, file=None):
+        """
+        Prints the functions taking the most cumulative time in each profiled stage.
+
+        :param limit: The number of functions printed per stage.
+        :param file: The file the statistics are printed to; standard output by default.
+        """
+        with self.__lock:
+            for stage_name, stats in self.stats.items():
+                print("\nProfile of stage '%s':" % stage_name, file=file or sys.stdout)
+                stats.stream = file or sys.stdout
+                stats.sort_stats("cumulative").print_stats(limit)
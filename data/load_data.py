@@ -5,6 +5,10 @@ Module containing functions related to loading and saving CSV files of player da
 import pandas as pd
 import numpy as np
 import os.path
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import os, sys
 currentdir = os.path.dirname(os.path.realpath(__file__))
@@ -16,47 +20,526 @@ import scraping.basketball_reference.team_records as team_records
 import scraping.basketball_reference.season_averages as season_averages
 import scraping.basketball_reference.advanced_stats as advanced_stats
 import scraping.basketball_reference.league_leaders as league_leaders
+import scraping.basketball_reference.bball_ref_utils as bball_ref_utils
+
+import season_dataset
+import feature_engineering
+import instrumentation
+from build_graph import BuildGraph
+
+SEASON_AVERAGES_DIR = os.path.join(currentdir, "season_averages")
+RAW_DIR = os.path.join(currentdir, "raw")   # Holds the raw tables of each season (`raw/{season}/{source}.csv`) from which its stats are built
+MANIFEST_NAME = "manifest.json"
 
 CURRENT_SEASON = 2020
 FIRST_SEASON = 2000
+FIRST_MVP_SEASON = 1955     # The 1955-56 season, in which the MVP award was first given; earlier seasons cannot be built (see `backfill.py`)
 SIGNIFICANT_STAT_CATEGORIES = ["pts_per_g", "ast_per_g", "trb_per_g", "blk_per_g", "stl_per_g"]
+STAT_CATEGORY_FIRST_SEASONS = {"blk_per_g": 1973, "stl_per_g": 1973}    # Seasons in which stat categories were first recorded; categories not listed have been recorded since the first MVP season
+
+MAX_CACHED_LOADS = 8        # Frames held by the in-process cache of `load_seasons()`
+MAX_DOWNCAST_DECIMALS = 6   # Float columns stored with more decimals than this are left as float64
+
+__loaded_dfs = OrderedDict()    # Maps the arguments and source files of a `load_seasons()` call to the frame it loaded
+__loaded_lock = threading.Lock()
 
-def download_mvp_stats():
+# The raw tables scraped for each season; MVP votes are not available until a season has ended
+RAW_SOURCES = ["per_game", "advanced", "mvp_votes", "standings", "leaders"]
+
+# The sources that change while a season is in progress, along with the number of seconds each remains valid before `refresh_current_season()` retrieves it again
+IN_SEASON_SOURCES = {"per_game": season_averages, "advanced": advanced_stats, "standings": team_records, "leaders": league_leaders}
+SOURCE_TTLS = {"per_game": 60 * 60, "advanced": 60 * 60, "standings": 60 * 60, "leaders": 60 * 60}
+
+def download_mvp_stats(workers=1):
     """
     Loads all of the data needed for MVP analysis.
+
+    Each season's stats are built from its raw sources by its dependency graph (see `get_season_graph()`), so that only missing or stale artifacts are built.
+
+    :param workers: The number of seasons that may be built at the same time. Seasons are built one at a time by default; when greater than 1, seasons are built in parallel, with the number of requests in flight to each host bounded by `bball_ref_utils.MAX_REQUESTS_PER_HOST`.
     """
     print("Beginning load MVP stats...")
 
-    for season in range(FIRST_SEASON, CURRENT_SEASON + 1):
-        name = str(season) + "_stats.csv"
+    check_dir(SEASON_AVERAGES_DIR)
 
-        csv_dir = os.path.join(currentdir, "season_averages")
+    season_dataset.migrate_csvs(SEASON_AVERAGES_DIR)   # Converts any CSV files built before the dataset existed; does nothing after the first run
 
-        check_dir(csv_dir)
+    # Seasons built before the raw sources were stored are kept as they are; the others are checked for stale artifacts
+    seasons = [season for season in range(FIRST_SEASON, CURRENT_SEASON + 1) if not csv_exists(get_season_csv_name(season)) or os.path.isfile(get_manifest_name(season))]
 
-        complete_name = os.path.join(csv_dir, name)
+    if not csv_exists(get_season_csv_name(CURRENT_SEASON)):
+        bball_ref_utils.invalidate_season_pages(CURRENT_SEASON)     # The pages of the current season change daily, so previously cached copies are not reused
 
-        if not csv_exists(complete_name):
-            df = season_averages.get_full_season_stats_df(season)
-            df["season"] = season    # season column added to store the season represented by this DataFrame
-           
-            if season != CURRENT_SEASON:
-                df = get_appended_votes_df(df, season)
-            else:
-                # In absence of appending MVP votes, the same columns are filled with NaN for the current season
-                voting_cols = mvp_votes.RELEVANT_COL_NAMES
-                voting_cols.remove("player")    # preserves the "player" column in the season averages df
-                df.loc[:, voting_cols] = float("NaN")
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(save_season_stats, seasons))     # Consumes the results so that any exception raised while building a season is re-raised here
+    else:
+        for season in seasons:
+            save_season_stats(season)
 
-            df = get_team_record_df(df, season)
-            df = get_advanced_stats_df(df, season)
-            df = get_league_leaders_df(df, season)
+    print("Completed load MVP stats.")
 
-            df = get_feature_engineered_df(df, season)
+def refresh_current_season(ttls=None):
+    """
+    Incrementally refreshes the stored stats of the current season. Only the in-season sources whose time to live has passed are retrieved again, and the season's stats are only rebuilt if the content of a raw source changed. Past seasons are left untouched.
 
-            df.to_csv(complete_name, index=False)
+    :param ttls: A dictionary mapping source names ("per_game", "advanced", "standings", "leaders") to the number of seconds each remains valid. Sources that are not passed use the values in `SOURCE_TTLS`.
+    :return: A list of the ids of the players whose rows were added or changed.
+    """
+    ttls = dict(SOURCE_TTLS, **(ttls or {}))
+    bball_ref_season = bball_ref_utils.convert_bdl_season_to_bball_ref(CURRENT_SEASON)
+    csv_name = get_season_csv_name(CURRENT_SEASON)
 
-    print("Completed load MVP stats.")
+    check_dir(SEASON_AVERAGES_DIR)
+
+    # Expired pages are dropped from the page cache, so that only they are retrieved again; the other sources are read from the cache
+    expired_sources = [source for source, scraper in IN_SEASON_SOURCES.items() if bball_ref_utils.expire_page(scraper.get_page_url(bball_ref_season), ttls[source])]
+
+    if csv_exists(csv_name) and not expired_sources:
+        return []
+
+    stored_df = pd.read_csv(csv_name) if csv_exists(csv_name) else None
+    graph = get_season_graph(CURRENT_SEASON)
+
+    for source in expired_sources:
+        graph.invalidate(source)
+
+    with instrumentation.stage("refresh", season=CURRENT_SEASON, expired=expired_sources) as record:
+        rebuilt = graph.build(["stats"])
+        record["rebuilt"] = rebuilt
+
+    bball_ref_utils.evict_season_pages(CURRENT_SEASON)
+
+    if "stats" not in rebuilt:
+        return []
+
+    fresh_df = pd.read_csv(csv_name)
+
+    if stored_df is None:
+        return fresh_df.id.tolist()
+
+    return get_changed_ids(stored_df, fresh_df)
+
+def get_changed_ids(stored_df, fresh_df, key="id"):
+    """
+    Returns the keys of the rows of the passed fresh DataFrame that were added or changed since the passed stored DataFrame was written. The season's stats are rewritten in full by its dependency graph, as the engineered features of every row are relative to the rest of the season; this only finds which of its rows differ.
+
+    :param stored_df: A DataFrame object holding the stored stats of a season, as read from its CSV file.
+    :param fresh_df: A DataFrame object holding the newly built stats of the same season.
+    :param key: The column uniquely identifying each row.
+    :return: A list of the keys of the rows that were added or changed, in the order of the fresh data.
+    """
+    fresh_df = pd.read_csv(io.StringIO(fresh_df.to_csv(index=False)))     # Gives the fresh data the same types as the data read from the stored CSV file
+
+    if list(stored_df.columns) != list(fresh_df.columns):
+        return fresh_df[key].tolist()
+
+    stored = stored_df.set_index(key)
+    fresh = fresh_df.set_index(key)
+
+    common_keys = fresh.index.intersection(stored.index)
+    stored_common = stored.loc[common_keys]
+    fresh_common = fresh.loc[common_keys]
+    unchanged = ((stored_common == fresh_common) | (stored_common.isna() & fresh_common.isna())).all(axis=1)
+    unchanged_keys = set(common_keys[unchanged.to_numpy()])
+
+    return [fresh_key for fresh_key in fresh.index if fresh_key not in unchanged_keys]
+
+def load_seasons(first_season=None, last_season=None, columns=None, downcast=True, workers=None, use_cache=True):
+    """
+    Returns a single DataFrame holding the stored stats of every season in the passed range. Each season is read from its partition of the season dataset (or from its CSV file if it has no partition yet), with the seasons read in parallel and only the passed columns read. Repeated calls with the same arguments return a copy of the frame held in memory, for as long as the stored files are unchanged.
+
+    :param first_season: The first season to be loaded; `FIRST_SEASON` by default.
+    :param last_season: The last season to be loaded; `CURRENT_SEASON` by default. Seasons in the range that are not stored are skipped.
+    :param columns: A list of the columns to be loaded. All columns are loaded by default. The `season` column is always included.
+    :param downcast: A boolean corresponding to whether or not columns should be converted to the smallest dtype that holds their values without loss (see `downcast_df()`).
+    :param workers: The number of seasons read at the same time; one per season, up to 8, by default.
+    :param use_cache: A boolean corresponding to whether or not the in-process cache of loaded frames should be used.
+    :return: A DataFrame holding the stats of the loaded seasons.
+    """
+    first_season = FIRST_SEASON if first_season is None else first_season
+    last_season = CURRENT_SEASON if last_season is None else last_season
+    columns = None if columns is None else list(dict.fromkeys(list(columns) + ["season"]))
+
+    sources = get_season_sources_in_range(first_season, last_season)
+    key = (tuple(columns or []), downcast, tuple(sources))  # Holds the modification time of every file read, so that rebuilt seasons are read again
+
+    if use_cache:
+        with __loaded_lock:
+            if key in __loaded_dfs:
+                __loaded_dfs.move_to_end(key)
+                return __loaded_dfs[key].copy()
+
+    stats_df = read_season_sources(sources, columns, workers)
+
+    if downcast:
+        stats_df = downcast_df(stats_df)
+
+    if use_cache:
+        with __loaded_lock:
+            __loaded_dfs[key] = stats_df
+
+            while len(__loaded_dfs) > MAX_CACHED_LOADS:
+                __loaded_dfs.popitem(last=False)
+
+        return stats_df.copy()     # The cached frame is never handed out, so that callers may modify what they receive
+
+    return stats_df
+
+def load_candidates(first_season=None, last_season=None, n=feature_engineering.CANDIDATES_PER_SEASON, field="ws", columns=None):
+    """
+    Returns the stored stats of the MVP candidates of every season in the passed range: the players ranked in the top `n` of the passed field in their season (see `feature_engineering.get_candidates()`). About 50 rows are returned per season instead of 400 or more.
+
+    :param first_season: The first season to be loaded; `FIRST_SEASON` by default.
+    :param last_season: The last season to be loaded; `CURRENT_SEASON` by default.
+    :param n: The number of players kept per season (more if players are tied).
+    :param field: The field by which players are ranked; win shares by default.
+    :param columns: A list of the columns to be loaded. All columns are loaded by default.
+    :return: A DataFrame holding the stats of the candidates, with a fresh index.
+    """
+    if columns is not None:
+        rank_col = f"rank_{field}"
+        columns = list(columns) + [field]
+
+        # The stored ranks are only read if every season holds them; they are otherwise computed from the field (e.g., fields that are not ranked, or seasons stored before the ranks were)
+        if field in feature_engineering.RANKED_FIELDS and all(rank_col in get_source_columns(source) for source in get_season_sources_in_range(first_season, last_season)):
+            columns.append(rank_col)
+
+    stats_df = load_seasons(first_season, last_season, columns=columns)
+
+    return feature_engineering.get_candidates(stats_df, n, field).reset_index(drop=True)
+
+def get_season_sources_in_range(first_season=None, last_season=None):
+    """
+    Returns the files from which the stored stats of every season in the passed range are read (see `get_season_source()`).
+
+    :param first_season: The first season of the range; `FIRST_SEASON` by default.
+    :param last_season: The last season of the range; `CURRENT_SEASON` by default.
+    :return: A list of the tuples returned by `get_season_source()`, in season order, leaving out the seasons that are not stored.
+    """
+    first_season = FIRST_SEASON if first_season is None else first_season
+    last_season = CURRENT_SEASON if last_season is None else last_season
+
+    return [source for source in (get_season_source(season) for season in range(first_season, last_season + 1)) if source]
+
+def get_source_columns(source):
+    """
+    Returns the columns stored in the passed source file, without reading its rows.
+
+    :param source: A tuple returned by `get_season_source()`.
+    :return: A list of column names.
+    """
+    season, path, _ = source
+
+    if path.endswith(".csv"):
+        return pd.read_csv(path, nrows=0).columns.tolist()
+
+    return season_dataset.get_season_columns(season, os.path.dirname(os.path.dirname(path)))
+
+def get_season_source(season):
+    """
+    Returns the file from which the stored stats of the passed season are read: its partition of the season dataset if one exists, its CSV file otherwise.
+
+    :param season: The season to be read.
+    :return: A tuple holding the season, the path of the file and its modification time, or None if the season is not stored.
+    """
+    for path in [season_dataset.get_partition_name(season), get_season_csv_name(season)]:
+        try:
+            return season, path, os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            pass
+
+    return None
+
+def read_season_sources(sources, columns=None, workers=None):
+    """
+    Reads the stats of the seasons held by the passed source files into a single DataFrame. Partitions of the season dataset are read in parallel by `season_dataset.read_seasons()`; seasons only stored as CSV files are read in parallel from them.
+
+    :param sources: A list of tuples returned by `get_season_source()`, in season order.
+    :param columns: A list of the columns to be read. All columns are read by default.
+    :param workers: The number of files read at the same time; one per season, up to 8, by default.
+    :return: A DataFrame holding the seasons' stats in season order, typed according to the season dataset's schema.
+    """
+    partition_seasons = [season for season, path, _ in sources if not path.endswith(".csv")]
+    csv_sources = [(season, path) for season, path, _ in sources if path.endswith(".csv")]
+
+    if not csv_sources:
+        return season_dataset.read_seasons(partition_seasons, columns, workers=workers)
+
+    def read_csv(source):
+        season, path = source
+        season_df = pd.read_csv(path, usecols=(lambda col: col in columns) if columns else None)
+        season_df["season"] = season
+
+        return season_df
+
+    with ThreadPoolExecutor(max_workers=workers or min(8, len(csv_sources))) as executor:
+        season_dfs = list(executor.map(read_csv, csv_sources))
+
+    if partition_seasons:
+        season_dfs.append(season_dataset.read_seasons(partition_seasons, columns, workers=workers))
+
+    stats_df = pd.concat(season_dfs, ignore_index=True).sort_values("season", kind="stable", ignore_index=True)
+
+    return season_dataset.apply_schema(stats_df)   # Types the CSV columns and unifies the categories of the two kinds of source
+
+def downcast_df(stats_df):
+    """
+    Returns a copy of the passed DataFrame in which each column is converted to the smallest dtype that holds its values without loss:
+        - Float columns holding only whole numbers become (nullable) 8, 16 or 32-bit integers.
+        - Other float columns become float32 when every value, rounded to the number of decimals the column is stored with (at most 6), is unchanged by the conversion.
+        - String columns become categories when fewer than half of their values are distinct.
+
+    :param stats_df: A DataFrame object containing NBA season average statistics.
+    :return: The downcast DataFrame.
+    """
+    downcast = {}
+
+    for col in stats_df.columns:
+        values = stats_df[col]
+
+        if pd.api.types.is_float_dtype(values):
+            downcast[col] = downcast_float_col(values)
+        elif pd.api.types.is_integer_dtype(values) and not pd.api.types.is_extension_array_dtype(values):
+            downcast[col] = pd.to_numeric(values, downcast="integer")
+        elif pd.api.types.is_string_dtype(values) and not isinstance(values.dtype, pd.CategoricalDtype) and values.nunique() < len(values) / 2:
+            downcast[col] = values.astype("category")
+        else:
+            downcast[col] = values
+
+    return pd.DataFrame(downcast, index=stats_df.index)
+
+def downcast_float_col(column):
+    """
+    Returns the passed float column converted to the smallest dtype that holds its values without loss (see `downcast_df()`).
+
+    :param column: A float pandas Series.
+    :return: The converted Series, or the passed Series if no smaller dtype holds its values.
+    """
+    values = column.to_numpy(dtype="float64")
+    present = values[~np.isnan(values)]     # Checked as a NumPy array, as the checks are repeated for every column
+
+    if present.size == 0:
+        return column.astype("float32")
+
+    if (present == np.round(present)).all():
+        for dtype in ["int8", "int16", "int32"]:
+            info = np.iinfo(dtype)
+
+            if present.min() >= info.min and present.max() <= info.max:
+                return column.round().astype(dtype.capitalize() if present.size < values.size else dtype)    # Nullable if any value is missing
+
+    for decimals in range(1, MAX_DOWNCAST_DECIMALS + 1):
+        if (np.round(present, decimals) == present).all():
+            if (np.round(present.astype("float32").astype("float64"), decimals) == present).all():
+                return column.astype("float32")
+
+            break
+
+    return column
+
+def get_season_csv_name(season):
+    """
+    Returns the full path of the CSV file holding the stats of the passed season.
+
+    :param season: The season represented by the CSV file.
+    :return: The path to the CSV file of the passed season's stats.
+    """
+    name = str(season) + "_stats.csv"
+
+    return os.path.join(SEASON_AVERAGES_DIR, name)
+
+def get_raw_source_name(season, source):
+    """
+    Returns the full path of the CSV file holding the passed raw source of the passed season.
+
+    :param season: The season represented by the CSV file.
+    :param source: One of `RAW_SOURCES`, or "merged" for the merged table from which the season's features are computed.
+    :return: The path to the CSV file of the raw source.
+    """
+    return os.path.join(RAW_DIR, str(season), f"{source}.csv")
+
+def get_manifest_name(season):
+    """
+    Returns the full path of the manifest recording the hashes of the passed season's artifacts.
+
+    :param season: The season of the manifest.
+    :return: The path to the manifest.
+    """
+    return os.path.join(RAW_DIR, str(season), MANIFEST_NAME)
+
+def get_season_sources(season):
+    """
+    Returns the raw sources from which the passed season is built.
+
+    :param season: The season to be built.
+    :return: A list of the names of the raw sources; MVP votes are left out for the current season.
+    """
+    return [source for source in RAW_SOURCES if not (source == "mvp_votes" and season == CURRENT_SEASON)]
+
+def get_season_graph(season):
+    """
+    Returns the dependency graph of the artifacts of the passed season:
+        - Each raw source (`raw/{season}/{source}.csv`), scraped when missing or invalidated.
+        - The merged table (`raw/{season}/merged.csv`), built from the raw sources by the merge functions.
+        - The season's stats (`{season}_stats.csv` and its partition of the season dataset), built from the merged table and league leaders by the feature engineering stage.
+    A change to a raw source's content, to the merge functions or to the feature engineering stage rebuilds only the artifacts that depend on it.
+
+    :param season: The season of the graph.
+    :return: A BuildGraph object.
+    """
+    graph = BuildGraph(get_manifest_name(season))
+    sources = get_season_sources(season)
+
+    for source in sources:
+        graph.add(source, get_raw_source_name(season, source), lambda source=source: save_raw_source(season, source))
+
+    merge_code = [merge_raw_sources, get_appended_votes_df, get_team_record_df, get_advanced_stats_df, get_league_leaders_df]
+    graph.add("merged", get_raw_source_name(season, "merged"), lambda: save_merged_df(season), inputs=sources, code=merge_code)
+
+    feature_code = [feature_engineering, save_season_features, season_dataset.SCHEMA]
+    graph.add("stats", get_season_csv_name(season), lambda: save_season_features(season), inputs=["merged", "leaders"], code=feature_code)
+
+    return graph
+
+def save_season_stats(season):
+    """
+    Brings the stored stats of the passed season up to date, building the season's stale or missing artifacts (see `get_season_graph()`). The build is recorded as a "build" stage of the season, enclosing the stages of each artifact.
+
+    :param season: The season that will be built and saved.
+    :return: A list of the names of the artifacts that were rebuilt.
+    """
+    with instrumentation.stage("build", season=season) as record:
+        rebuilt = get_season_graph(season).build(["stats"])
+        record["rebuilt"] = rebuilt
+
+    bball_ref_utils.evict_season_pages(season)     # The parsed pages of this season are no longer needed in memory
+
+    return rebuilt
+
+def get_raw_source_df(season, source):
+    """
+    Scrapes the passed raw source of the passed season.
+
+    :param season: The season from which the source will be scraped.
+    :param source: One of `RAW_SOURCES`.
+    :return: A DataFrame holding the source's table as scraped.
+    """
+    if source == "per_game":
+        return season_averages.get_full_season_stats_df(season)
+    elif source == "advanced":
+        return advanced_stats.get_full_advanced_stats_df(season)
+    elif source == "mvp_votes":
+        return pd.DataFrame(mvp_votes.get_mvp_voting_map(season))
+    elif source == "standings":
+        record = team_records.get_team_record_map(season)
+
+        return pd.DataFrame.from_dict(record, orient="index", columns=["winning_perc"]).rename_axis("team_id").reset_index()
+    elif source == "leaders":
+        return get_season_leaders_df(season)
+
+    raise ValueError("Unknown raw source '%s'; acceptable sources are %s" % (source, ", ".join(RAW_SOURCES)))
+
+def save_raw_source(season, source):
+    """
+    Scrapes the passed raw source of the passed season and saves it to its CSV file.
+
+    :param season: The season from which the source will be scraped.
+    :param source: One of `RAW_SOURCES`.
+    """
+    csv_name = get_raw_source_name(season, source)
+    check_dir(os.path.dirname(csv_name))
+
+    with instrumentation.stage("parse", season=season, source=source) as record:   # Encloses the fetch stage of any page that is not cached
+        raw_df = get_raw_source_df(season, source)
+        record["rows"] = len(raw_df)
+
+    with instrumentation.stage("write", season=season, source=source) as record:
+        raw_df.to_csv(csv_name, index=False)
+        record["rows"] = len(raw_df)
+
+def read_raw_source(season, source):
+    """
+    Reads the stored raw source of the passed season. Values are read as the strings they were scraped as, except for the league leaders, whose values are numbers.
+
+    :param season: The season of the source.
+    :param source: One of `RAW_SOURCES`, or "merged".
+    :return: A DataFrame holding the source's table.
+    """
+    return pd.read_csv(get_raw_source_name(season, source), dtype=None if source == "leaders" else str)
+
+def merge_raw_sources(season, raw_dfs):
+    """
+    Merges the raw sources of the passed season into a single table holding the season averages, MVP votes, team records, advanced stats and league leader flags of all players.
+
+    :param season: The season represented by the sources.
+    :param raw_dfs: A dictionary mapping each raw source of the season (see `get_season_sources()`) to its DataFrame.
+    :return: A DataFrame holding the merged table, with the values of each source as they were scraped.
+    """
+    df = raw_dfs["per_game"].copy()
+    df["season"] = season    # season column added to store the season represented by this DataFrame
+
+    if "mvp_votes" in raw_dfs:
+        df = get_appended_votes_df(df, season, raw_dfs["mvp_votes"])
+    else:
+        # In absence of appending MVP votes, the same columns are filled with NaN for the current season
+        voting_cols = [col for col in mvp_votes.RELEVANT_COL_NAMES if col != "player"]   # preserves the "player" column in the season averages df without modifying the shared list of column names
+        df.loc[:, voting_cols] = float("NaN")
+
+    df = get_team_record_df(df, season, raw_dfs["standings"])
+    df = get_advanced_stats_df(df, season, raw_dfs["advanced"])
+    df = get_league_leaders_df(df, season, raw_dfs["leaders"])
+
+    # Older pages may leave out the columns of stats that were not yet recorded, which are added as missing values so that every season has the same fields
+    missing_cols = [col for col in feature_engineering.SCALED_FIELDS + feature_engineering.RANKED_FIELDS if col not in df.columns]
+    df.loc[:, missing_cols] = float("NaN")
+
+    return df
+
+def save_merged_df(season):
+    """
+    Merges the stored raw sources of the passed season and saves the merged table to its CSV file.
+
+    :param season: The season to be merged.
+    """
+    with instrumentation.stage("merge", season=season) as record:
+        raw_dfs = {source: read_raw_source(season, source) for source in get_season_sources(season)}
+        merged_df = merge_raw_sources(season, raw_dfs)
+        record["rows"] = len(merged_df)
+
+    with instrumentation.stage("write", season=season, source="merged") as record:
+        merged_df.to_csv(get_raw_source_name(season, "merged"), index=False)
+        record["rows"] = len(merged_df)
+
+def save_season_features(season):
+    """
+    Computes the engineered features of the passed season from its stored merged table and league leaders, and saves the result to the season's CSV file and to its partition of the season dataset.
+
+    :param season: The season to be built.
+    """
+    with instrumentation.stage("features", season=season) as record:
+        df = feature_engineering.get_feature_engineered_df(read_raw_source(season, "merged"), read_raw_source(season, "leaders"))
+        record["rows"] = len(df)
+
+    with instrumentation.stage("write", season=season, source="stats") as record:
+        df.to_csv(get_season_csv_name(season), index=False)
+        season_dataset.write_season(df, season)
+        record["rows"] = len(df)
+
+def get_season_stats_df(season, leaders_df=None):
+    """
+    Returns a DataFrame holding the season averages, MVP votes, team records, advanced stats, league leaders and engineered features of all players in the passed season, scraped without storing any raw source.
+
+    :param season: The season from which the DataFrame will be built.
+    :param leaders_df: A DataFrame returned by `get_season_leaders_df()` for the passed season. Retrieved if not passed.
+    :return: A DataFrame holding all of the data needed for MVP analysis in the passed season.
+    """
+    raw_dfs = {source: get_raw_source_df(season, source) for source in get_season_sources(season) if source != "leaders" or leaders_df is None}
+    raw_dfs.setdefault("leaders", leaders_df)
+
+    df = merge_raw_sources(season, raw_dfs)
+
+    return feature_engineering.get_feature_engineered_df(df, raw_dfs["leaders"])
 
 def csv_exists(csv_name):
     """
@@ -76,16 +559,16 @@ def check_dir(dir_path):
     if not os.path.exists(dir_path):
         os.makedirs(dir_path)
 
-def get_appended_votes_df(stats_df, season):
+def get_appended_votes_df(stats_df, season, votes_df=None):
     """
     Returns a DataFrame object identical to the one passed as an argument, but with the MVP voting stats from the passed season appended to the listed.
 
     :param stats_df: A DataFrame object containing NBA season average statistics.
     :param season: An integer value representing the season from which MVP voting should be retrieved. For instance, an inputted season value of 2019 returns the voting record from the 2019-2020 season. 
+    :param votes_df: A DataFrame holding the season's MVP voting (its "mvp_votes" raw source). Retrieved if not passed.
     :return: An identical DataFrame object to the one passed, but with MVP voting stats for the passed season appended.
     """
-    voting_maps_list = mvp_votes.get_mvp_voting_map(season)
-    voting_maps_df = pd.DataFrame(voting_maps_list)
+    voting_maps_df = get_raw_source_df(season, "mvp_votes") if votes_df is None else votes_df
 
     df_with_votes = pd.merge(stats_df, voting_maps_df, how="left")
 
@@ -93,104 +576,148 @@ def get_appended_votes_df(stats_df, season):
 
     return df_with_votes
 
-def get_team_record_df(stats_df, season):
+def get_team_record_df(stats_df, season, record_df=None):
     """
     Returns a DataFrame object identical to the one passed as an argument, but with the record of the team each player played for in the passed season appended to the DataFrame.
 
     :param stats_df: A DataFrame object containing NBA season average statistics.
     :param season: An integer value representing the season from which MVP voting should be retrieved. For instance, an inputted season value of 2019 returns the voting record from the 2019-2020 season. 
+    :param record_df: A DataFrame holding the season's team records, with `team_id` and `winning_perc` columns (its "standings" raw source). Retrieved if not passed.
     :return: An identical DataFrame object to the one passed, but with team winning percentages for the passed season appended.
     """
-    record = team_records.get_team_record_map(season)
-    record_df = pd.DataFrame.from_dict(record, orient="index", columns=["winning_perc"])
+    record_df = get_raw_source_df(season, "standings") if record_df is None else record_df
 
-    return pd.merge(stats_df, record_df, how="left", left_on="team_id", right_index=True)
+    return pd.merge(stats_df, record_df.set_index("team_id"), how="left", left_on="team_id", right_index=True)
 
-def get_advanced_stats_df(stats_df, season):
+def get_advanced_stats_df(stats_df, season, advanced_stats_df=None):
     """
     Returns a DataFrame object identical to the one passed as an argument, but with the advanced season stats of each player who played in the passed season appended to the DataFrame.
 
     :param stats_df: A DataFrame object containing NBA season average statistics.
     :param season: An integer value representing the season from which MVP voting should be retrieved. For instance, an inputted season value of 2019 returns the voting record from the 2019-2020 season. 
+    :param advanced_stats_df: A DataFrame holding the season's advanced stats (its "advanced" raw source). Retrieved if not passed.
     :return: An identical DataFrame to the one passed, but with the advanced season stats for the passed season appended.
     """
-    advanced_stats_df = advanced_stats.get_full_advanced_stats_df(season)
+    advanced_stats_df = advanced_stats.get_full_advanced_stats_df(season) if advanced_stats_df is None else advanced_stats_df
     cols_to_use = ["id"] + advanced_stats_df.columns.difference(stats_df.columns).to_list()
     
     return pd.merge(stats_df, advanced_stats_df[cols_to_use], how="left")
 
-def get_league_leaders_df(stats_df, season):
+def get_season_leaders_df(season):
     """
-    Returns a DataFrame object identical to the one passed as an argument, but with binary fields corresponding to whether or not each player led the league in a significant stat category.
+    Returns a DataFrame object holding the league leader of each significant stat category and each scaled field in the passed season. Scaled fields, and significant stat categories that were not yet recorded in the season (see `STAT_CATEGORY_FIRST_SEASONS`), are left out if they are not found on the league leaders page; `feature_engineering.get_leader_values()` falls back to the season's highest value for them.
 
-    :param stats_df: A DataFrame object containing NBA season average statistics.
-    :param season: An integer value representing the season from which MVP voting should be retrieved. For instance, an inputted season value of 2019 returns the voting record from the 2019-2020 season. 
-    :return: An identical DataFrame to the one passed, but with binary fields corresponding to whether or not each player led the league in a significant stat category appended.
+    :param season: An integer value representing the season from which league leaders should be retrieved.
+    :return: A DataFrame object with `player_id`, `field`, `value` and `season` columns.
     """
-    to_return_df = stats_df
-    
-    league_leaders_df = league_leaders.get_full_league_leaders_df(season, SIGNIFICANT_STAT_CATEGORIES)
-    fields = league_leaders_df.field.unique().tolist()
+    significant_categories = [field for field in SIGNIFICANT_STAT_CATEGORIES if is_stat_category_recorded(field, season)]
+    league_leaders_df = league_leaders.get_full_league_leaders_df(season, significant_categories)
+    scaled_fields = [field for field in feature_engineering.SCALED_FIELDS if field not in significant_categories]     # Every significant stat category is also a scaled field
 
-    for field in fields:
-        player_id = league_leaders_df.loc[league_leaders_df["field"] == field, "player_id"].item()
-        stats_df[f"leader_{field}"] = np.where(stats_df.id == player_id, 1, 0)
+    leaders_df = pd.concat([league_leaders_df, league_leaders.get_full_league_leaders_df(season, scaled_fields, skip_missing=True)], ignore_index=True)
+    leaders_df["season"] = season
 
-    return to_return_df
+    return leaders_df
 
-def get_feature_engineered_df(stats_df, season):
+def is_stat_category_recorded(field, season):
     """
-    Returns a DataFrame object with feature engineering techniques (each of which is detailed in `notebooks/feature_engineering.ipynb`) are applied to the passed data.
-    
-    :param stats_df: A DataFrame object containing NBA season average statistics.
-    :param season: An integer value representing the season from which MVP voting should be retrieved. For instance, an inputted season value of 2019 returns the voting record from the 2019-2020 season. 
-    :return: An identical DataFrame to the one passed, but with fields feature engineered to prepare for insertion in a predictive model.
+    Returns a boolean corresponding to whether or not the passed stat category was recorded in the passed season.
+
+    :param field: A stat category (e.g., "blk_per_g").
+    :param season: An integer used to retrieve an NBA season from the balldontlie API.
+    :return: TRUE if the category was recorded in the season, FALSE otherwise.
     """
-    # 0. Convert all values from string to float/integer if number-like
-    stats_df = stats_df.apply(lambda column: convert_col_types(column), axis=0)
-    
-    # 1. Add MVP voting rank
-    stats_df["rank"] = stats_df.points_won.rank(method="min", ascending=False)
-    stats_df.loc[stats_df.points_won == 0, "rank"] = float("nan")
-    
-    # 2. Scale major season average statistics fields
-    scaled_fields = ["pts_per_g", "ast_per_g", "trb_per_g", "blk_per_g", "stl_per_g", "tov_per_g", "efg_pct"]   # fields that are used to create new scaled fields
-    
-    for field in scaled_fields:
-        stats_df = scale_field(stats_df, season, field)
-    
-    return stats_df
+    return season >= STAT_CATEGORY_FIRST_SEASONS.get(field, FIRST_MVP_SEASON)
 
-def convert_col_types(column):
+def load_league_leaders(seasons):
     """
-    Given a passed column from the season averages data with all string values, converts all number-like strings to floats or integers and returns a column holding the converted values. If a value stored is not number-like, then the original string value is still kept in its corresponding index.
+    Returns a DataFrame object holding the stored league leaders of the passed seasons. Each season's leaders are read from its "leaders" raw source or, for seasons built before the raw sources were stored, from the `{season}_leaders.csv` file stored next to its stats (see `get_legacy_leaders_csv_name()`). Seasons whose league leaders are not stored at all are left out.
 
-    :param column: An unformatted Series object representing the column of a NBA season average statistics DataFrame.
-    :return: A column with all number-like values in the passed columns converted to either integers or floats, with all other strings retaining their original value.
+    :param seasons: A list of the seasons whose league leaders should be read.
+    :return: A DataFrame object with `player_id`, `field`, `value` and `season` columns.
     """
-    to_return_col = pd.to_numeric(column, errors="coerce")      # Converts all strings containing number-like values to floats or integers. All other values are filled with NaN
-    if to_return_col.isna().sum() == len(to_return_col):    #
-        to_return_col = to_return_col.fillna(column)    # Fills all NaN values with their value from the original column
-    
-    return to_return_col
+    leaders_dfs = []
 
-def scale_field(stats_df, season, field):
+    for season in seasons:
+        if csv_exists(get_raw_source_name(season, "leaders")):
+            leaders_dfs.append(read_raw_source(season, "leaders"))
+        elif csv_exists(get_legacy_leaders_csv_name(season)):
+            leaders_dfs.append(pd.read_csv(get_legacy_leaders_csv_name(season)))
+
+    if not leaders_dfs:
+        return pd.DataFrame(columns=["player_id", "field", "value", "season"])
+
+    return pd.concat(leaders_dfs, ignore_index=True)
+
+def get_legacy_leaders_csv_name(season):
     """
-    Given a passed DataFrame and field, scales that field proportional to the league leader - the league leader in that field has a value of 1, all other players have a scaled value of their stat value divided by the stat value of the league leader.
-    
+    Returns the full path of the CSV file in which the league leaders of the passed season were stored before the raw sources of each season were stored.
+
+    :param season: The season of the league leaders.
+    :return: The path to the CSV file.
+    """
+    return os.path.join(SEASON_AVERAGES_DIR, str(season) + "_leaders.csv")
+
+def rebuild_features(first_season=None, last_season=None):
+    """
+    Recomputes the engineered features of every stored season in the passed range from the stored data, without retrieving any page, and rewrites the seasons' CSV files and partitions of the season dataset. Seasons with stored raw sources are rebuilt by their dependency graph, which only recomputes the seasons whose merged table, league leaders or feature engineering code changed; the features of seasons built before the raw sources were stored are recomputed all at once from their stored stats.
+
+    :param first_season: The first season to be rebuilt; `FIRST_SEASON` by default.
+    :param last_season: The last season to be rebuilt; `CURRENT_SEASON` by default.
+    :return: A list of the seasons whose stats were rewritten.
+    """
+    first_season = FIRST_SEASON if first_season is None else first_season
+    last_season = CURRENT_SEASON if last_season is None else last_season
+
+    graph_seasons = [season for season in range(first_season, last_season + 1) if os.path.isfile(get_manifest_name(season))]
+    rebuilt_seasons = [season for season in graph_seasons if "stats" in get_season_graph(season).build(["stats"])]
+
+    stats_df = load_seasons(first_season, last_season, downcast=False, use_cache=False)
+
+    if stats_df.empty or stats_df.season.isin(graph_seasons).all():
+        return rebuilt_seasons
+
+    stats_df = stats_df.loc[~stats_df.season.isin(graph_seasons)]
+    stats_df = feature_engineering.get_feature_engineered_df(stats_df, load_league_leaders(stats_df.season.unique().tolist()))
+
+    for season, season_df in stats_df.groupby("season"):
+        csv_name = get_season_csv_name(season)
+        season_df = season_df.reset_index(drop=True)
+
+        if csv_exists(csv_name):    # Keeps the column order of the stored CSV file, with any new feature appended
+            stored_cols = pd.read_csv(csv_name, nrows=0).columns.intersection(season_df.columns).tolist()
+            season_df = season_df[stored_cols + season_df.columns.difference(stored_cols, sort=False).tolist()]
+
+        season_df.to_csv(csv_name, index=False)
+        season_dataset.write_season(season_df, season)
+        rebuilt_seasons.append(season)
+
+    return sorted(rebuilt_seasons)
+
+def get_league_leaders_df(stats_df, season, leaders_df=None):
+    """
+    Returns a DataFrame object identical to the one passed as an argument, but with binary fields corresponding to whether or not each player led the league in a significant stat category. No player is flagged in a category whose leader is not held by the league leaders (e.g., blocks before they were recorded).
+
     :param stats_df: A DataFrame object containing NBA season average statistics.
     :param season: An integer value representing the season from which MVP voting should be retrieved. For instance, an inputted season value of 2019 returns the voting record from the 2019-2020 season. 
-    :param field: The field which will be scaled proportional to the league leader.
-    :return: An identical DataFrame as the one passed as `stats_df`, but with the new scaled field appended.
+    :param leaders_df: A DataFrame returned by `get_season_leaders_df()` for the passed season. Retrieved if not passed.
+    :return: An identical DataFrame to the one passed, but with binary fields corresponding to whether or not each player led the league in a significant stat category appended.
     """
-    try:
-        league_leader_value = league_leaders.get_league_leader(season, field)["value"]
-    except league_leaders.FieldNotFound:    # Some fields are not found on the basketball-reference.com league leaders page, exception raised in this case
-        league_leader_value = stats_df[field].max()
-
-    stats_df[f"scaled_{field}"] = stats_df[field] / league_leader_value     # league leader has value of 1, all other rows are a decimal value in range [0, 1)
+    to_return_df = stats_df
     
-    return stats_df
+    league_leaders_df = get_season_leaders_df(season) if leaders_df is None else leaders_df
+    league_leaders_df = league_leaders_df.loc[league_leaders_df.field.isin(SIGNIFICANT_STAT_CATEGORIES)]
+    fields = league_leaders_df.field.unique().tolist()
+
+    for field in SIGNIFICANT_STAT_CATEGORIES:
+        if field not in fields:
+            stats_df[f"leader_{field}"] = 0
+            continue
+
+        player_id = league_leaders_df.loc[league_leaders_df["field"] == field, "player_id"].item()
+        stats_df[f"leader_{field}"] = np.where(stats_df.id == player_id, 1, 0)
+
+    return to_return_df
 
 def drop_duplicate_cols(stats_df):
     """
@@ -0,0 +1,369 @@
+"""
+A long-running service that keeps the feature table of the current season in memory and serves the ranked MVP candidates over a local HTTP endpoint. May be run with `python main.py serve`, after which:
+
+    curl http://127.0.0.1:8000/mvp?limit=10
+    curl http://127.0.0.1:8000/status
+
+A background thread refreshes the table on a schedule through `load_data.refresh_current_season()`, which only retrieves the sources whose time to live has passed. The scraping runs in a child process, so that parsing pages never holds up the threads answering requests, and each refresh precomputes the JSON of the rankings, so a request is answered from memory in about a millisecond and never waits on a scrape.
+"""
+
+import datetime
+import json
+import threading
+import time
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(currentdir)
+sys.path.append(parentdir)
+
+import load_data
+import feature_engineering
+import season_dataset
+import net.replay as replay
+import scraping.basketball_reference.bball_ref_utils as bball_ref_utils
+from scraping.basketball_reference.page_cache import PageCache
+
+REFRESH_INTERVAL = 10 * 60  # Seconds between refreshes; the balldontlie API updates about every 10 minutes
+RACE_CANDIDATES = 15        # Players ranked in the MVP race
+
+# The columns of each ranked candidate returned by the endpoint, along with its rank and score
+RACE_COLUMNS = ["id", "player", "team_id", "g", "pts_per_g", "trb_per_g", "ast_per_g", "ws", "ws_per_48", "per", "bpm", "vorp", "winning_perc", "rank_ws"]
+
+def get_race_score(stats_df):
+    """
+    Returns the MVP race score of each player: the mean of the player's percentiles within the season in the ranked fields (see `feature_engineering.RANKED_FIELDS`), so that a player is rewarded for being near the top of many categories at once.
+
+    :param stats_df: A DataFrame object holding the engineered features of a season.
+    :return: A Series of scores in the range (0, 1], aligned with the passed DataFrame.
+    """
+    pctl_cols = [f"pctl_{field}" for field in feature_engineering.RANKED_FIELDS if f"pctl_{field}" in stats_df.columns]
+
+    return stats_df[pctl_cols].astype("float64").mean(axis=1)
+
+def get_refresh_settings():
+    """
+    Returns the settings of this process that determine where and how the current season is refreshed, to be applied in the process running the refresh.
+
+    :return: A dictionary of picklable settings.
+    """
+    return {
+        "current_season": load_data.CURRENT_SEASON,
+        "season_averages_dir": load_data.SEASON_AVERAGES_DIR,
+        "raw_dir": load_data.RAW_DIR,
+        "source_ttls": load_data.SOURCE_TTLS,
+        "dataset_dir": season_dataset.DATASET_DIR,
+        "cache_dir": bball_ref_utils.PAGE_CACHE.cache_dir,
+        "http_mode": replay.mode,
+        "fixture_dir": replay.fixture_dir,
+        "stand_in_url": replay.stand_in_url
+    }
+
+def refresh_season(settings, ttls=None):
+    """
+    Applies the passed settings and refreshes the current season (see `load_data.refresh_current_season()`). Run in the service's child process.
+
+    :param settings: A dictionary returned by `get_refresh_settings()`.
+    :param ttls: A dictionary mapping in-season sources to the number of seconds each remains valid.
+    :return: A list of the ids of the players whose rows were added or changed.
+    """
+    load_data.CURRENT_SEASON = settings["current_season"]
+    load_data.SEASON_AVERAGES_DIR = settings["season_averages_dir"]
+    load_data.RAW_DIR = settings["raw_dir"]
+    load_data.SOURCE_TTLS = settings["source_ttls"]
+    season_dataset.DATASET_DIR = settings["dataset_dir"]
+    replay.configure(settings["http_mode"], settings["fixture_dir"], settings["stand_in_url"])
+
+    if bball_ref_utils.PAGE_CACHE.cache_dir != settings["cache_dir"]:
+        bball_ref_utils.PAGE_CACHE = PageCache(settings["cache_dir"])
+
+    return load_data.refresh_current_season(ttls)
+
+def get_mvp_race_df(stats_df, num_candidates=RACE_CANDIDATES, score_func=get_race_score):
+    """
+    Returns the MVP candidates of the passed season, ranked by the passed score.
+
+    :param stats_df: A DataFrame object holding the engineered features of a season.
+    :param num_candidates: The number of candidates returned.
+    :param score_func: A function taking the candidates' rows and returning a Series of scores, higher being better; `get_race_score()` by default.
+    :return: A DataFrame holding the `RACE_COLUMNS` of the candidates, along with their `race_rank` and `score`, best first.
+    """
+    candidates_df = feature_engineering.get_candidates(stats_df).copy()
+    candidates_df["score"] = score_func(candidates_df)
+    candidates_df = candidates_df.sort_values("score", ascending=False, kind="stable").head(num_candidates)
+    candidates_df["race_rank"] = range(1, len(candidates_df) + 1)
+
+    cols = ["race_rank", "score"] + [col for col in RACE_COLUMNS if col in candidates_df.columns]
+
+    return candidates_df[cols].reset_index(drop=True)
+
+class MVPService():
+
+    def __init__(self, host="127.0.0.1", port=8000, refresh_interval=REFRESH_INTERVAL, num_candidates=RACE_CANDIDATES, check_games=True, score_func=get_race_score):
+        """
+        Constructor method; creates an MVPService object. Nothing is loaded or served until `start()` is called.
+
+        :param host: The address the HTTP endpoint binds to.
+        :param port: The port the HTTP endpoint listens on. A free port is chosen when 0.
+        :param refresh_interval: The number of seconds between refreshes of the current season.
+        :param num_candidates: The number of candidates ranked.
+        :param check_games: A boolean corresponding to whether or not each refresh should ask the balldontlie API for newly finished games, retrieving every in-season source at once when there are any. When FALSE, or if the API cannot be reached, each source is only retrieved once its time to live has passed (see `load_data.SOURCE_TTLS`).
+        :param score_func: The function by which the candidates are ranked (see `get_mvp_race_df()`).
+        """
+        self.refresh_interval = refresh_interval
+        self.num_candidates = num_candidates
+        self.check_games = check_games
+        self.score_func = score_func
+
+        self.stats_df = None    # The feature table of the current season, replaced by each refresh that changes it
+        self.refresh_count = 0
+        self.last_refresh = None
+        self.last_error = None
+
+        self.__snapshot = None  # The precomputed response of the rankings, replaced as a whole so that requests never see a partial update
+        self.__seen_games = None
+        self.__stop = threading.Event()
+        self.__executor = None  # Runs the refreshes in a child process, kept alive between refreshes
+        self.__refresh_thread = None
+        self.__server_thread = None
+
+        self.httpd = ThreadingHTTPServer((host, port), MVPRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.service = self
+
+    @property
+    def url(self):
+        """
+        The base URL of the HTTP endpoint.
+        """
+        host, port = self.httpd.server_address[:2]
+
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Loads the stored feature table of the current season, if any, then starts serving requests and refreshing the table on background threads. The first refresh starts right away.
+
+        :return: The MVPService object.
+        """
+        if load_data.get_season_source(load_data.CURRENT_SEASON) is not None:
+            self.__update(load_data.load_seasons(load_data.CURRENT_SEASON, load_data.CURRENT_SEASON, downcast=False, use_cache=False))
+
+        self.__stop.clear()
+        self.__executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))     # Spawned, as forking a process running server threads is unsafe
+        self.__server_thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.__server_thread.start()
+        self.__refresh_thread = threading.Thread(target=self.__refresh_loop, daemon=True)
+        self.__refresh_thread.start()
+
+        return self
+
+    def stop(self):
+        """
+        Stops refreshing the table and serving requests, and releases the endpoint's socket. A refresh in progress is allowed to finish.
+        """
+        self.__stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+        for thread in [self.__server_thread, self.__refresh_thread]:
+            if thread:
+                thread.join()
+
+        if self.__executor:
+            self.__executor.shutdown()
+
+    def refresh(self):
+        """
+        Brings the feature table of the current season up to date and, if it changed, recomputes the rankings. Called on a schedule by the refresh thread; requests keep being answered from the previous rankings while it runs. The season is refreshed in the service's child process once the service has started, and in this process otherwise.
+
+        :return: TRUE if the rankings were recomputed, FALSE otherwise.
+        """
+        ttls = None
+
+        if self.check_games and self.__has_new_games():
+            ttls = {source: 0 for source in load_data.IN_SEASON_SOURCES}    # Every in-season source changes when a game is finished
+
+        if self.__executor is not None:
+            changed = self.__executor.submit(refresh_season, get_refresh_settings(), ttls).result()
+        else:
+            changed = load_data.refresh_current_season(ttls)
+
+        self.refresh_count += 1
+        self.last_refresh = time.time()
+
+        if not changed and self.stats_df is not None:
+            return False
+
+        self.__update(load_data.load_seasons(load_data.CURRENT_SEASON, load_data.CURRENT_SEASON, downcast=False, use_cache=False))
+
+        return True
+
+    def get_response(self, limit=None):
+        """
+        Returns the body of the rankings response from the precomputed rankings.
+
+        :param limit: The maximum number of candidates returned; all ranked candidates by default.
+        :return: The JSON body (bytes), or None if the rankings have not been computed yet.
+        """
+        snapshot = self.__snapshot
+
+        if snapshot is None:
+            return None
+
+        rows = snapshot["rows"] if limit is None else snapshot["rows"][:max(0, limit)]
+
+        return snapshot["head"] + b",".join(rows) + b"]}"
+
+    def get_status(self):
+        """
+        Returns the state of the service.
+
+        :return: A dictionary holding the season, the number of refreshes, the time of the last refresh and of the current rankings, and the last refresh error (if the last refresh failed).
+        """
+        snapshot = self.__snapshot
+
+        return {
+            "season": load_data.CURRENT_SEASON,
+            "ready": snapshot is not None,
+            "updated": snapshot["updated"] if snapshot else None,
+            "last_refresh": format_time(self.last_refresh),
+            "refresh_count": self.refresh_count,
+            "refresh_interval": self.refresh_interval,
+            "last_error": self.last_error
+        }
+
+    def __refresh_loop(self):
+        """
+        Refreshes the table every `refresh_interval` seconds until the service is stopped. A failed refresh is reported and retried at the next interval; the previous rankings keep being served in the meantime.
+        """
+        while not self.__stop.is_set():
+            start = time.monotonic()
+
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = "%s: %s" % (type(e).__name__, e)
+                traceback.print_exc()
+
+            self.__stop.wait(max(0.0, self.refresh_interval - (time.monotonic() - start)))
+
+    def __has_new_games(self):
+        """
+        Returns a boolean corresponding to whether or not a game of the current season has finished since the last check, according to the balldontlie API. Only the games of the last two days are queried.
+
+        :return: TRUE if a game has finished since the last check (or on the first check), FALSE otherwise or if the API cannot be reached.
+        """
+        from data.api.ball_dont_lie_api import BallDontLieAPI     # Imported on the first check, so that the service can run without it when `check_games` is FALSE
+
+        start_date = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+
+        try:
+            games = BallDontLieAPI().query(query_type="games", seasons=[load_data.CURRENT_SEASON], start_date=start_date)
+        except Exception as e:
+            print("Could not check the balldontlie API for finished games (%s); sources are refreshed by their time to live." % e, file=sys.stderr)
+            return False
+
+        finished = {game["id"] for game in games if game.get("status") == "Final"}
+        has_new_games = self.__seen_games is None or bool(finished - self.__seen_games)
+        self.__seen_games = finished
+
+        return has_new_games
+
+    def __update(self, stats_df):
+        """
+        Holds the passed feature table and precomputes the response of its rankings.
+
+        :param stats_df: A DataFrame object holding the engineered features of the current season.
+        """
+        race_df = get_mvp_race_df(stats_df, self.num_candidates, self.score_func)
+        race_df = race_df.astype(object).where(race_df.notna(), None)   # NaN is not valid JSON
+        updated = format_time(time.time())
+
+        head = json.dumps({"season": load_data.CURRENT_SEASON, "updated": updated})[:-1] + ', "candidates": ['
+
+        self.stats_df = stats_df
+        self.__snapshot = {
+            "updated": updated,
+            "head": head.encode(),
+            "rows": [json.dumps(row, default=str).encode() for row in race_df.to_dict("records")]
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+class MVPRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers get requests of the rankings (`/mvp`, with an optional `limit` parameter) and of the state of the service (`/status`).
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        service = self.server.service
+        split_path = urlsplit(self.path)
+
+        if split_path.path == "/status":
+            self.__send(200, json.dumps(service.get_status()).encode())
+        elif split_path.path in ["/", "/mvp"]:
+            query = parse_qs(split_path.query)
+
+            try:
+                limit = int(query["limit"][0]) if "limit" in query else None
+            except ValueError:
+                self.__send(400, b'{"error": "limit must be an integer"}')
+                return
+
+            body = service.get_response(limit)
+
+            if body is None:
+                self.__send(503, b'{"error": "the rankings have not been computed yet"}', {"Retry-After": "5"})
+            else:
+                self.__send(200, body)
+        else:
+            self.__send(404, b'{"error": "not found"}')
+
+    def __send(self, status_code, content, headers=None):
+        """
+        Sends a JSON response with the passed status, headers and body.
+
+        :param status_code: The status code of the response.
+        :param content: The JSON body (bytes) of the response.
+        :param headers: A dictionary of additional headers to be sent.
+        """
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Cache-Control", "no-cache")
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+def format_time(timestamp):
+    """
+    Returns the passed time as an ISO 8601 string.
+
+    :param timestamp: A number of seconds since the epoch, or None.
+    :return: A string such as "2021-02-01T18:30:00", or None.
+    """
+    if timestamp is None:
+        return None
+
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
@@ -0,0 +1,220 @@
+"""
+Record/replay layer through which every HTTP request of the scrapers and the balldontlie client is made. Requests that reach the network are sent through the pooled session in `net/session.py`.
+
+The layer runs in one of four modes:
+    - live: requests are sent to their real host (default).
+    - record: requests are sent to their real host and each response is saved to the fixture directory.
+    - replay: responses are read from the fixture directory; no request leaves the process.
+    - stand_in: requests are sent to a local stand-in server (see `net/stand_in_server.py`) serving the fixture directory.
+
+The mode may be set through `configure()` or through the NBA_HTTP_MODE, NBA_FIXTURE_DIR and NBA_STAND_IN_URL environment variables.
+"""
+
+import hashlib
+import json
+import os
+from urllib.parse import urlencode, urlsplit, parse_qsl
+
+from . import session
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+STAND_IN = "stand_in"
+MODES = [LIVE, RECORD, REPLAY, STAND_IN]
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "fixtures")
+
+mode = os.environ.get("NBA_HTTP_MODE", LIVE)
+fixture_dir = os.environ.get("NBA_FIXTURE_DIR", FIXTURE_DIR)
+stand_in_url = os.environ.get("NBA_STAND_IN_URL", "http://127.0.0.1:8765")
+
+def configure(new_mode=None, new_fixture_dir=None, new_stand_in_url=None):
+    """
+    Sets the mode in which requests are made, along with the fixture directory and stand-in server used by the record, replay and stand-in modes. Arguments that are not passed keep their current value.
+
+    :param new_mode: One of "live", "record", "replay" or "stand_in".
+    :param new_fixture_dir: The directory in which responses are recorded and from which they are replayed.
+    :param new_stand_in_url: The base URL of the local stand-in server (e.g., "http://127.0.0.1:8765").
+    """
+    global mode, fixture_dir, stand_in_url
+
+    if new_mode is not None:
+        if new_mode not in MODES:
+            raise ValueError("Unknown HTTP mode '%s'; acceptable modes are %s" % (new_mode, ", ".join(MODES)))
+
+        mode = new_mode
+
+    if new_fixture_dir is not None:
+        fixture_dir = new_fixture_dir
+
+    if new_stand_in_url is not None:
+        stand_in_url = new_stand_in_url
+
+def get(url, params=None):
+    """
+    Performs a get request of the passed URL in the configured mode and returns the response.
+
+    :param url: The URL to be requested.
+    :param params: A dictionary of query parameters to be sent with the request.
+    :return: A response object exposing `status_code`, `reason`, `headers`, `content` and `json()`.
+    """
+    if mode == REPLAY:
+        return load_fixture(url, params)
+
+    if mode == STAND_IN:
+        return session.get(get_stand_in_url(url), params=params)
+
+    response = session.get(url, params=params)
+
+    if mode == RECORD:
+        save_fixture(url, params, response)
+
+    return response
+
+def get_canonical_query(url, params=None):
+    """
+    Returns the query of the passed URL and parameters as a sorted list of key/value pairs, so that the same request always produces the same query regardless of parameter order or whether the parameters were passed separately or as part of the URL.
+
+    :param url: The URL being requested.
+    :param params: A dictionary of query parameters sent with the request.
+    :return: A sorted list of (key, value) string tuples.
+    """
+    query = parse_qsl(urlsplit(url).query, keep_blank_values=True)
+
+    if params:
+        query.extend(parse_qsl(urlencode(params, doseq=True), keep_blank_values=True))
+
+    return sorted(query)
+
+def get_fixture_key(url, params=None):
+    """
+    Returns the key under which the response to the passed request is stored in the fixture directory.
+
+    :param url: The URL being requested.
+    :param params: A dictionary of query parameters sent with the request.
+    :return: A tuple holding the host of the URL and a hash identifying the request.
+    """
+    split_url = urlsplit(url)
+    canonical_request = split_url.netloc + split_url.path + "?" + urlencode(get_canonical_query(url, params))
+
+    return split_url.netloc, hashlib.sha256(canonical_request.encode()).hexdigest()[:32]
+
+def get_fixture_paths(url, params=None, directory=None):
+    """
+    Returns the paths of the files holding the metadata and the body of the recorded response to the passed request.
+
+    :param url: The URL being requested.
+    :param params: A dictionary of query parameters sent with the request.
+    :param directory: The fixture directory; the configured fixture directory by default.
+    :return: A tuple holding the path of the metadata (JSON) file and the path of the body file.
+    """
+    host, key = get_fixture_key(url, params)
+    base_path = os.path.join(directory or fixture_dir, host, key)
+
+    return base_path + ".json", base_path + ".body"
+
+def save_fixture(url, params, response, directory=None):
+    """
+    Saves the passed response to the fixture directory under the key of the request that produced it.
+
+    :param url: The URL that was requested.
+    :param params: A dictionary of query parameters sent with the request.
+    :param response: The response returned from the request.
+    :param directory: The fixture directory; the configured fixture directory by default.
+    """
+    meta_path, body_path = get_fixture_paths(url, params, directory)
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+    metadata = {
+        "url": url,
+        "query": get_canonical_query(url, params),
+        "status_code": response.status_code,
+        "reason": response.reason,
+        "content_type": response.headers.get("Content-Type", "text/html")
+    }
+
+    with open(body_path, "wb") as f:
+        f.write(response.content)
+
+    with open(meta_path, "w") as f:
+        json.dump(metadata, f, indent=2)
+
+def load_fixture(url, params=None, directory=None):
+    """
+    Returns the recorded response to the passed request.
+
+    :param url: The URL being requested.
+    :param params: A dictionary of query parameters sent with the request.
+    :param directory: The fixture directory; the configured fixture directory by default.
+    :return: A ReplayResponse object holding the recorded response.
+    """
+    meta_path, body_path = get_fixture_paths(url, params, directory)
+
+    try:
+        with open(meta_path) as f:
+            metadata = json.load(f)
+
+        with open(body_path, "rb") as f:
+            content = f.read()
+    except FileNotFoundError:
+        raise FixtureNotFound("No recorded response for %s with query %s" % (url, get_canonical_query(url, params)))
+
+    return ReplayResponse(url, metadata["status_code"], metadata["reason"], {"Content-Type": metadata["content_type"]}, content)
+
+def get_stand_in_url(url):
+    """
+    Returns the URL through which the local stand-in server serves the passed URL. The host of the original URL becomes the first segment of the stand-in URL's path.
+
+    :param url: The URL of the real host.
+    :return: The equivalent URL on the stand-in server.
+    """
+    split_url = urlsplit(url)
+    stand_in = stand_in_url.rstrip("/") + "/" + split_url.netloc + split_url.path
+
+    if split_url.query:
+        stand_in += "?" + split_url.query
+
+    return stand_in
+
+class ReplayResponse():
+    """
+    A recorded response, exposing the subset of the `requests.Response` interface used by the scrapers and the balldontlie client.
+    """
+
+    def __init__(self, url, status_code, reason, headers, content):
+        """
+        Constructor method; creates a ReplayResponse object from the parts of a recorded response.
+
+        :param url: The URL that was requested.
+        :param status_code: The status code of the recorded response.
+        :param reason: The reason phrase of the recorded response.
+        :param headers: A dictionary of the recorded response headers.
+        :param content: The body (bytes) of the recorded response.
+        """
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        """
+        The body of the recorded response decoded as UTF-8.
+        """
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        """
+        Returns the body of the recorded response parsed as JSON.
+
+        :return: The JSON object held by the recorded response.
+        """
+        return json.loads(self.content)
+
+class FixtureNotFound(Exception):
+    """
+    An exception to be raised when no recorded response exists for a request made in replay mode.
+    """
+    pass
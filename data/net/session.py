@@ -0,0 +1,84 @@
+"""
+The HTTP transport shared by every fetcher: a single `requests.Session` with keep-alive connection pooling, gzip, a bounded number of connections per host and a common user agent.
+"""
+
+import threading
+
+USER_AGENT = "NBA-Analytics/1.0 (+https://github.com/jasondamico/NBA-Analytics)"
+MAX_CONNECTIONS_PER_HOST = 8    # Requests beyond this number wait for a pooled connection to be released
+MAX_POOLED_HOSTS = 4            # basketball-reference.com, balldontlie.io and the local stand-in server
+REQUEST_TIMEOUT = 30            # Seconds to wait for a host to respond before giving up
+
+__session = None
+__session_lock = threading.Lock()
+
+def get_session():
+    """
+    Returns the session shared by every fetcher, creating it the first time it is needed.
+
+    :return: A requests.Session object.
+    """
+    global __session
+
+    with __session_lock:
+        if __session is None:
+            __session = __create_session()
+
+        return __session
+
+def configure(user_agent=None, max_connections_per_host=None, request_timeout=None):
+    """
+    Changes the settings of the shared session. Arguments that are not passed keep their current value. The session is recreated with the new settings the next time it is needed.
+
+    :param user_agent: The User-Agent header sent with every request.
+    :param max_connections_per_host: The maximum number of open connections to a single host.
+    :param request_timeout: The number of seconds to wait for a host to respond.
+    """
+    global USER_AGENT, MAX_CONNECTIONS_PER_HOST, REQUEST_TIMEOUT, __session
+
+    if user_agent is not None:
+        USER_AGENT = user_agent
+
+    if max_connections_per_host is not None:
+        MAX_CONNECTIONS_PER_HOST = max_connections_per_host
+
+    if request_timeout is not None:
+        REQUEST_TIMEOUT = request_timeout
+
+    with __session_lock:
+        if __session is not None:
+            __session.close()
+
+        __session = None
+
+def get(url, params=None):
+    """
+    Performs a get request of the passed URL through the shared session.
+
+    :param url: The URL to be requested.
+    :param params: A dictionary of query parameters to be sent with the request.
+    :return: The requests.Response object returned.
+    """
+    return get_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+
+def __create_session():
+    """
+    Creates a session whose connections are kept alive and pooled per host.
+
+    :return: A requests.Session object.
+    """
+    import requests     # Imported when the first request is made, so that importing a fetcher does not load requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive"
+    })
+
+    adapter = HTTPAdapter(pool_connections=MAX_POOLED_HOSTS, pool_maxsize=MAX_CONNECTIONS_PER_HOST, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
@@ -0,0 +1,172 @@
+"""
+A local HTTP server that stands in for basketball-reference.com and the balldontlie API by serving recorded fixtures, with configurable latency and injected 429 responses.
+
+Requests are made to http://<server>/<original host>/<original path>?<original query>, which is the form produced by `replay.get_stand_in_url()`. May be run on its own with:
+
+    python data/net/stand_in_server.py --fixtures data/fixtures --latency 0.05 --throttle-rate 0.1
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import net.replay as replay
+
+class StandInServer():
+
+    def __init__(self, fixture_dir=None, host="127.0.0.1", port=0, latency=0.0, throttle_rate=0.0, retry_after=1, seed=None):
+        """
+        Constructor method; creates a StandInServer object serving the passed fixture directory. The server is not started until `start()` is called.
+
+        :param fixture_dir: The directory holding the recorded fixtures; the fixture directory configured in `replay` by default.
+        :param host: The address the server binds to.
+        :param port: The port the server listens on. A free port is chosen when 0.
+        :param latency: The number of seconds the server waits before answering each request.
+        :param throttle_rate: The probability in [0, 1] that a request is answered with a 429 error instead of its fixture.
+        :param retry_after: The value, in seconds, of the Retry-After header sent with injected 429 errors.
+        :param seed: A seed for the random number generator deciding which requests are throttled, making a run reproducible.
+        """
+        self.fixture_dir = fixture_dir or replay.fixture_dir
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+
+        self.requests_served = 0
+        self.requests_throttled = 0
+        self.counts_lock = threading.Lock()     # Requests are handled on separate threads, each updating the counts
+
+        self.httpd = ThreadingHTTPServer((host, port), StandInRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.stand_in = self
+        self.thread = None
+
+    @property
+    def url(self):
+        """
+        The base URL of the server, to be passed to `replay.configure()`.
+        """
+        host, port = self.httpd.server_address[:2]
+
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Starts serving requests on a background thread and returns the server.
+
+        :return: The StandInServer object.
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+        return self
+
+    def stop(self):
+        """
+        Stops serving requests and releases the server's socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+        if self.thread:
+            self.thread.join()
+
+    def should_throttle(self):
+        """
+        Returns a boolean corresponding to whether or not the next request should be answered with an injected 429 error.
+
+        :return: TRUE if the request should be throttled, FALSE otherwise.
+        """
+        with self.random_lock:
+            return self.random.random() < self.throttle_rate
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers each get request with the fixture recorded for the equivalent request to the real host.
+    """
+
+    protocol_version = "HTTP/1.1"  # Keeps connections alive, as the real hosts do
+    disable_nagle_algorithm = True  # Headers and body are written separately, which would otherwise stall kept-alive connections
+
+    def do_GET(self):
+        stand_in = self.server.stand_in
+
+        if stand_in.latency:
+            time.sleep(stand_in.latency)
+
+        if stand_in.should_throttle():
+            with stand_in.counts_lock:
+                stand_in.requests_throttled += 1
+
+            self.__send(429, "Too Many Requests", "text/plain", b"Too Many Requests", {"Retry-After": str(stand_in.retry_after)})
+            return
+
+        original_url = "https:/" + self.path    # The path begins with "/<original host>"
+
+        try:
+            response = replay.load_fixture(original_url, directory=stand_in.fixture_dir)
+        except replay.FixtureNotFound as e:
+            self.__send(404, "Not Found", "text/plain", str(e).encode())
+            return
+
+        with stand_in.counts_lock:
+            stand_in.requests_served += 1
+
+        self.__send(response.status_code, response.reason, response.headers["Content-Type"], response.content)
+
+    def __send(self, status_code, reason, content_type, content, headers=None):
+        """
+        Sends a response with the passed status, headers and body.
+
+        :param status_code: The status code of the response.
+        :param reason: The reason phrase of the response.
+        :param content_type: The value of the Content-Type header.
+        :param content: The body (bytes) of the response.
+        :param headers: A dictionary of additional headers to be sent.
+        """
+        self.send_response(status_code, reason)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass    # Keeps the output of runs and benchmarks clean
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves recorded fixtures in place of basketball-reference.com and the balldontlie API.")
+    parser.add_argument("--fixtures", default=replay.fixture_dir, help="The directory holding the recorded fixtures.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering each request.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Probability that a request is answered with a 429 error.")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After value sent with injected 429 errors.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = StandInServer(args.fixtures, args.host, args.port, args.latency, args.throttle_rate, args.retry_after, args.seed)
+    print(f"Serving {args.fixtures} at {server.url}")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,483 @@
+"""
+Module containing the MVP prediction stage. The engineered features of every stored season are converted once into a feature matrix and label vectors (`award_share` and `rank`), stored as memory-mapped NumPy arrays with their column metadata, so that experiments load them instantly instead of reading CSV files and recomputing features. Models are trained and scored over the matrix in batches of rows, and evaluated by leaving one season out at a time across a pool of processes:
+
+    matrix = get_feature_matrix()
+    results_df = evaluate_loso(matrix, workers=4)
+
+Any object with scikit-learn's `fit(X, y)` and `predict(X)` methods may be used as a model; `RidgeModel`, which only needs NumPy, is used by default.
+"""
+
+import json
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import os, sys
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+
+import load_data
+
+MATRIX_DIR = os.path.join(currentdir, "feature_matrix")
+METADATA_NAME = "metadata.json"
+FEATURES_NAME = "features.npy"
+LABEL_NAMES = ["award_share", "rank"]   # Stored as `{label}.npy`; players who received no vote have an award share of 0 and no rank
+SEASONS_NAME = "seasons.npy"
+
+# Columns that are not features: the labels, the voting results they are derived from and the identifiers of each row
+NON_FEATURE_COLUMNS = ["id", "player", "pos", "team_id", "season", "votes_first", "points_won", "points_max"] + LABEL_NAMES
+
+BATCH_SIZE = 4096   # Rows read from the memory-mapped matrix at a time when training and scoring
+
+class FeatureMatrix():
+    """
+    The feature matrix and label vectors of a range of seasons, memory-mapped from the files written by `build_feature_matrix()`. Rows are ordered by season, so the rows of each season are contiguous.
+    """
+
+    def __init__(self, directory=MATRIX_DIR):
+        """
+        Constructor method; opens the feature matrix stored in the passed directory. Only the metadata is read; the arrays are paged in from disk as they are used.
+
+        :param directory: The directory holding the matrix.
+        """
+        self.directory = directory
+
+        with open(os.path.join(directory, METADATA_NAME)) as f:
+            self.metadata = json.load(f)
+
+        self.columns = self.metadata["columns"]
+        self.ids = self.metadata["ids"]
+        self.players = self.metadata["players"]
+        self.season_bounds = {int(season): tuple(bounds) for season, bounds in self.metadata["season_bounds"].items()}   # Maps each season to the first and last (exclusive) of its rows
+
+        self.features = np.load(os.path.join(directory, FEATURES_NAME), mmap_mode="r")
+        self.labels = {label: np.load(os.path.join(directory, f"{label}.npy"), mmap_mode="r") for label in LABEL_NAMES}
+        self.seasons = np.load(os.path.join(directory, SEASONS_NAME), mmap_mode="r")
+
+    def __len__(self):
+        return self.features.shape[0]
+
+    def get_seasons(self, labeled=False):
+        """
+        Returns the seasons held by the matrix.
+
+        :param labeled: A boolean corresponding to whether or not only the seasons with MVP voting results (i.e., the completed seasons) should be returned.
+        :return: A list of seasons in ascending order.
+        """
+        return [season for season in sorted(self.season_bounds) if not labeled or season in self.metadata["labeled_seasons"]]
+
+    def get_row_ranges(self, seasons=None):
+        """
+        Returns the ranges of the rows of the passed seasons.
+
+        :param seasons: A list of seasons; every season by default.
+        :return: A list of (start, stop) tuples, one per season held by the matrix, in row order.
+        """
+        seasons = self.get_seasons() if seasons is None else seasons
+
+        return [self.season_bounds[season] for season in sorted(seasons) if season in self.season_bounds]
+
+    def iter_batches(self, seasons=None, label="award_share", batch_size=BATCH_SIZE):
+        """
+        Yields the rows of the passed seasons in batches, reading only one batch from disk at a time.
+
+        :param seasons: A list of seasons; every season by default.
+        :param label: The label returned along with the features, or None.
+        :param batch_size: The maximum number of rows of each batch.
+        :return: A generator of (start, features, labels) tuples, where `start` is the index of the batch's first row and `labels` is None if no label is passed.
+        """
+        for start, stop in self.get_row_ranges(seasons):
+            for batch_start in range(start, stop, batch_size):
+                batch_stop = min(stop, batch_start + batch_size)
+                labels = np.asarray(self.labels[label][batch_start:batch_stop]) if label else None
+
+                yield batch_start, np.asarray(self.features[batch_start:batch_stop]), labels
+
+    def get_rows(self, seasons=None, label="award_share"):
+        """
+        Returns the features and labels of the passed seasons as in-memory arrays.
+
+        :param seasons: A list of seasons; every season by default.
+        :param label: The label returned along with the features.
+        :return: A tuple holding the feature matrix and label vector of the seasons.
+        """
+        ranges = self.get_row_ranges(seasons)
+
+        return np.concatenate([self.features[start:stop] for start, stop in ranges]), np.concatenate([self.labels[label][start:stop] for start, stop in ranges])
+
+class RidgeModel():
+    """
+    A ridge regression trained from batches of rows: each batch only adds to running sums (see `partial_fit()`), so that the matrix never needs to be held in memory at once. Features are standardized when the model is solved, and constant features are given no weight.
+    """
+
+    def __init__(self, alpha=1.0):
+        """
+        Constructor method; creates an untrained RidgeModel object.
+
+        :param alpha: The strength of the regularization, relative to standardized features.
+        """
+        self.alpha = alpha
+
+        self.coef_ = None
+        self.intercept_ = None
+        self.__sums = None
+
+    def partial_fit(self, X, y):
+        """
+        Adds the passed batch of rows to the sums from which the model is solved. The model is solved again the next time it predicts.
+
+        :param X: A 2-dimensional array of features.
+        :param y: An array of labels.
+        :return: The RidgeModel object.
+        """
+        X = np.asarray(X, dtype="float64")
+        y = np.asarray(y, dtype="float64")
+
+        if self.__sums is None:
+            num_features = X.shape[1]
+            self.__sums = {"n": 0, "x": np.zeros(num_features), "y": 0.0, "xx": np.zeros((num_features, num_features)), "xy": np.zeros(num_features)}
+
+        self.__sums["n"] += X.shape[0]
+        self.__sums["x"] += X.sum(axis=0)
+        self.__sums["y"] += y.sum()
+        self.__sums["xx"] += X.T @ X
+        self.__sums["xy"] += X.T @ y
+        self.coef_ = None
+
+        return self
+
+    def fit(self, X, y):
+        """
+        Trains the model on the passed rows, discarding any earlier training.
+
+        :param X: A 2-dimensional array of features.
+        :param y: An array of labels.
+        :return: The RidgeModel object.
+        """
+        self.__sums = None
+
+        return self.partial_fit(X, y)
+
+    def predict(self, X):
+        """
+        Returns the predicted label of each passed row.
+
+        :param X: A 2-dimensional array of features.
+        :return: An array of predictions.
+        """
+        if self.coef_ is None:
+            self.__solve()
+
+        return np.asarray(X, dtype="float64") @ self.coef_ + self.intercept_
+
+    def __solve(self):
+        """
+        Solves the ridge regression from the accumulated sums, with the features standardized.
+        """
+        if self.__sums is None or self.__sums["n"] == 0:
+            raise ValueError("RidgeModel must be trained before it predicts")
+
+        n = self.__sums["n"]
+        mean_x = self.__sums["x"] / n
+        mean_y = self.__sums["y"] / n
+
+        cov = self.__sums["xx"] / n - np.outer(mean_x, mean_x)
+        cross_cov = self.__sums["xy"] / n - mean_x * mean_y
+
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        constant = std < 1e-12
+        std[constant] = 1.0
+
+        standardized_cov = cov / np.outer(std, std)
+        standardized_cov[constant, :] = 0
+        standardized_cov[:, constant] = 0
+
+        weights = np.linalg.solve(standardized_cov + self.alpha / n * np.eye(len(std)), cross_cov / std)
+        weights[constant] = 0
+
+        self.coef_ = weights / std
+        self.intercept_ = mean_y - mean_x @ self.coef_
+
+def get_feature_columns(stats_df):
+    """
+    Returns the columns of the passed DataFrame that are used as features: every numeric column other than the labels, the voting results and the identifiers of each row.
+
+    :param stats_df: A DataFrame object holding the engineered features of one or more seasons.
+    :return: A list of column names.
+    """
+    return [col for col in stats_df.columns if col not in NON_FEATURE_COLUMNS and pd.api.types.is_numeric_dtype(stats_df[col])]
+
+def get_sources_key(first_season, last_season):
+    """
+    Returns a key identifying the stored files of the seasons in the passed range along with their modification times, so that a matrix built from older files is detected.
+
+    :param first_season: The first season of the range.
+    :param last_season: The last season of the range.
+    :return: A list of [season, path, modification time] lists.
+    """
+    sources = (load_data.get_season_source(season) for season in range(first_season, last_season + 1))
+
+    return [[season, os.path.relpath(path, currentdir), mtime] for season, path, mtime in filter(None, sources)]
+
+def build_feature_matrix(first_season=None, last_season=None, directory=MATRIX_DIR):
+    """
+    Builds the feature matrix and label vectors of the stored seasons in the passed range and stores them in the passed directory, replacing any matrix stored there. Missing feature values (e.g., the shooting percentages of players who took no shot) are stored as 0.
+
+    :param first_season: The first season to be included; `FIRST_SEASON` by default.
+    :param last_season: The last season to be included; `CURRENT_SEASON` by default.
+    :param directory: The directory the matrix is stored in.
+    :return: A FeatureMatrix object of the stored matrix.
+    """
+    first_season = load_data.FIRST_SEASON if first_season is None else first_season
+    last_season = load_data.CURRENT_SEASON if last_season is None else last_season
+
+    sources_key = get_sources_key(first_season, last_season)
+    stats_df = load_data.load_seasons(first_season, last_season, downcast=False, use_cache=False)
+
+    if stats_df.empty:
+        raise ValueError("No season between %d and %d is stored; run `python main.py build` first" % (first_season, last_season))
+
+    stats_df = stats_df.sort_values("season", kind="stable", ignore_index=True)
+    columns = get_feature_columns(stats_df)
+
+    parent_dir = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix=os.path.basename(directory) + ".tmp-", dir=parent_dir)     # Unique, so that concurrent builds (e.g., `predict` and `evaluate`) never write to the same directory
+
+    try:
+        write_feature_matrix(stats_df, columns, temp_dir, first_season, last_season, sources_key)
+        swap_directory(temp_dir, directory)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    return FeatureMatrix(directory)
+
+def write_feature_matrix(stats_df, columns, directory, first_season, last_season, sources_key):
+    """
+    Writes the feature matrix, label vectors and metadata of the passed seasons to the passed (empty) directory.
+
+    :param stats_df: A DataFrame object holding the stored stats of the seasons, ordered by season.
+    :param columns: A list of the feature columns (see `get_feature_columns()`).
+    :param directory: The directory the files are written to.
+    :param first_season: The first season of the range the matrix was built for.
+    :param last_season: The last season of the range the matrix was built for.
+    :param sources_key: The value returned by `get_sources_key()` for the range.
+    """
+    # Written through memory maps, so that a matrix larger than memory is never held at once
+    features = np.lib.format.open_memmap(os.path.join(directory, FEATURES_NAME), mode="w+", dtype="float32", shape=(len(stats_df), len(columns)))
+
+    for i, col in enumerate(columns):
+        features[:, i] = stats_df[col].astype("float64").fillna(0).to_numpy()
+
+    features.flush()
+    del features
+
+    award_share = stats_df["award_share"].astype("float64")
+    np.save(os.path.join(directory, "award_share.npy"), award_share.to_numpy(dtype="float32"))
+    np.save(os.path.join(directory, "rank.npy"), stats_df["rank"].astype("float64").to_numpy(dtype="float32"))
+    np.save(os.path.join(directory, SEASONS_NAME), stats_df["season"].to_numpy(dtype="int16"))
+
+    seasons = stats_df["season"].to_numpy()
+    season_bounds = {}
+
+    for season in np.unique(seasons):
+        rows = np.flatnonzero(seasons == season)
+        season_bounds[str(season)] = [int(rows[0]), int(rows[-1]) + 1]
+
+    metadata = {
+        "first_season": first_season,
+        "last_season": last_season,
+        "sources": sources_key,
+        "columns": columns,
+        "ids": stats_df["id"].astype(str).tolist(),
+        "players": stats_df["player"].astype(str).tolist() if "player" in stats_df.columns else [],
+        "season_bounds": season_bounds,
+        "labeled_seasons": sorted(int(season) for season in stats_df.loc[award_share.notna(), "season"].unique())
+    }
+
+    with open(os.path.join(directory, METADATA_NAME), "w") as f:
+        json.dump(metadata, f)
+
+def swap_directory(new_dir, directory):
+    """
+    Moves the passed new directory into the place of the passed directory. Any directory already in place is first renamed aside, and deleted only once the new directory is in place, so that a stored matrix is never deleted before its replacement is ready.
+
+    :param new_dir: The complete directory to be moved into place.
+    :param directory: The path the new directory is moved to.
+    """
+    old_dir = new_dir + ".old"
+
+    while True:
+        try:
+            os.replace(directory, old_dir)
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.replace(new_dir, directory)
+            break
+        except OSError:     # Another build moved its matrix into place in the meantime, so it is moved aside in turn
+            if not os.path.isdir(directory):
+                if os.path.isdir(old_dir):
+                    os.replace(old_dir, directory)  # Puts the previous matrix back in place
+
+                raise
+
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+def get_feature_matrix(first_season=None, last_season=None, directory=MATRIX_DIR, rebuild=False):
+    """
+    Returns the stored feature matrix of the passed range of seasons, building it first if it is missing, covers another range, or was built from season files that have since changed.
+
+    :param first_season: The first season to be included; `FIRST_SEASON` by default.
+    :param last_season: The last season to be included; `CURRENT_SEASON` by default.
+    :param directory: The directory the matrix is stored in.
+    :param rebuild: A boolean corresponding to whether or not the matrix should be built even if it is up to date.
+    :return: A FeatureMatrix object.
+    """
+    first_season = load_data.FIRST_SEASON if first_season is None else first_season
+    last_season = load_data.CURRENT_SEASON if last_season is None else last_season
+
+    if not rebuild:
+        try:
+            matrix = FeatureMatrix(directory)
+
+            if [matrix.metadata["first_season"], matrix.metadata["last_season"]] == [first_season, last_season] and matrix.metadata["sources"] == get_sources_key(first_season, last_season):
+                return matrix
+        except FileNotFoundError:
+            pass
+
+    return build_feature_matrix(first_season, last_season, directory)
+
+def train_model(matrix, seasons=None, model_factory=RidgeModel, label="award_share", batch_size=BATCH_SIZE):
+    """
+    Trains a model on the rows of the passed seasons whose label is known (e.g., only the players who received votes have a `rank`). Models with a `partial_fit()` method are trained batch by batch; other models are fit on the rows of every season at once.
+
+    :param matrix: A FeatureMatrix object.
+    :param seasons: A list of the seasons trained on; every season with MVP voting results by default.
+    :param model_factory: A function taking no arguments that returns an untrained model (e.g., a class). Must be picklable to be used by `evaluate_loso()`.
+    :param label: The label the model is trained to predict.
+    :param batch_size: The maximum number of rows read at a time.
+    :return: The trained model.
+    """
+    seasons = matrix.get_seasons(labeled=True) if seasons is None else seasons
+    model = model_factory()
+
+    if hasattr(model, "partial_fit"):
+        for _, features, labels in matrix.iter_batches(seasons, label, batch_size):
+            known = ~np.isnan(labels)
+            model.partial_fit(features[known], labels[known])
+    else:
+        features, labels = matrix.get_rows(seasons, label)
+        known = ~np.isnan(labels)
+        model.fit(features[known], labels[known])
+
+    return model
+
+def score_rows(model, matrix, seasons=None, batch_size=BATCH_SIZE):
+    """
+    Returns the predictions of the passed model for the rows of the passed seasons, scored batch by batch.
+
+    :param model: A trained model.
+    :param matrix: A FeatureMatrix object.
+    :param seasons: A list of the seasons scored; every season by default.
+    :param batch_size: The maximum number of rows scored at a time.
+    :return: A Series of predictions indexed by row.
+    """
+    predictions = []
+    rows = []
+
+    for start, features, _ in matrix.iter_batches(seasons, None, batch_size):
+        predictions.append(model.predict(features))
+        rows.append(np.arange(start, start + len(features)))
+
+    if not predictions:
+        return pd.Series(dtype="float64")
+
+    return pd.Series(np.concatenate(predictions), index=np.concatenate(rows))
+
+def get_predicted_race_df(model, matrix, season, n=10, batch_size=BATCH_SIZE):
+    """
+    Returns the players of the passed season with the highest predicted award share.
+
+    :param model: A trained model.
+    :param matrix: A FeatureMatrix object holding the season.
+    :param season: The season scored.
+    :param n: The number of players returned.
+    :param batch_size: The maximum number of rows scored at a time.
+    :return: A DataFrame holding the `predicted_rank`, `id`, `player`, `predicted_share`, `award_share` and `rank` of the players, best first.
+    """
+    predictions = score_rows(model, matrix, [season], batch_size).sort_values(ascending=False, kind="stable").head(n)
+    rows = predictions.index.to_numpy()
+
+    return pd.DataFrame({
+        "predicted_rank": range(1, len(rows) + 1),
+        "id": [matrix.ids[row] for row in rows],
+        "player": [matrix.players[row] for row in rows] if matrix.players else None,
+        "predicted_share": predictions.to_numpy(),
+        "award_share": matrix.labels["award_share"][rows],
+        "rank": matrix.labels["rank"][rows]
+    })
+
+def evaluate_season(directory, season, model_factory=RidgeModel, label="award_share", batch_size=BATCH_SIZE):
+    """
+    Trains a model on every labeled season of the matrix stored in the passed directory except the passed season, and scores the held-out season. Run in a worker process by `evaluate_loso()`; the matrix is memory-mapped, so the processes share its pages instead of each reading a copy.
+
+    :param directory: The directory holding the matrix.
+    :param season: The held-out season.
+    :param model_factory: A function taking no arguments that returns an untrained model.
+    :param label: The label the model is trained to predict.
+    :param batch_size: The maximum number of rows read at a time.
+    :return: A dictionary holding the held-out season, its actual and predicted MVP, the predicted rank of the actual MVP and the mean absolute error of the predicted award shares.
+    """
+    matrix = FeatureMatrix(directory)
+    train_seasons = [other for other in matrix.get_seasons(labeled=True) if other != season]
+
+    model = train_model(matrix, train_seasons, model_factory, label, batch_size)
+    predictions = score_rows(model, matrix, [season], batch_size)
+
+    start, stop = matrix.season_bounds[season]
+    award_share = np.asarray(matrix.labels["award_share"][start:stop], dtype="float64")
+    order = predictions.sort_values(ascending=False, kind="stable").index.to_numpy()
+
+    actual_row = start + int(np.argmax(award_share))
+    predicted_row = int(order[0])
+
+    return {
+        "season": season,
+        "actual_mvp": matrix.ids[actual_row],
+        "predicted_mvp": matrix.ids[predicted_row],
+        "correct": actual_row == predicted_row,
+        "actual_mvp_predicted_rank": int(np.flatnonzero(order == actual_row)[0]) + 1,
+        "share_mae": float(np.abs(predictions.to_numpy() - award_share).mean())
+    }
+
+def evaluate_loso(matrix, model_factory=RidgeModel, workers=None, label="award_share", batch_size=BATCH_SIZE):
+    """
+    Evaluates the model built by the passed factory by leave-one-season-out cross-validation: for each labeled season, a model is trained on every other labeled season and scored on the held-out season. Seasons are evaluated in parallel across a pool of processes.
+
+    :param matrix: A FeatureMatrix object.
+    :param model_factory: A function taking no arguments that returns an untrained model. Must be picklable (e.g., a class or a module-level function).
+    :param workers: The number of processes; one per CPU by default. Seasons are evaluated in this process when 1.
+    :param label: The label the model is trained to predict.
+    :param batch_size: The maximum number of rows read at a time.
+    :return: A DataFrame with one row per held-out season (see `evaluate_season()`).
+    """
+    seasons = matrix.get_seasons(labeled=True)
+    args = [(matrix.directory, season, model_factory, label, batch_size) for season in seasons]
+
+    if not args:
+        results = []
+    elif workers == 1:
+        results = [evaluate_season(*season_args) for season_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(evaluate_season, *zip(*args)))
+
+    return pd.DataFrame(results, columns=["season", "actual_mvp", "predicted_mvp", "correct", "actual_mvp_predicted_rank", "share_mae"])
@@ -8,6 +8,15 @@ from .bball_ref_utils import *
 
 BASE_URL = "https://www.basketball-reference.com/leagues/"
 
+def get_page_url(season):
+    """
+    Returns the URL of the advanced statistics page of the passed season.
+
+    :param season: The basketball-reference season of the page (see `convert_bdl_season_to_bball_ref()`).
+    :return: The URL of the page.
+    """
+    return BASE_URL + f"NBA_{season}_advanced.html"
+
 def get_full_advanced_stats(season):
     """
     Returns a list containing the advanced stats of all of the players who played in the passed season.
@@ -17,15 +26,9 @@ def get_full_advanced_stats(season):
     """
     season = convert_bdl_season_to_bball_ref(season)
 
-    url = BASE_URL + f"NBA_{season}_advanced.html"
-
-    page = requests.get(url)
-
-    check_status_code(page, season)
-
-    soup = BeautifulSoup(page.content, 'html.parser')
+    url = get_page_url(season)
 
-    table = soup.find(id="advanced_stats")
+    table = get_table_soup(url, season, "advanced_stats")
     trs = table.find_all("tr", {"class":["full_table", "partial_table"]})
 
     return get_rows_dict(trs, store_new_player_func=store_new_player_advanced_stats, update_player_func=None)
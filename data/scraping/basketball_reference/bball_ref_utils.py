@@ -2,8 +2,31 @@
 Miscellaneous utility methods that assist in basketball-reference.com web scraping.
 """
 
-import requests
-from bs4 import BeautifulSoup
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import EncodingDetector
+
+import os, sys
+datadir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+sys.path.append(datadir)
+
+import net.replay as replay
+import instrumentation
+from api.rate_limiter import RateLimiter, parse_retry_after
+
+from .page_cache import PageCache
+
+MAX_REQUESTS_PER_HOST = 2      # Upper bound on the number of requests in flight to a single host when seasons are built in parallel
+
+__host_semaphores = {}
+__host_semaphores_lock = threading.Lock()
+__host_rate_limiters = {}   # Maps a host to the RateLimiter spacing out the requests made to it (see `set_host_request_interval()`)
+
+PAGE_CACHE = PageCache()    # Shared by every scraper so that each page is fetched and parsed once per build
 
 def convert_bdl_season_to_bball_ref(season):
     """
@@ -62,6 +85,199 @@ def check_status_code(response, season):
             exception_message = "%d Error: %s" % (response.status_code, response.reason)
             raise Exception(exception_message)
 
+def get_page(url, season):
+    """
+    Performs a get request of the passed URL, blocking if the maximum number of requests are already in flight to the URL's host or if the host's request interval has not passed, and returns the response once its status code has been checked. The request is recorded as a "fetch" stage (see `instrumentation.stage()`).
+
+    :param url: The URL of the page to be retrieved.
+    :param season: The season being retrieved through the page (used in the event of an invalid status code).
+    :return: The response returned from the get request.
+    """
+    rate_limiter = __get_host_rate_limiter(url)
+
+    with instrumentation.stage("fetch", url=url):
+        with __get_host_semaphore(url):
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+
+            start = time.perf_counter()
+            page = replay.get(url)
+
+        instrumentation.record_request(url, page.status_code, len(page.content), time.perf_counter() - start)
+
+    if rate_limiter is not None:
+        if page.status_code == 429:
+            rate_limiter.record_throttle(parse_retry_after(page.headers.get("Retry-After")))
+        else:
+            rate_limiter.record_success()
+
+    check_status_code(page, season)
+
+    return page
+
+def get_soup_page(url, season):
+    """
+    Returns a BeautifulSoup object of the page at the passed URL, retrieving and parsing the page only if it is not already held by the page cache.
+
+    :param url: The URL of the page to be retrieved.
+    :param season: The season being retrieved through the page.
+    :return: A BeautifulSoup object of the page.
+    """
+    return PAGE_CACHE.get_soup(url, season, get_page)
+
+def get_table_soup(url, season, table_id):
+    """
+    Returns a BeautifulSoup object of the table with the passed id on the page at the passed URL, parsing only that table rather than the full page.
+
+    :param url: The URL of the page to be retrieved.
+    :param season: The season being retrieved through the page.
+    :param table_id: The id of the table to be parsed.
+    :return: A BeautifulSoup object of the table, or None if the page holds no such table.
+    """
+    return get_table_soups(url, season, [table_id])[table_id]
+
+def get_table_soups(url, season, table_ids):
+    """
+    Returns BeautifulSoup objects of the tables with the passed ids on the page at the passed URL, parsing only those tables rather than the full page.
+
+    :param url: The URL of the page to be retrieved.
+    :param season: The season being retrieved through the page.
+    :param table_ids: A list of the ids of the tables to be parsed.
+    :return: A dictionary mapping each passed table id to a BeautifulSoup object of its table (None if the page holds no such table).
+    """
+    return PAGE_CACHE.get_parsed(url, season, get_page, tuple(table_ids), lambda content: parse_tables(content, table_ids))
+
+def parse_tables(content, table_ids):
+    """
+    Parses only the tables with the passed ids from the passed page content. Each table is cut out of the raw HTML and parsed on its own; if a table cannot be cut out cleanly, the page is parsed with a strainer that only builds the elements with the passed ids.
+
+    :param content: The HTML content (bytes) of a page.
+    :param table_ids: A list of the ids of the tables to be parsed.
+    :return: A dictionary mapping each passed table id to a BeautifulSoup object of its table (None if the page holds no such table).
+    """
+    encoding = EncodingDetector.find_declared_encoding(content[:4096], is_html=True) or "utf-8"
+    tables = {}
+
+    for table_id in table_ids:
+        table_html = __cut_table_html(content, table_id)
+
+        if table_html is not None:
+            tables[table_id] = BeautifulSoup(table_html.decode(encoding, errors="replace"), 'html.parser').find(id=table_id)
+        else:
+            tables[table_id] = None
+
+    missing_ids = [table_id for table_id, table in tables.items() if table is None]
+
+    if missing_ids:
+        strained_soup = BeautifulSoup(content, 'html.parser', parse_only=SoupStrainer(id=missing_ids))
+
+        for table_id in missing_ids:
+            tables[table_id] = strained_soup.find(id=table_id)
+
+    return tables
+
+def __cut_table_html(content, table_id):
+    """
+    Returns the raw HTML of the table with the passed id, from its opening <table> tag to its closing </table> tag.
+
+    :param content: The HTML content (bytes) of a page.
+    :param table_id: The id of the table to be cut out.
+    :return: The HTML (bytes) of the table, or None if no <table> tag with the passed id is found.
+    """
+    match = re.search(rb'\sid="' + re.escape(table_id.encode()) + rb'"', content)
+
+    if match is None:
+        return None
+
+    start = content.rfind(b"<", 0, match.start())
+    end = content.find(b"</table>", match.end())
+
+    if start == -1 or end == -1 or not content.startswith(b"<table", start):
+        return None     # The id belongs to an element other than a table
+
+    if content.find(b"<table", match.end(), end) != -1:
+        return None     # Nested tables cannot be cut out by their first closing tag
+
+    return content[start:end + len(b"</table>")]
+
+def expire_page(url, max_age):
+    """
+    Removes the page at the passed URL from the page cache if it is older than the passed age.
+
+    :param url: The URL of the page to be checked.
+    :param max_age: The number of seconds for which a fetched page remains valid.
+    :return: TRUE if the page will be retrieved again the next time it is scraped, FALSE otherwise.
+    """
+    return PAGE_CACHE.expire(url, max_age)
+
+def evict_season_pages(season):
+    """
+    Frees the memory held by the parsed pages of the passed season, keeping their HTML cached on disk.
+
+    :param season: An integer used to retrieve an NBA season from the balldontlie API.
+    """
+    PAGE_CACHE.evict_season(convert_bdl_season_to_bball_ref(season))
+
+def invalidate_season_pages(season):
+    """
+    Removes every cached page of the passed season, so that the pages are retrieved again the next time they are scraped.
+
+    :param season: An integer used to retrieve an NBA season from the balldontlie API.
+    """
+    PAGE_CACHE.invalidate_season(convert_bdl_season_to_bball_ref(season))
+
+def set_max_requests_per_host(max_requests):
+    """
+    Sets the maximum number of requests that may be in flight to a single host at once. Only affects hosts that have not yet been requested.
+
+    :param max_requests: The maximum number of concurrent requests allowed per host.
+    """
+    global MAX_REQUESTS_PER_HOST
+    MAX_REQUESTS_PER_HOST = max_requests
+
+def set_host_request_interval(host, interval):
+    """
+    Spaces out the requests made to the passed host by at least the passed number of seconds, so that long-running jobs stay within the host's politeness limits (e.g., basketball-reference.com blocks clients making more than 20 requests a minute). A 429 error from the host pauses every request to it for the response's Retry-After value, and never less than an exponential backoff. Responses read from replay fixtures are not spaced out.
+
+    :param host: The host of the requests (e.g., "www.basketball-reference.com").
+    :param interval: The minimum number of seconds between two requests to the host, or None to remove the host's limit.
+    """
+    with __host_semaphores_lock:
+        if interval is None:
+            __host_rate_limiters.pop(host, None)
+        elif host in __host_rate_limiters:
+            __host_rate_limiters[host].set_rate(1, interval)
+        else:
+            __host_rate_limiters[host] = RateLimiter(1, interval)     # A bucket of a single token allows no burst of requests
+
+def __get_host_rate_limiter(url):
+    """
+    Returns the rate limiter spacing out the requests to the host of the passed URL.
+
+    :param url: The URL of a page that is about to be requested.
+    :return: The host's RateLimiter object, or None if the host has no request interval or if no request leaves the process.
+    """
+    if replay.mode == replay.REPLAY:
+        return None
+
+    with __host_semaphores_lock:
+        return __host_rate_limiters.get(urlparse(url).netloc)
+
+def __get_host_semaphore(url):
+    """
+    Returns the semaphore bounding the number of in-flight requests to the host of the passed URL, creating it if it does not already exist.
+
+    :param url: The URL of a page that is about to be requested.
+    :return: A BoundedSemaphore object shared by all requests to the URL's host.
+    """
+    host = urlparse(url).netloc
+
+    with __host_semaphores_lock:
+        if host not in __host_semaphores:
+            __host_semaphores[host] = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+
+        return __host_semaphores[host]
+
 def get_player_id_from_url(url):
     """
     Retrieves and returns the player id from the URL to the player's profile page.
@@ -8,12 +8,22 @@ from .bball_ref_utils import *
 
 BASE_URL = "https://www.basketball-reference.com/leagues/"
 
-def get_full_league_leaders(season, fields):
+def get_page_url(season):
+    """
+    Returns the URL of the league leaders page of the passed season.
+
+    :param season: The basketball-reference season of the page (see `convert_bdl_season_to_bball_ref()`).
+    :return: The URL of the page.
+    """
+    return BASE_URL + f"NBA_{season}_leaders.html"
+
+def get_full_league_leaders(season, fields, skip_missing=False):
     """
     Returns a list containing information about the league leaders for the passed fields in the specified season.
         
     :param season: The season from which league leaders statistics will be returned.
     :param fields: A list of strings containing the fields from which league leaders should be retrieved (e.g., "pts_per_g").
+    :param skip_missing: A boolean corresponding to whether or not fields that are not found on the league leaders page should be left out of the list returned. If FALSE, a FieldNotFound exception is raised for such fields.
     :return: A list holding the league leaders of all the passed fields in the specified season.
     """
     season = convert_bdl_season_to_bball_ref(season)
@@ -22,7 +32,14 @@ def get_full_league_leaders(season, fields):
     league_leaders = []
 
     for field in fields:
-        field_leader = get_league_leader_from_soup_page(soup, field)
+        try:
+            field_leader = get_league_leader_from_soup_page(soup, field)
+        except FieldNotFound:
+            if skip_missing:
+                continue
+
+            raise
+
         league_leaders.append(field_leader)
 
     return league_leaders
@@ -34,13 +51,9 @@ def get_season_leaders_soup_page(season):
     :param season: The season from which league leaders statistics will be returned.
     :return: A BeautifulSoup object of the league leaders page for the passed season.
     """
-    url = BASE_URL + f"NBA_{season}_leaders.html"
-
-    page = requests.get(url)
-
-    check_status_code(page, season)
+    url = get_page_url(season)
 
-    return BeautifulSoup(page.content, 'html.parser')
+    return get_soup_page(url, season)
 
 def get_league_leader(season, field):
     """
@@ -83,15 +96,16 @@ def get_league_leader_from_soup_page(soup_page, field):
 
     return league_leader
 
-def get_full_league_leaders_df(season, fields):
+def get_full_league_leaders_df(season, fields, skip_missing=False):
     """
     Returns a DataFrame object containing information about the league leaders for the passed fields in the specified season.
         
     :param season: The season from which league leaders statistics will be returned.
     :param fields: A list of strings containing the fields from which league leaders should be retrieved (e.g., "pts_per_g").
+    :param skip_missing: A boolean corresponding to whether or not fields that are not found on the league leaders page should be left out (see `get_full_league_leaders()`).
     :return: A DataFrame object holding the league leaders of all the passed fields in the specified season.
     """
-    league_leaders_list = get_full_league_leaders(season, fields)
+    league_leaders_list = get_full_league_leaders(season, fields, skip_missing)
     
     return pd.DataFrame.from_dict(league_leaders_list)
 
@@ -7,6 +7,15 @@ from .bball_ref_utils import *
 BASE_URL = "https://www.basketball-reference.com/awards/"
 RELEVANT_COL_NAMES = ["player", "votes_first", "points_won", "points_max", "award_share"]
 
+def get_page_url(season):
+    """
+    Returns the URL of the awards page holding the MVP voting table of the passed season.
+
+    :param season: The basketball-reference season of the page (see `convert_bdl_season_to_bball_ref()`).
+    :return: The URL of the page.
+    """
+    return BASE_URL + f"awards_{season}.html#mvp"
+
 def get_mvp_voting_map(season):
     """
     Returns a list of maps of all the players that received MVP votes for the passed season. NOTE: Season 2000 is the 1999-2000 season for basketball-reference, whereas season 2000 is 2000-2001 for balldontlie.
@@ -16,15 +25,13 @@ def get_mvp_voting_map(season):
     """
     season = convert_bdl_season_to_bball_ref(season)
 
-    url = BASE_URL + f"awards_{season}.html#mvp"
-
-    page = requests.get(url)
+    url = get_page_url(season)
 
-    check_status_code(page, season)
+    mvp_table = get_table_soup(url, season, "mvp")
 
-    soup = BeautifulSoup(page.content, 'html.parser')
+    if mvp_table is None:
+        raise Exception("MVP voting table not found for the %d season; the award was first given in the 1955-56 season." % (season))
 
-    mvp_table = soup.find(id='mvp')
     tds = mvp_table.find_all('td')
 
     players_list = get_players_list(tds)
@@ -0,0 +1,252 @@
+"""
+Caches the pages retrieved from basketball-reference.com, both on disk (as content-addressed HTML files) and in memory (as parsed BeautifulSoup objects).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from bs4 import BeautifulSoup
+
+import sys
+datadir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+sys.path.append(datadir)
+
+import file_utils
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))), "html_cache")
+INDEX_NAME = "index.json"
+MAX_SOUPS = 8       # Parsed pages are large, so only a handful are held in memory at once
+
+class PageCache():
+
+    def __init__(self, cache_dir=CACHE_DIR, max_soups=MAX_SOUPS):
+        """
+        Constructor method; creates a PageCache object storing HTML in the passed directory.
+
+        :param cache_dir: The directory in which the HTML of retrieved pages is stored.
+        :param max_soups: The maximum number of parsed pages held in memory before the least recently used page is evicted.
+        """
+        self.cache_dir = cache_dir
+        self.max_soups = max_soups
+
+        self.__index = None     # Maps each URL to the hash of its content, the season it belongs to and the time it was fetched
+        self.__soups = OrderedDict()    # Maps each (URL, parse key) pair to the season of the page and the parsed page
+        self.__lock = threading.RLock()
+        self.__url_locks = {}
+
+    def get_content(self, url, season, fetch_func):
+        """
+        Returns the HTML content of the passed URL, only calling the passed fetch function if the page is not already stored on disk.
+
+        :param url: The URL of the page to be retrieved.
+        :param season: The season the page belongs to, used for invalidation.
+        :param fetch_func: A function taking the URL and season as arguments that returns a response holding the page.
+        :return: The HTML content (bytes) of the page.
+        """
+        with self.__get_url_lock(url):  # Ensures a page requested by several threads at once is only fetched once
+            content = self.__read_content(url)
+
+            if content is None:
+                content = fetch_func(url, season).content
+                self.__write_content(url, season, content)
+
+            return content
+
+    def get_soup(self, url, season, fetch_func):
+        """
+        Returns a BeautifulSoup object of the passed URL, only parsing the page if it is not already held in memory.
+
+        :param url: The URL of the page to be retrieved.
+        :param season: The season the page belongs to, used for invalidation.
+        :param fetch_func: A function taking the URL and season as arguments that returns a response holding the page.
+        :return: A BeautifulSoup object of the page.
+        """
+        return self.get_parsed(url, season, fetch_func, None, lambda content: BeautifulSoup(content, 'html.parser'))
+
+    def get_parsed(self, url, season, fetch_func, parse_key, parse_func):
+        """
+        Returns the result of parsing the content of the passed URL with the passed function, only parsing the page if the result is not already held in memory.
+
+        :param url: The URL of the page to be retrieved.
+        :param season: The season the page belongs to, used for invalidation.
+        :param fetch_func: A function taking the URL and season as arguments that returns a response holding the page.
+        :param parse_key: A hashable value identifying the way the page is parsed, so that differently parsed versions of one page are held separately.
+        :param parse_func: A function taking the content of the page as an argument that returns the parsed page.
+        :return: The parsed page.
+        """
+        key = (url, parse_key)
+
+        with self.__get_url_lock(url):
+            with self.__lock:
+                if key in self.__soups:
+                    self.__soups.move_to_end(key)
+                    return self.__soups[key][1]
+
+            parsed = parse_func(self.get_content(url, season, fetch_func))
+
+            with self.__lock:
+                self.__soups[key] = (season, parsed)
+
+                while len(self.__soups) > self.max_soups:
+                    self.__soups.popitem(last=False)    # Evicts the least recently used page
+
+            return parsed
+
+    def evict_season(self, season):
+        """
+        Removes the parsed pages of the passed season from memory, leaving their HTML stored on disk.
+
+        :param season: The season whose parsed pages will be evicted.
+        """
+        with self.__lock:
+            for key in [key for key, (soup_season, _) in self.__soups.items() if soup_season == season]:
+                del self.__soups[key]
+
+    def expire(self, url, max_age):
+        """
+        Removes the passed URL from the cache if it was fetched at least `max_age` seconds ago, so that it is fetched again when next requested.
+
+        :param url: The URL of the page to be checked.
+        :param max_age: The number of seconds for which a fetched page remains valid.
+        :return: TRUE if the page will be fetched when next requested (because it expired or was never cached), FALSE otherwise.
+        """
+        with self.__lock:
+            index = self.__load_index()
+            entry = index.get(url)
+
+            if entry is None:
+                return True
+
+            if time.time() - entry["fetched_at"] < max_age:
+                return False
+
+            del index[url]
+
+            for key in [key for key in self.__soups if key[0] == url]:
+                del self.__soups[key]
+
+            self.__save_index()
+            self.__remove_unreferenced_content()
+
+            return True
+
+    def invalidate_season(self, season):
+        """
+        Removes all of the pages of the passed season from the cache, both in memory and on disk, so that they are fetched again when next requested.
+
+        :param season: The season whose pages will be invalidated.
+        """
+        with self.__lock:
+            self.evict_season(season)
+
+            index = self.__load_index()
+            for url in [url for url, entry in index.items() if entry["season"] == season]:
+                del index[url]
+
+            self.__save_index()
+            self.__remove_unreferenced_content()
+
+    def clear(self):
+        """
+        Removes every page from the cache, both in memory and on disk.
+        """
+        with self.__lock:
+            self.__soups.clear()
+            self.__load_index().clear()
+            self.__save_index()
+            self.__remove_unreferenced_content()
+
+    def __get_url_lock(self, url):
+        """
+        Returns the lock guarding the retrieval of the passed URL, creating it if it does not already exist.
+
+        :param url: The URL of a page that is about to be retrieved.
+        :return: A lock shared by all retrievals of the URL.
+        """
+        with self.__lock:
+            if url not in self.__url_locks:
+                self.__url_locks[url] = threading.RLock()
+
+            return self.__url_locks[url]
+
+    def __get_content_path(self, content_hash):
+        """
+        Returns the path of the file storing the content with the passed hash.
+
+        :param content_hash: The SHA-256 hex digest of a page's content.
+        :return: The path of the file in which the content is stored.
+        """
+        return os.path.join(self.cache_dir, "objects", content_hash[:2], content_hash + ".html")
+
+    def __read_content(self, url):
+        """
+        Returns the stored content of the passed URL, or None if the page is not stored.
+
+        :param url: The URL of the page to be read.
+        :return: The HTML content (bytes) of the page, or None if it is not stored.
+        """
+        with self.__lock:
+            entry = self.__load_index().get(url)
+
+        if entry is None:
+            return None
+
+        try:
+            with open(self.__get_content_path(entry["hash"]), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def __write_content(self, url, season, content):
+        """
+        Stores the passed content on disk under its hash and records the URL it was retrieved from in the index.
+
+        :param url: The URL the content was retrieved from.
+        :param season: The season the page belongs to.
+        :param content: The HTML content (bytes) of the page.
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+        path = self.__get_content_path(content_hash)
+
+        if not os.path.isfile(path):    # Identical pages are only stored once
+            file_utils.write_atomically(path, content)
+
+        with self.__lock:
+            self.__load_index()[url] = {"hash": content_hash, "season": season, "fetched_at": time.time()}
+            self.__save_index()
+
+    def __load_index(self):
+        """
+        Returns the index of stored pages, reading it from disk the first time it is needed.
+
+        :return: A dictionary mapping each stored URL to its index entry.
+        """
+        if self.__index is None:
+            try:
+                with open(os.path.join(self.cache_dir, INDEX_NAME)) as f:
+                    self.__index = json.load(f)
+            except FileNotFoundError:
+                self.__index = {}
+
+        return self.__index
+
+    def __save_index(self):
+        """
+        Writes the index of stored pages to disk.
+        """
+        file_utils.write_json_atomically(os.path.join(self.cache_dir, INDEX_NAME), self.__index)
+
+    def __remove_unreferenced_content(self):
+        """
+        Deletes every stored file whose content is no longer referenced by the index.
+        """
+        referenced = {entry["hash"] for entry in self.__load_index().values()}
+
+        for root, _, files in os.walk(os.path.join(self.cache_dir, "objects")):
+            for name in files:
+                if name[:-len(".html")] not in referenced:
+                    os.remove(os.path.join(root, name))
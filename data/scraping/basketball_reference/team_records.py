@@ -5,6 +5,16 @@ Performs web scraping of NBA team records.
 from .bball_ref_utils import *
 
 BASE_URL = "https://www.basketball-reference.com/leagues/"
+FIRST_CONFERENCE_TABLE_SEASON = 2016     # basketball-reference season from which the standings are given by conference rather than by division
+
+def get_page_url(season):
+    """
+    Returns the URL of the season summary page holding the standings of the passed season.
+
+    :param season: The basketball-reference season of the page (see `convert_bdl_season_to_bball_ref()`).
+    :return: The URL of the page.
+    """
+    return BASE_URL + f"NBA_{season}.html"
 
 def get_team_record_map(season):
     """
@@ -15,20 +25,18 @@ def get_team_record_map(season):
     """
     season = convert_bdl_season_to_bball_ref(season)
 
-    url = BASE_URL + f"NBA_{season}.html"
+    url = get_page_url(season)
 
-    page = requests.get(url)
+    table_ids = get_standings_table_ids(season)
 
-    check_status_code(page, season)
+    tables = get_table_soups(url, season, table_ids)
+    missing_ids = [table_id for table_id in table_ids if tables[table_id] is None]
 
-    soup = BeautifulSoup(page.content, 'html.parser')
+    if missing_ids:
+        raise Exception("Standings table(s) %s not found for the %d season." % (", ".join(missing_ids), season))
 
-    if season >= 2016:
-        east_table = soup.find(id='confs_standings_E')
-        west_table = soup.find(id='confs_standings_W')
-    else:
-        east_table = soup.find(id='divs_standings_E')
-        west_table = soup.find(id='divs_standings_W')
+    east_table = tables[table_ids[0]]
+    west_table = tables[table_ids[1]]
 
     # tuple holding both table objects for ease of further scraping
     record_tables = (east_table, west_table)
@@ -55,6 +63,18 @@ def get_team_record_map(season):
 
     return record_map
 
+def get_standings_table_ids(season):
+    """
+    Returns the ids of the eastern and western standings tables on the season summary page of the passed season. Since 2015-16, the page holds one table per conference. Before, the standings are only held in a table per conference split by division (from 1970-71) or in a table per division, when the league was split into an Eastern and a Western Division (until 1969-70); both share the same ids, and their division header rows are skipped in the same way.
+
+    :param season: The basketball-reference season of the page (see `convert_bdl_season_to_bball_ref()`).
+    :return: A list of the ids of the eastern and western tables, in that order.
+    """
+    if season >= FIRST_CONFERENCE_TABLE_SEASON:
+        return ["confs_standings_E", "confs_standings_W"]
+
+    return ["divs_standings_E", "divs_standings_W"]
+
 def __get_relevant_ths(ths):
     """
     Based on a list of th tags passed, returns a list of "relevant" th tags, meaning tags that hold the name of a team.
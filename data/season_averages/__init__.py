@@ -1,5 +1,5 @@
 """
-File used to automatically download and save CSV files of data when the `data` library is imported into a project. 
+The directory holding the CSV files of season averages. Importing this package performs no I/O and loads no heavy dependency; the data is downloaded by calling `download_mvp_stats()` (or running `python main.py build`), and the loading functions below import `load_data` the first time one of them is used.
 """
 
 import os, sys
@@ -7,6 +7,16 @@ currentdir = os.path.dirname(os.path.realpath(__file__))
 parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
-from load_data import download_mvp_stats
+# Names resolved from `load_data` on first access, so that pandas, numpy and the scrapers are only imported once they are needed
+LAZY_ATTRIBUTES = ["download_mvp_stats", "refresh_current_season", "get_season_csv_name", "load_seasons", "load_candidates", "rebuild_features"]
 
-download_mvp_stats()
+def __getattr__(name):
+    if name in LAZY_ATTRIBUTES:
+        import load_data
+
+        return getattr(load_data, name)
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+def __dir__():
+    return sorted(list(globals()) + LAZY_ATTRIBUTES)
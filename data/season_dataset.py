@@ -0,0 +1,181 @@
+"""
+Module containing functions related to storing the season averages data as a typed Parquet dataset, partitioned by season.
+
+Each season is stored in its own partition (`season_dataset/season=<season>/part-0.parquet`), so that readers can load only the seasons and columns they need without parsing or coercing any strings.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+
+DATASET_DIR = os.path.join(currentdir, "season_dataset")
+PARTITION_FILE_NAME = "part-0.parquet"
+MIGRATION_MARKER_NAME = "_migrated_from_csv"
+
+# Explicit schema of the dataset. Columns not listed (e.g., newly engineered features) are stored as float64.
+STRING_COLS = ["id", "player"]
+CATEGORICAL_COLS = ["pos", "team_id"]
+FLAG_COLS = ["multi_team_player", "leader_pts_per_g", "leader_ast_per_g", "leader_trb_per_g", "leader_blk_per_g", "leader_stl_per_g"]
+INTEGER_COLS = ["age", "g", "gs", "votes_first", "points_max", "rank"]     # Nullable, as these may be missing in older or in-progress seasons
+RANK_COLS = ["rank_ws", "rank_ws_per_48", "rank_per", "rank_bpm", "rank_vorp", "rank_pts_per_g", "rank_ast_per_g", "rank_trb_per_g", "rank_winning_perc"]   # Per-season ranks (see `feature_engineering.RANKED_FIELDS`)
+
+SCHEMA = {col: "string" for col in STRING_COLS}
+SCHEMA.update({col: "category" for col in CATEGORICAL_COLS})
+SCHEMA.update({col: "int8" for col in FLAG_COLS})
+SCHEMA.update({col: "Int16" for col in INTEGER_COLS + RANK_COLS})
+SCHEMA["season"] = "int16"
+
+def apply_schema(stats_df):
+    """
+    Returns a copy of the passed DataFrame with every column converted to the dtype given by the dataset's schema.
+
+    :param stats_df: A DataFrame object containing NBA season average statistics, with either scraped string values or already converted values.
+    :return: A DataFrame holding the same data with categorical dtypes for `team_id`/`pos`, strings for the player identifiers and numeric dtypes for every stat column.
+    """
+    typed_df = pd.DataFrame(index=stats_df.index)
+
+    for col in stats_df.columns:
+        dtype = SCHEMA.get(col, "float64")
+
+        if dtype in ["string", "category"]:
+            typed_df[col] = stats_df[col].astype("string").astype(dtype)
+        else:
+            values = pd.to_numeric(stats_df[col], errors="coerce")
+
+            if dtype == "Int16":
+                values = values.round()     # Values read back as floats (e.g., "24.0") are whole numbers
+
+            typed_df[col] = values.astype(dtype)
+
+    return typed_df
+
+def get_partition_name(season, dataset_dir=None):
+    """
+    Returns the path of the Parquet file holding the passed season.
+
+    :param season: The season stored in the partition.
+    :param dataset_dir: The directory of the dataset; `DATASET_DIR` by default.
+    :return: The path of the season's Parquet file.
+    """
+    return os.path.join(dataset_dir or DATASET_DIR, f"season={season}", PARTITION_FILE_NAME)
+
+def write_season(stats_df, season, dataset_dir=None):
+    """
+    Stores the passed DataFrame as the partition of the passed season, replacing any data previously stored for that season.
+
+    :param stats_df: A DataFrame object containing the NBA season average statistics of a single season.
+    :param season: The season represented by the DataFrame.
+    :param dataset_dir: The directory of the dataset; `DATASET_DIR` by default.
+    """
+    partition_name = get_partition_name(season, dataset_dir)
+    os.makedirs(os.path.dirname(partition_name), exist_ok=True)
+
+    typed_df = apply_schema(stats_df).drop(columns="season", errors="ignore")    # The season is held by the partition's directory name
+
+    temp_name = partition_name + ".tmp"
+    typed_df.to_parquet(temp_name, index=False)
+    os.replace(temp_name, partition_name)
+
+def get_stored_seasons(dataset_dir=None):
+    """
+    Returns a sorted list of the seasons stored in the dataset.
+
+    :param dataset_dir: The directory of the dataset; `DATASET_DIR` by default.
+    :return: A list of integer seasons.
+    """
+    dataset_dir = dataset_dir or DATASET_DIR
+
+    if not os.path.isdir(dataset_dir):
+        return []
+
+    seasons = []
+
+    for name in os.listdir(dataset_dir):
+        if name.startswith("season=") and os.path.isfile(os.path.join(dataset_dir, name, PARTITION_FILE_NAME)):
+            seasons.append(int(name[len("season="):]))
+
+    return sorted(seasons)
+
+def get_season_columns(season, dataset_dir=None):
+    """
+    Returns the columns stored in the partition of the passed season, reading only the partition's schema.
+
+    :param season: The season whose partition is checked.
+    :param dataset_dir: The directory of the dataset; `DATASET_DIR` by default.
+    :return: A list of column names, not including `season`.
+    """
+    return pq.read_schema(get_partition_name(season, dataset_dir)).names
+
+def read_season_table(season, columns=None, dataset_dir=None):
+    """
+    Returns the stored partition of the passed season as an Arrow table, reading only the passed columns.
+
+    :param season: The season to be read.
+    :param columns: A list of the columns to be read. All columns are read by default. The `season` column is always included.
+    :param dataset_dir: The directory of the dataset; `DATASET_DIR` by default.
+    :return: A pyarrow.Table holding the season.
+    """
+    file_columns = None if columns is None else [col for col in columns if col != "season"]
+
+    table = pq.read_table(get_partition_name(season, dataset_dir), columns=file_columns, use_threads=False)     # Seasons are read on separate threads instead
+
+    return table.append_column("season", pa.array([season] * table.num_rows, pa.int16()))
+
+def read_seasons(seasons=None, columns=None, dataset_dir=None, workers=None):
+    """
+    Returns a single DataFrame holding the passed seasons of the dataset, reading only the passed columns. The partitions are read in parallel and converted to pandas once, after they are joined.
+
+    :param seasons: An iterable of the seasons to be read. All stored seasons are read by default; seasons that are not stored are skipped.
+    :param columns: A list of the columns to be read. All columns are read by default. The `season` column is always included.
+    :param dataset_dir: The directory of the dataset; `DATASET_DIR` by default.
+    :param workers: The number of partitions read at the same time; one per season, up to 8, by default.
+    :return: A DataFrame holding the requested seasons and columns, typed according to the dataset's schema.
+    """
+    stored_seasons = get_stored_seasons(dataset_dir)
+    seasons = stored_seasons if seasons is None else [season for season in seasons if season in stored_seasons]
+
+    if not seasons:
+        return pd.DataFrame(columns=columns or [])
+
+    with ThreadPoolExecutor(max_workers=workers or min(8, len(seasons))) as executor:
+        tables = list(executor.map(lambda season: read_season_table(season, columns, dataset_dir), seasons))
+
+    if all(table.schema.equals(tables[0].schema) for table in tables):
+        return pa.concat_tables(tables).unify_dictionaries().to_pandas()     # Categories differ between seasons, so they are unified before the single conversion
+
+    # Partitions written before a column existed lack it, so the seasons are joined as DataFrames and typed again
+    return apply_schema(pd.concat([table.to_pandas() for table in tables], ignore_index=True))
+
+def migrate_csvs(csv_dir, dataset_dir=None):
+    """
+    Converts every `{season}_stats.csv` file in the passed directory to a partition of the dataset. The migration only runs once; afterwards, partitions are written as each season is built.
+
+    :param csv_dir: The directory holding the season CSV files.
+    :param dataset_dir: The directory of the dataset; `DATASET_DIR` by default.
+    :return: A list of the seasons that were migrated.
+    """
+    dataset_dir = dataset_dir or DATASET_DIR
+    marker_name = os.path.join(dataset_dir, MIGRATION_MARKER_NAME)
+
+    if os.path.isfile(marker_name):
+        return []
+
+    migrated_seasons = []
+
+    if os.path.isdir(csv_dir):
+        for name in sorted(os.listdir(csv_dir)):
+            season = name[:-len("_stats.csv")]
+
+            if name.endswith("_stats.csv") and season.isdigit():
+                write_season(pd.read_csv(os.path.join(csv_dir, name)), int(season), dataset_dir)
+                migrated_seasons.append(int(season))
+
+    os.makedirs(dataset_dir, exist_ok=True)
+    open(marker_name, "w").close()
+
+    return migrated_seasons
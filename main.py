@@ -1 +1,242 @@
-import data.season_averages
+"""
+Entry point of the project. Data is only downloaded when a command asks for it, e.g.:
+
+    python main.py build --workers 4
+    python main.py build --instrument build.jsonl --profile profiles/build_
+    python main.py refresh
+    python main.py backfill --first-season 1979
+    python main.py features
+    python main.py serve --port 8000
+    python main.py predict
+    python main.py evaluate --workers 4
+"""
+
+import argparse
+import os
+import time
+
+def build(args):
+    """
+    Downloads every season of MVP data that is not stored yet.
+
+    :param args: The parsed command-line arguments.
+    """
+    from data.season_averages import download_mvp_stats
+
+    download_mvp_stats(workers=args.workers)
+
+def refresh(args):
+    """
+    Retrieves the sources of the current season that are out of date and rewrites the rows that changed.
+
+    :param args: The parsed command-line arguments.
+    """
+    from data.season_averages import refresh_current_season
+
+    changed = refresh_current_season()
+    print("%d rows changed." % len(changed))
+
+def backfill(args):
+    """
+    Builds the seasons before those built by the `build` command, resuming any backfill that was interrupted or failed, and prints the seasons that could not be built.
+
+    :param args: The parsed command-line arguments.
+    """
+    from data.backfill import run_backfill
+
+    progress = run_backfill(args.first_season, args.last_season, args.requests_per_minute, args.max_attempts, retry_failed=not args.skip_failed)
+    failed = {season: season_progress for season, season_progress in progress.items() if season_progress["status"] != "complete"}
+
+    print("%d of %d seasons backfilled." % (len(progress) - len(failed), len(progress)))
+
+    for season, season_progress in failed.items():
+        print("%d: %s after %d attempts (%s)" % (season, season_progress["status"], season_progress["attempts"], season_progress["error"]))
+
+def features(args):
+    """
+    Recomputes the engineered features of every stored season from the stored data.
+
+    :param args: The parsed command-line arguments.
+    """
+    from data.season_averages import rebuild_features
+
+    seasons = rebuild_features(args.first_season, args.last_season)
+    print("Features rebuilt for %d seasons." % len(seasons))
+
+def serve(args):
+    """
+    Serves the ranked MVP candidates of the current season over a local HTTP endpoint until interrupted, refreshing them on a schedule.
+
+    :param args: The parsed command-line arguments.
+    """
+    from data.mvp_service import MVPService
+
+    service = MVPService(args.host, args.port, args.interval, args.candidates, check_games=not args.no_game_check).start()
+    print("Serving the MVP race at %s/mvp (refreshed every %d seconds); press Ctrl+C to stop." % (service.url, args.interval))
+
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        service.stop()
+
+def predict(args):
+    """
+    Trains the default model on every completed season and prints the players of a season with the highest predicted MVP award share.
+
+    :param args: The parsed command-line arguments.
+    """
+    from data import prediction
+
+    matrix = prediction.get_feature_matrix(rebuild=args.rebuild)
+    model = prediction.train_model(matrix)
+    season = args.season if args.season is not None else matrix.get_seasons()[-1]
+
+    print(prediction.get_predicted_race_df(model, matrix, season, args.top).to_string(index=False))
+
+def evaluate(args):
+    """
+    Evaluates the default model by leave-one-season-out cross-validation and prints the result of each held-out season.
+
+    :param args: The parsed command-line arguments.
+    """
+    from data import prediction
+
+    matrix = prediction.get_feature_matrix(rebuild=args.rebuild)
+    results_df = prediction.evaluate_loso(matrix, workers=args.workers)
+
+    print(results_df.to_string(index=False))
+    print("\nMVP predicted in %d of %d seasons; median predicted rank of the actual MVP: %g" % (results_df.correct.sum(), len(results_df), results_df.actual_mvp_predicted_rank.median()))
+
+def get_instrumentation():
+    """
+    Returns the instrumentation module of the pipeline, imported under the same name as by the pipeline's modules, so that configuring it affects them.
+
+    :return: The `data/instrumentation.py` module.
+    """
+    import data.season_averages     # Adds the data directory to the path, from which the pipeline's modules import each other
+    import instrumentation
+
+    return instrumentation
+
+def start_instrumentation(args):
+    """
+    Turns on the instrumentation of the pipeline if the command was asked to record its stages or to be profiled.
+
+    :param args: The parsed command-line arguments.
+    :return: The StageProfiler object profiling the command, or None.
+    """
+    if args.instrument is None and args.profile is None:
+        return None
+
+    instrumentation = get_instrumentation()
+    profiler = instrumentation.StageProfiler() if args.profile is not None else None
+    instrumentation.configure(sink=args.instrument or None, profiler=profiler)
+
+    return profiler
+
+def finish_instrumentation(args, profiler):
+    """
+    Prints the summary of the recorded stages and writes the profile of each profiled stage.
+
+    :param args: The parsed command-line arguments.
+    :param profiler: The StageProfiler object returned by `start_instrumentation()`, or None.
+    """
+    if args.instrument is None and args.profile is None:
+        return
+
+    instrumentation = get_instrumentation()
+
+    print()
+    instrumentation.print_summary()
+
+    if args.instrument:
+        print("\nRecords written to %s" % args.instrument)
+
+    if profiler is not None:
+        profile_dir = os.path.dirname(args.profile)
+
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+        for path in profiler.dump(args.profile):
+            print("Profile written to %s" % path)
+
+    instrumentation.configure(enable=False)
+
+def add_instrumentation_args(command_parser):
+    """
+    Adds the arguments turning on the instrumentation of the pipeline to the parser of a command.
+
+    :param command_parser: An argparse.ArgumentParser object.
+    """
+    command_parser.add_argument("--instrument", nargs="?", const="", default=None, metavar="PATH", help="Record the time, requests and rows of each stage of each season, print a summary at the end and, if a path is passed, write every record to it as JSON lines.")
+    command_parser.add_argument("--profile", default=None, metavar="PREFIX", help="Profile the parse, merge and feature stages with cProfile, writing the statistics of each stage to PREFIX{stage}.prof.")
+
+def get_parser():
+    """
+    Returns the parser of the command-line arguments.
+
+    :return: An argparse.ArgumentParser object.
+    """
+    parser = argparse.ArgumentParser(description="NBA MVP Predictor Project")
+    commands = parser.add_subparsers(dest="command")
+
+    build_parser = commands.add_parser("build", help="Download every season of MVP data that is not stored yet.")
+    build_parser.add_argument("--workers", type=int, default=1, help="The number of seasons built at the same time.")
+    add_instrumentation_args(build_parser)
+    build_parser.set_defaults(func=build)
+
+    refresh_parser = commands.add_parser("refresh", help="Refresh the out-of-date sources of the current season.")
+    add_instrumentation_args(refresh_parser)
+    refresh_parser.set_defaults(func=refresh)
+
+    backfill_parser = commands.add_parser("backfill", help="Build the seasons before those built by the build command, resuming where a previous backfill stopped.")
+    backfill_parser.add_argument("--first-season", type=int, default=None, help="The first season to be built; the first MVP season (1955) by default.")
+    backfill_parser.add_argument("--last-season", type=int, default=None, help="The last season to be built; the season before the first season built by the build command by default.")
+    backfill_parser.add_argument("--requests-per-minute", type=float, default=18, help="The maximum number of requests made to basketball-reference.com each minute.")
+    backfill_parser.add_argument("--max-attempts", type=int, default=3, help="The number of attempts made to build each season.")
+    backfill_parser.add_argument("--skip-failed", action="store_true", help="Do not retry the seasons a previous backfill failed to build.")
+    add_instrumentation_args(backfill_parser)
+    backfill_parser.set_defaults(func=backfill)
+
+    features_parser = commands.add_parser("features", help="Recompute the engineered features of every stored season without downloading anything.")
+    features_parser.add_argument("--first-season", type=int, default=None, help="The first season to be rebuilt.")
+    features_parser.add_argument("--last-season", type=int, default=None, help="The last season to be rebuilt.")
+    features_parser.set_defaults(func=features)
+
+    serve_parser = commands.add_parser("serve", help="Serve the ranked MVP candidates of the current season over a local HTTP endpoint, refreshing them on a schedule.")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--interval", type=int, default=600, help="The number of seconds between refreshes.")
+    serve_parser.add_argument("--candidates", type=int, default=15, help="The number of candidates ranked.")
+    serve_parser.add_argument("--no-game-check", action="store_true", help="Do not ask the balldontlie API for finished games; sources are only refreshed once their time to live has passed.")
+    serve_parser.set_defaults(func=serve)
+
+    predict_parser = commands.add_parser("predict", help="Print the players with the highest predicted MVP award share in a season.")
+    predict_parser.add_argument("--season", type=int, default=None, help="The season scored; the last stored season by default.")
+    predict_parser.add_argument("--top", type=int, default=10, help="The number of players printed.")
+    predict_parser.add_argument("--rebuild", action="store_true", help="Rebuild the feature matrix even if it is up to date.")
+    predict_parser.set_defaults(func=predict)
+
+    evaluate_parser = commands.add_parser("evaluate", help="Evaluate the MVP model by leaving one season out at a time.")
+    evaluate_parser.add_argument("--workers", type=int, default=None, help="The number of processes; one per CPU by default.")
+    evaluate_parser.add_argument("--rebuild", action="store_true", help="Rebuild the feature matrix even if it is up to date.")
+    evaluate_parser.set_defaults(func=evaluate)
+
+    return parser
+
+if __name__ == "__main__":
+    parser = get_parser()
+    args = parser.parse_args()
+
+    if args.command is None:    # Running without a command builds the data, as importing the package used to
+        args = parser.parse_args(["build"])
+
+    profiler = start_instrumentation(args) if hasattr(args, "instrument") else None
+
+    try:
+        args.func(args)
+    finally:
+        if hasattr(args, "instrument"):
+            finish_instrumentation(args, profiler)